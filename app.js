@@ -20,7 +20,13 @@ const CONFIG = {
     geojson: {
         file: 'Neighbourhood_Crime_Rates_Open_Data_-5291801778870948764.geojson',
         edges: 'routing_edges.geojson',
-        routingGraph: 'routing_graph.json'
+        routingGraph: 'routing_graph.json',
+        routingGraphBinary: 'routing_graph.bin'
+    },
+    routing: {
+        // Set CONFIG.routing.trace = true (e.g. from the console) to collect A* counters
+        trace: false,
+        traceSampleRate: 0.001  // fraction of edge relaxations logged while tracing
     }
     // DEMO: Risk level thresholds (dummy values for visualization examples)
     // Uncomment below to enable risk scoring and color-coded visualization
@@ -39,7 +45,8 @@ let edgesLayer;  // Routing edges
 let crimeData;
 
 // Routing state
-let routingGraph = null;  // Graph data loaded from routing_graph.json
+let routingGraph = null;  // Graph data loaded from routing_graph.bin (or routing_graph.json)
+let routingGraphLoading = null;  // Pending loadRoutingGraph() promise, shared by concurrent callers
 let startNode = null;     // Selected start point
 let endNode = null;       // Selected end point
 let routeLayers = [];     // Store route polylines
@@ -94,12 +101,13 @@ function isPointInPolygon(point, polygon) {
     return inside;
 }
 
-// Simple nearest node finder
+// Simple nearest node finder (main network only when the graph has component ids)
 function findNearestNode(lat, lon, nodes) {
     let nearest = null;
     let minDist = Infinity;
     
     for (const node of nodes) {
+        if (node.component !== undefined && node.component !== 0) continue;
         const dist = getDistance(lat, lon, node.lat, node.lon);
         if (dist < minDist) {
             minDist = dist;
@@ -112,56 +120,124 @@ function findNearestNode(lat, lon, nodes) {
 let eventModifiers = {};       // Neighborhood ID -> modifier value
 let affectedEdgesLayer = null; // Layer for edges affected by crime events (red overlay)
 
+// Crime event -> edge penalty index
+// Edge midpoints are bucketed into a grid once the graph loads (only needed by in-browser A*); whenever crimeEvents
+// change, only the cells around each event are scanned to rebuild crimeEdgeImpacts,
+// so A* does a single Map lookup per edge instead of looping over every event.
+const CRIME_EVENT_RADIUS_M = 100;
+const EDGE_GRID_CELL_DEG = 0.001;  // ~111m north-south, ~80m east-west in Toronto
+let edgeMidpointGrid = null;       // "row,col" -> [{key, lat, lon}]
+let crimeEdgeImpacts = new Map();  // edgeKey -> max impact factor (0-1)
+let incidentsSyncedToServer = true; // Whether the routing API has the current crimeEvents
+
+function edgeKey(a, b) {
+    return a < b ? `${a}|${b}` : `${b}|${a}`;
+}
+
+// Bucket every routing edge midpoint into a lat/lon grid
+function buildEdgeMidpointGrid() {
+    const nodeById = new Map(routingGraph.nodes.map(n => [n.id, n]));
+    edgeMidpointGrid = new Map();
+
+    // Binary graph: endpoints straight from the CSR typed arrays; JSON graph: its edges array
+    const csr = routingGraph.csr;
+    const numEdges = csr ? csr.numEdges : routingGraph.edges.length;
+    for (let i = 0; i < numEdges; i++) {
+        const source = csr ? csr.source[i] : routingGraph.edges[i].source;
+        const target = csr ? csr.target[i] : routingGraph.edges[i].target;
+        const a = nodeById.get(source);
+        const b = nodeById.get(target);
+        if (!a || !b) continue;
+
+        const lat = (a.lat + b.lat) / 2;
+        const lon = (a.lon + b.lon) / 2;
+        const cell = `${Math.floor(lat / EDGE_GRID_CELL_DEG)},${Math.floor(lon / EDGE_GRID_CELL_DEG)}`;
+        if (!edgeMidpointGrid.has(cell)) edgeMidpointGrid.set(cell, []);
+        edgeMidpointGrid.get(cell).push({ key: edgeKey(source, target), lat, lon });
+    }
+}
+
+// Recompute which edges fall within 100m of a crime event (call whenever crimeEvents changes)
+function rebuildCrimeEdgeImpacts() {
+    crimeEdgeImpacts = new Map();
+    if (!edgeMidpointGrid) {
+        // Graph not loaded yet: the routing API is the only router that needs the events
+        syncIncidentsToServer();
+        return;
+    }
+
+    for (const event of crimeEvents) {
+        const impactFactor = event.impact / 100; // Convert percentage to decimal
+        const latSpan = Math.ceil(CRIME_EVENT_RADIUS_M / 111320 / EDGE_GRID_CELL_DEG);
+        const lonSpan = Math.ceil(CRIME_EVENT_RADIUS_M / (111320 * Math.cos(event.lat * Math.PI / 180)) / EDGE_GRID_CELL_DEG);
+        const row = Math.floor(event.lat / EDGE_GRID_CELL_DEG);
+        const col = Math.floor(event.lon / EDGE_GRID_CELL_DEG);
+
+        for (let r = row - latSpan; r <= row + latSpan; r++) {
+            for (let c = col - lonSpan; c <= col + lonSpan; c++) {
+                const bucket = edgeMidpointGrid.get(`${r},${c}`);
+                if (!bucket) continue;
+                for (const mid of bucket) {
+                    if (getDistance(mid.lat, mid.lon, event.lat, event.lon) > CRIME_EVENT_RADIUS_M) continue;
+                    if (impactFactor > (crimeEdgeImpacts.get(mid.key) || 0)) {
+                        crimeEdgeImpacts.set(mid.key, impactFactor);
+                    }
+                }
+            }
+        }
+    }
+
+    syncIncidentsToServer();
+}
+
+// Send the current crime events to the routing API so server-side routes avoid them too
+async function syncIncidentsToServer() {
+    incidentsSyncedToServer = false;
+    try {
+        const response = await fetch('/incidents', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                events: crimeEvents.map(e => ({ lat: e.lat, lon: e.lon, impact: e.impact }))
+            })
+        });
+        incidentsSyncedToServer = response.ok;
+    } catch (error) {
+        console.warn('⚠️ Could not sync crime events to routing API:', error.message);
+    }
+}
+
 // Function to calculate adjusted edge weight based on crime events
+// Called for every edge A* relaxes - keep it free of logging (use CONFIG.routing.trace instead)
 window.getAdjustedEdgeWeight = function(edgeWeight, startNode, endNode) {
-    // ALWAYS log - no conditions
-    console.log(`⚙️ getAdjustedEdgeWeight: ${startNode.id}->${endNode.id}, weight=${edgeWeight.toFixed(3)}, crimeEvents=${crimeEvents.length}`);
-    
-    if (crimeEvents.length === 0) return edgeWeight;
-    
-    // Calculate midpoint of edge
-    const midLat = (startNode.lat + endNode.lat) / 2;
-    const midLon = (startNode.lon + endNode.lon) / 2;
-    
-    console.log(`   📍 Edge midpoint: [${midLat.toFixed(6)}, ${midLon.toFixed(6)}]`);
-    console.log(`   🔴 Checking ${crimeEvents.length} crime events...`);
+    if (crimeEdgeImpacts.size === 0) return edgeWeight;
     
+    return penalizeEdgeWeight(edgeWeight, crimeEdgeImpacts.get(edgeKey(startNode.id, endNode.id)) || 0);
+};
+
+// Strongest crime event impact (0-1) within 100m of an edge midpoint, without the edge index
+function crimeImpactNear(lat, lon) {
     let maxImpact = 0;
-    let closestDistance = Infinity;
-    
-    // Check distance to each crime event
     for (const event of crimeEvents) {
-        const distance = getDistance(midLat, midLon, event.lat, event.lon);
-        console.log(`      Event at [${event.lat.toFixed(6)}, ${event.lon.toFixed(6)}]: ${distance.toFixed(1)}m`);
-        
-        // If edge is within 100m of event, apply impact
-        if (distance <= 100) {
-            const impactFactor = event.impact / 100; // Convert percentage to decimal
-            if (impactFactor > maxImpact) {
-                maxImpact = impactFactor;
-                closestDistance = distance;
-            }
+        if (getDistance(lat, lon, event.lat, event.lon) <= CRIME_EVENT_RADIUS_M) {
+            maxImpact = Math.max(maxImpact, event.impact / 100);
         }
     }
-    
+    return maxImpact;
+}
+
+function penalizeEdgeWeight(edgeWeight, maxImpact) {
     // Apply maximum impact found (multiplicative)
     if (maxImpact > 0) {
         // Strong penalty: multiply by (1 + impact * 10) to make algorithm avoid these areas
         // For 100% impact, this gives 11x the weight, making it very undesirable
         const adjustedWeight = edgeWeight * (1 + maxImpact * 10);
-        const cappedWeight = Math.min(adjustedWeight, 84); // Cap at max weight value
-        
-        console.log(`🔴 Edge (${startNode.id}->${endNode.id}) affected!`);
-        console.log(`   📍 Edge midpoint: [${midLat.toFixed(5)}, ${midLon.toFixed(5)}]`);
-        console.log(`   📏 Closest distance: ${closestDistance.toFixed(1)}m`);
-        console.log(`   💥 Max impact: ${(maxImpact * 100).toFixed(1)}%`);
-        console.log(`   ⚖️  Weight: ${edgeWeight.toFixed(3)} → ${adjustedWeight.toFixed(3)} (capped: ${cappedWeight.toFixed(3)})`);
-        
-        return cappedWeight;
+        // Cap at max weight value, but never below the base weight (some streets already exceed it)
+        return Math.max(edgeWeight, Math.min(adjustedWeight, 84));
     }
     
     return edgeWeight;
-};
+}
 
 // Initialize the map
 function initMap() {
@@ -637,7 +713,7 @@ function updateStats() {
 function init() {
     initMap();
     loadGeoJSON();
-    loadRoutingGraph(); // Solo carga el grafo JSON (ligero), no los edges visuales
+    // The routing graph is only fetched if in-browser A* is needed (see ensureRoutingGraph)
 }
 
 // ============================================
@@ -809,6 +885,8 @@ function createCrimeEventAtLocation(lat, lon, type, impact, location, fullDescri
         description: fullDescription
     });
     
+    rebuildCrimeEdgeImpacts();
+    
     console.log(`✅ Crime event created. Total events: ${crimeEvents.length}`);
     
     return true;
@@ -1065,48 +1143,100 @@ window.toggleLayer = function(layerType) {
 // ROUTING FUNCTIONS
 // ===========================
 
-// Load routing graph
+// Routes come from /route and snapping from /nearest, so the graph is only downloaded the
+// first time the browser has to route by itself (API unreachable, or crime events not synced yet)
+function ensureRoutingGraph() {
+    if (!routingGraphLoading) {
+        routingGraphLoading = loadRoutingGraph().then(graph => {
+            if (!graph) routingGraphLoading = null; // retry on the next fallback
+            return graph;
+        });
+    }
+    return routingGraphLoading;
+}
+
+// Load routing graph: the binary artifact if it exists, otherwise the JSON graph
 async function loadRoutingGraph() {
     console.log('🔄 Loading routing graph...');
     try {
-        const response = await fetch('routing_graph.json');
-        routingGraph = await response.json();
-        
-        // Load highway types from routing_edges.geojson
-        console.log('🔄 Loading highway types from routing_edges.geojson...');
-        const edgesResponse = await fetch('routing_edges.geojson');
-        const edgesData = await edgesResponse.json();
-        
-        // Create a map of edge highway types: "source->target" => highway_type
-        const edgeTypes = new Map();
-        edgesData.features.forEach(feature => {
-            const source = feature.properties.source;
-            const target = feature.properties.target;
-            const highwayType = feature.properties.highway_type;
-            edgeTypes.set(`${source}->${target}`, highwayType);
-        });
-        
-        // Enrich adjacency list with highway types
-        for (const nodeId in routingGraph.adjacency_list) {
-            const edges = routingGraph.adjacency_list[nodeId];
-            edges.forEach(edge => {
-                const key = `${nodeId}->${edge.target}`;
-                edge.highway_type = edgeTypes.get(key) || 'unclassified';
-            });
+        const binResponse = await fetch(CONFIG.geojson.routingGraphBinary);
+        if (binResponse.ok) {
+            try {
+                routingGraph = readGraphArtifact(await binResponse.arrayBuffer());
+                console.log('   ⚡ Read', CONFIG.geojson.routingGraphBinary, 'into typed arrays');
+            } catch (error) {
+                // e.g. an artifact from an older pipeline version
+                console.warn('⚠️ Could not read', CONFIG.geojson.routingGraphBinary, '- using JSON graph:', error.message);
+            }
+        }
+        if (!routingGraph) {
+            routingGraph = await loadRoutingGraphJson();
         }
         
+        buildEdgeMidpointGrid();
+        rebuildCrimeEdgeImpacts();
+        
         console.log('✅ Routing graph loaded successfully!');
         console.log('   📊 Nodes:', routingGraph.nodes.length);
-        console.log('   📊 Adjacency entries:', Object.keys(routingGraph.adjacency_list).length);
-        console.log('   🚦 Highway types enriched from', edgeTypes.size, 'edges');
+        console.log('   📊 Edges:', routingGraph.csr ? routingGraph.csr.numEdges : routingGraph.edges.length);
         console.log('   🗺️ Ready for route planning!');
+        return routingGraph;
     } catch (error) {
         console.error('❌ Error loading routing graph:', error);
+        routingGraph = null;
+        return null;
     }
 }
 
+// Fallback: routing_graph.json plus highway types from routing_edges.geojson
+async function loadRoutingGraphJson() {
+    const response = await fetch(CONFIG.geojson.routingGraph);
+    const graph = await response.json();
+    
+    // Load highway types from routing_edges.geojson
+    console.log('🔄 Loading highway types from routing_edges.geojson...');
+    const edgesResponse = await fetch(CONFIG.geojson.edges);
+    const edgesData = await edgesResponse.json();
+    
+    // Create a map of edge highway types: "source->target" => highway_type
+    const edgeTypes = new Map();
+    edgesData.features.forEach(feature => {
+        const source = feature.properties.source;
+        const target = feature.properties.target;
+        const highwayType = feature.properties.highway_type;
+        edgeTypes.set(`${source}->${target}`, highwayType);
+    });
+    
+    // Enrich adjacency list with highway types
+    for (const nodeId in graph.adjacency_list) {
+        const edges = graph.adjacency_list[nodeId];
+        edges.forEach(edge => {
+            const key = `${nodeId}->${edge.target}`;
+            edge.highway_type = edgeTypes.get(key) || 'unclassified';
+        });
+    }
+    
+    console.log('   🚦 Highway types enriched from', edgeTypes.size, 'edges');
+    return graph;
+}
+
+// Snap a coordinate to the closest intersection via the routing API (/nearest)
+async function snapToNode(lat, lon) {
+    try {
+        const response = await fetch(`/nearest?lat=${lat}&lon=${lon}`);
+        if (response.ok) {
+            const node = await response.json();
+            return { id: node.id, lat: node.lat, lon: node.lon, weight: node.weight };
+        }
+    } catch (error) {
+        console.warn('⚠️ Routing API unavailable, snapping in the browser:', error.message);
+    }
+    const graph = await ensureRoutingGraph();
+    return graph ? findNearestNode(lat, lon, graph.nodes) : null;
+}
+
 // Handle map clicks for routing
-function onMapClick(e) {
+async function onMapClick(e) {
     console.log('🖱️ Map click detected! routingMode:', routingMode, 'reportCrimeMode:', reportCrimeMode, 'routingGraph loaded:', !!routingGraph);
     
     // Handle crime event reporting
@@ -1115,8 +1245,8 @@ function onMapClick(e) {
         return;
     }
     
-    if (!routingMode || !routingGraph) {
-        console.log('⚠️ Click ignored - routing mode not active or graph not loaded');
+    if (!routingMode) {
+        console.log('⚠️ Click ignored - routing mode not active');
         return;
     }
 
@@ -1125,17 +1255,8 @@ function onMapClick(e) {
 
     console.log('📍 Map clicked at:', clickedLat.toFixed(5), clickedLon.toFixed(5));
     
-    // Find nearest node - no restrictions
-    const nodesList = routingGraph.nodes.map(n => ({
-        id: n.id,
-        lat: n.lat,
-        lon: n.lon,
-        weight: n.weight
-    }));
-    
-    console.log('🔍 Searching among', nodesList.length, 'nodes...');
-    
-    const nearest = findNearestNode(clickedLat, clickedLon, nodesList);
+    // Find nearest node - KD-tree on the routing API, linear scan if it is unavailable
+    const nearest = await snapToNode(clickedLat, clickedLon);
     
     if (!nearest) {
         console.error('❌ No nearest node found!');
@@ -1202,9 +1323,23 @@ function onMapClick(e) {
     }
 }
 
+// Request a route from the Python routing API (route_server.py via /route)
+// Returns null when the service is down or finds no path so callers can fall back to astar()
+async function fetchServerRoute(startId, endId, mode) {
+    try {
+        const response = await fetch(`/route?start=${startId}&end=${endId}&mode=${mode}`);
+        if (!response.ok) return null;
+        const data = await response.json();
+        return data.routes ? data.routes[mode] : null;
+    } catch (error) {
+        console.warn('⚠️ Routing API unavailable, using in-browser A*:', error.message);
+        return null;
+    }
+}
+
 // Calculate and display ONLY the safest route
-function calculateSafestRoute() {
-    if (!startNode || !endNode || !routingGraph) {
+async function calculateSafestRoute() {
+    if (!startNode || !endNode) {
         console.error('❌ Cannot calculate route - missing data');
         return;
     }
@@ -1222,32 +1357,44 @@ function calculateSafestRoute() {
     }
     console.log('═══════════════════════════════════════════════');
     
-    // Reset the call counter for getAdjustedEdgeWeight debugging
-    window.adjustWeightCallCount = 0;
-
-    // Convert nodes array to lookup object with STRING keys (critical for matching adjacency_list format)
-    const nodesLookup = {};
-    routingGraph.nodes.forEach(n => {
-        nodesLookup[String(n.id)] = n;  // Convert to string to match adjacency_list keys
-    });
-    
     // IMPORTANT: Convert IDs to strings because adjacency_list uses string keys
     const startIdStr = String(startNode.id);
     const endIdStr = String(endNode.id);
     
     console.log('🔑 Start ID:', startIdStr, '(type:', typeof startIdStr, ')');
     console.log('🔑 End ID:', endIdStr, '(type:', typeof endIdStr, ')');
-    console.log('🔗 Adjacency keys sample:', Object.keys(routingGraph.adjacency_list).slice(0, 3));
 
     // Calculate ONLY the safest route (weightFactor = 0.9 prioritizes safety)
+    // Ask the routing API first; fall back to in-browser A* (loading the graph on first use) if it is unavailable
     const startTime = performance.now();
-    const safestRoute = astar(
-        routingGraph.adjacency_list,
-        nodesLookup,
-        startIdStr,  // Use string ID
-        endIdStr,    // Use string ID
-        0.9 // 90% safety priority
-    );
+    let safestRoute = incidentsSyncedToServer
+        ? await fetchServerRoute(startIdStr, endIdStr, 'safest')
+        : null;
+    const nodesLookup = {};
+    if (safestRoute) {
+        console.log('🧭 Route computed by routing API');
+    } else if (await ensureRoutingGraph()) {
+        // Convert nodes array to lookup object with STRING keys (critical for matching adjacency_list format)
+        routingGraph.nodes.forEach(n => {
+            nodesLookup[String(n.id)] = n;  // Convert to string to match adjacency_list keys
+        });
+        console.log('🔗 Adjacency keys sample:', Object.keys(routingGraph.adjacency_list).slice(0, 3));
+
+        const tracer = CONFIG.routing.trace
+            ? new AstarTracer({ sampleRate: CONFIG.routing.traceSampleRate })
+            : null;
+        safestRoute = astar(
+            routingGraph.adjacency_list,
+            nodesLookup,
+            startIdStr,  // Use string ID
+            endIdStr,    // Use string ID
+            0.9, // 90% safety priority
+            { tracer }
+        );
+        if (tracer) {
+            console.table(tracer.summary());
+        }
+    }
     const endTime = performance.now();
     
     console.log('\n⏱️  Calculation time:', (endTime - startTime).toFixed(2), 'ms');
@@ -1256,13 +1403,15 @@ function calculateSafestRoute() {
         console.error('❌ No path found between these points!');
         console.error('   Start node:', startIdStr, 'exists in nodes?', !!nodesLookup[startNode.id]);
         console.error('   End node:', endIdStr, 'exists in nodes?', !!nodesLookup[endNode.id]);
-        console.error('   Adjacency for start:', routingGraph.adjacency_list[startIdStr] ? 'YES' : 'NO');
-        console.error('   Adjacency for end:', routingGraph.adjacency_list[endIdStr] ? 'YES' : 'NO');
-        if (routingGraph.adjacency_list[startIdStr]) {
-            console.error('   Start has', routingGraph.adjacency_list[startIdStr].length, 'neighbors');
-        }
-        if (routingGraph.adjacency_list[endIdStr]) {
-            console.error('   End has', routingGraph.adjacency_list[endIdStr].length, 'neighbors');
+        if (routingGraph) {
+            console.error('   Adjacency for start:', routingGraph.adjacency_list[startIdStr] ? 'YES' : 'NO');
+            console.error('   Adjacency for end:', routingGraph.adjacency_list[endIdStr] ? 'YES' : 'NO');
+            if (routingGraph.adjacency_list[startIdStr]) {
+                console.error('   Start has', routingGraph.adjacency_list[startIdStr].length, 'neighbors');
+            }
+            if (routingGraph.adjacency_list[endIdStr]) {
+                console.error('   End has', routingGraph.adjacency_list[endIdStr].length, 'neighbors');
+            }
         }
         alert('❌ No path found between these points!\n\nTry selecting different locations within the coverage area.');
         resetRouting();
@@ -1632,15 +1781,15 @@ window.startRouteAnimation = function() {
         // Calculate adjusted risk score in real-time based on current crime events
         let edgeWeight = currentEdge ? currentEdge.weight : 0;
         if (currentEdge && crimeEvents.length > 0) {
-            // Get edge start and end nodes
-            const startNodeId = currentRoute.path[currentSegment];
-            const endNodeId = currentRoute.path[currentSegment + 1];
-            const startNode = routingGraph.nodes.find(n => n.id == startNodeId);
-            const endNode = routingGraph.nodes.find(n => n.id == endNodeId);
-            
-            if (startNode && endNode) {
-                // Recalculate adjusted weight in real-time
-                edgeWeight = getAdjustedEdgeWeight(currentEdge.weight, startNode, endNode);
+            if (edgeMidpointGrid) {
+                // Recalculate adjusted weight in real-time from the edge index
+                const startNodeId = Number(currentRoute.path[currentSegment]);
+                const endNodeId = Number(currentRoute.path[currentSegment + 1]);
+                edgeWeight = getAdjustedEdgeWeight(currentEdge.weight, { id: startNodeId }, { id: endNodeId });
+            } else {
+                // Route came from the API and the graph was never loaded: check the segment midpoint
+                const impact = crimeImpactNear((start[1] + end[1]) / 2, (start[0] + end[0]) / 2);
+                edgeWeight = penalizeEdgeWeight(currentEdge.weight, impact);
             }
         }
         
@@ -1958,6 +2107,7 @@ function handleCrimeEventClick(e) {
     event.marker = marker;
     event.circle = circle;
     crimeEvents.push(event);
+    rebuildCrimeEdgeImpacts();
     
     // Calculate affected neighborhoods
     updateAffectedNeighborhoods(event);
@@ -2045,6 +2195,7 @@ window.clearCrimeEvents = function() {
     // Reset arrays
     crimeEvents = [];
     eventModifiers = {};
+    rebuildCrimeEdgeImpacts();
     
     // Refresh crime layer
     changeCrimeLayer();
@@ -2100,15 +2251,23 @@ async function updateAffectedEdges() {
         const midLat = (startLat + endLat) / 2;
         const midLon = (startLon + endLon) / 2;
         
-        // Check if near any crime event
+        // Check if near any crime event (O(1) via the edge index once the routing graph is loaded)
         let isAffected = false;
         let maxImpact = 0;
         
-        for (const event of crimeEvents) {
-            const distance = getDistance(midLat, midLon, event.lat, event.lon);
-            if (distance <= 100) {
+        if (edgeMidpointGrid) {
+            const impactFactor = crimeEdgeImpacts.get(edgeKey(feature.properties.source, feature.properties.target));
+            if (impactFactor) {
                 isAffected = true;
-                maxImpact = Math.max(maxImpact, event.impact);
+                maxImpact = impactFactor * 100;
+            }
+        } else {
+            for (const event of crimeEvents) {
+                const distance = getDistance(midLat, midLon, event.lat, event.lon);
+                if (distance <= CRIME_EVENT_RADIUS_M) {
+                    isAffected = true;
+                    maxImpact = Math.max(maxImpact, event.impact);
+                }
             }
         }
         
@@ -0,0 +1,177 @@
+"""
+Batch origin-destination routing
+Snaps OD coordinates to intersections and solves every pair across all cores.
+The parent builds the CSR graph and ALT tables once and publishes them in shared
+memory; workers map the same pages read-only instead of receiving pickled copies.
+A* reads them through memoryviews, so the only per-worker arrays are the arc costs of
+the requested weight factor (8 bytes per arc) and each query's heuristic (8 bytes per node).
+
+Input: CSV or Parquet with origin_lat, origin_lon, dest_lat, dest_lon (any other columns are kept)
+Output: input columns + start/end node, snap distances, distance (km), total_weight,
+        avg_weight, danger_score, num_segments and found
+
+Usage: python batch_routing.py od_pairs.csv [output.csv|.parquet] [mode|weight_factor] [workers]
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+
+from landmarks import Landmarks
+from routing_engine import RoutingGraph, load_graph, ROUTE_MODES
+
+# OD points farther than this from any intersection are reported as not found
+MAX_SNAP_DISTANCE_M = 500.0
+PAIRS_PER_TASK = 256
+
+OD_COLUMNS = ['origin_lat', 'origin_lon', 'dest_lat', 'dest_lon']
+
+# Set in each worker by _init_worker
+_graph = None
+_shared = []
+
+
+def share_arrays(arrays):
+    """
+    Copy named arrays into shared memory blocks.
+    Returns (blocks, spec) where spec {name: (block name, shape, dtype)} is all a worker needs.
+    """
+    blocks, spec = [], {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        spec[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, spec
+
+
+def attach_arrays(spec):
+    """Read-only views of arrays published by share_arrays (keeps the blocks open in _shared)"""
+    arrays = {}
+    for name, (block_name, shape, dtype) in spec.items():
+        block = SharedMemory(name=block_name)
+        _shared.append(block)
+        view = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        view.flags.writeable = False
+        arrays[name] = view
+    return arrays
+
+
+def _init_worker(graph_spec, landmark_spec):
+    global _graph
+    _graph = RoutingGraph.from_csr(attach_arrays(graph_spec))
+    _graph.landmarks = Landmarks(**attach_arrays(landmark_spec))
+
+
+def _solve_chunk(task):
+    """Route one chunk of (row, start, end) pairs in a worker"""
+    rows, weight_factor = task
+    results = []
+    for row, start, end in rows:
+        arcs = _graph.astar(start, end, weight_factor)
+        results.append((row, None if arcs is None else _graph.route_stats(arcs)))
+    return results
+
+
+def snap_pairs(graph, od_df, max_distance_m=MAX_SNAP_DISTANCE_M):
+    """Add start/end node ids (-1 if nothing within max_distance_m) and snap distances to od_df"""
+    for prefix, node_col in (('origin', 'start_node'), ('dest', 'end_node')):
+        ids, distances = graph.node_index.nearest(od_df[f'{prefix}_lat'].to_numpy(),
+                                                  od_df[f'{prefix}_lon'].to_numpy(), max_distance_m)
+        od_df[node_col] = ids
+        od_df[f'{prefix}_snap_m'] = np.where(ids >= 0, distances, np.nan).round(1)
+    return od_df
+
+
+def route_batch(graph, od_df, weight_factor, workers=None, pairs_per_task=PAIRS_PER_TASK):
+    """Solve every snapped pair of od_df on a process pool; returns od_df with the route columns"""
+    od_df = od_df.copy()
+    for col in ('distance', 'total_weight', 'avg_weight', 'danger_score'):
+        od_df[col] = np.nan
+    od_df['num_segments'] = 0
+    od_df['found'] = False
+
+    snapped = od_df.index[(od_df['start_node'] >= 0) & (od_df['end_node'] >= 0)]
+    pairs = list(zip(range(len(snapped)),
+                     od_df.loc[snapped, 'start_node'].astype(int).tolist(),
+                     od_df.loc[snapped, 'end_node'].astype(int).tolist()))
+    tasks = [(pairs[i:i + pairs_per_task], weight_factor) for i in range(0, len(pairs), pairs_per_task)]
+
+    graph_blocks, graph_spec = share_arrays(graph.csr_arrays())
+    landmark_blocks, landmark_spec = share_arrays({name: getattr(graph.landmarks, name)
+                                                   for name in Landmarks.ARRAYS})
+    results = {}
+    try:
+        with get_context('spawn').Pool(workers or os.cpu_count(), initializer=_init_worker,
+                                       initargs=(graph_spec, landmark_spec)) as pool:
+            for chunk in pool.imap_unordered(_solve_chunk, tasks):
+                results.update(chunk)
+    finally:
+        for block in graph_blocks + landmark_blocks:
+            block.close()
+            block.unlink()
+
+    found = [i for i in range(len(snapped)) if results.get(i) is not None]
+    rows = snapped[found]
+    for col, key in (('distance', 'distance'), ('total_weight', 'totalWeight'), ('avg_weight', 'avgWeight'),
+                     ('danger_score', 'dangerScore'), ('num_segments', 'numSegments')):
+        od_df.loc[rows, col] = [results[i][key] for i in found]
+    od_df.loc[rows, 'found'] = True
+    return od_df
+
+
+def read_table(path):
+    return pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+
+
+def write_table(df, path):
+    if path.endswith('.parquet'):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    input_path = sys.argv[1]
+    output_path = sys.argv[2] if len(sys.argv) > 2 else 'od_routes.csv'
+    mode = sys.argv[3] if len(sys.argv) > 3 else 'safest'
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    weight_factor = ROUTE_MODES[mode] if mode in ROUTE_MODES else float(mode)
+
+    print("="*80)
+    print("BATCH OD ROUTING")
+    print("="*80)
+
+    od_df = read_table(input_path)
+    missing = [col for col in OD_COLUMNS if col not in od_df.columns]
+    if missing:
+        print(f"❌ {input_path} is missing columns: {', '.join(missing)}")
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    graph = load_graph()
+    graph.landmarks
+    print(f"\n📊 Graph: {graph.num_nodes} nodes, {graph.num_edges} edges "
+          f"({(time.perf_counter() - t0) * 1000:.0f}ms incl. ALT landmarks)")
+
+    od_df = snap_pairs(graph, od_df)
+    num_snapped = int(((od_df['start_node'] >= 0) & (od_df['end_node'] >= 0)).sum())
+    print(f"📍 {num_snapped}/{len(od_df)} pairs snapped within {MAX_SNAP_DISTANCE_M:.0f}m")
+
+    t0 = time.perf_counter()
+    result = route_batch(graph, od_df, weight_factor, workers)
+    elapsed = time.perf_counter() - t0
+
+    write_table(result, output_path)
+    print(f"\n🧭 {int(result['found'].sum())}/{len(result)} routes found "
+          f"(weight_factor={weight_factor}, {workers or os.cpu_count()} workers)")
+    print(f"⚡ {elapsed:.2f}s, {num_snapped / elapsed:.0f} routes/sec")
+    print(f"💾 {output_path}")
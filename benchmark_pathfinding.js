@@ -0,0 +1,178 @@
+/**
+ * Benchmark for the A* open set in pathfinding.js
+ * Compares the previous sorted-array queue (splice/shift) with the binary heap,
+ * and three A* searches with the single multi-criteria calculateRoutes()
+ * over random origin/destination pairs from routing_graph.bin (or the CSVs)
+ *
+ * Usage: node benchmark_pathfinding.js [numPairs] [seed]
+ */
+const fs = require('fs');
+const { PriorityQueue, astar, calculateRoutes, readGraphArtifact } = require('./pathfinding.js');
+
+// Previous PriorityQueue implementation: binary-search insert + splice, shift to dequeue
+class SortedArrayQueue {
+    constructor() {
+        this.items = [];
+    }
+
+    enqueue(element, priority) {
+        const item = { element, priority };
+        let low = 0;
+        let high = this.items.length;
+        while (low < high) {
+            const mid = (low + high) >>> 1;
+            if (this.items[mid].priority < priority) {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+        this.items.splice(low, 0, item);
+    }
+
+    dequeue() {
+        return this.items.shift();
+    }
+
+    isEmpty() {
+        return this.items.length === 0;
+    }
+
+    size() {
+        return this.items.length;
+    }
+}
+
+// Split one CSV line, honouring double-quoted fields
+function parseCsvLine(line) {
+    const fields = [];
+    let field = '';
+    let quoted = false;
+    for (let i = 0; i < line.length; i++) {
+        const ch = line[i];
+        if (ch === '"') {
+            if (quoted && line[i + 1] === '"') {
+                field += '"';
+                i++;
+            } else {
+                quoted = !quoted;
+            }
+        } else if (ch === ',' && !quoted) {
+            fields.push(field);
+            field = '';
+        } else {
+            field += ch;
+        }
+    }
+    fields.push(field);
+    return fields;
+}
+
+function readCsv(path) {
+    const lines = fs.readFileSync(path, 'utf8').split(/\r?\n/).filter(l => l.length > 0);
+    const header = parseCsvLine(lines[0]);
+    return lines.slice(1).map(line => {
+        const values = parseCsvLine(line);
+        const row = {};
+        header.forEach((name, i) => { row[name] = values[i]; });
+        return row;
+    });
+}
+
+// Build the same structures app.js passes to astar(): string-keyed nodes + adjacency list
+function loadGraph() {
+    if (fs.existsSync('routing_graph.bin')) {
+        const bytes = fs.readFileSync('routing_graph.bin');
+        const graph = readGraphArtifact(bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.byteLength));
+        const nodes = {};
+        for (const node of graph.nodes) nodes[String(node.id)] = node;
+        return { nodes, adjacency: graph.adjacency_list };
+    }
+
+    const nodes = {};
+    readCsv('intersection_weights.csv').forEach((row, id) => {
+        nodes[String(id)] = { id, lat: Number(row.lat), lon: Number(row.lon), weight: Number(row.weight) };
+    });
+
+    const adjacency = {};
+    for (const row of readCsv('routing_edges.csv')) {
+        const edge = { weight: Number(row.weight), length_m: Number(row.length_m) };
+        (adjacency[row.source] = adjacency[row.source] || []).push({ target: Number(row.target), ...edge });
+        (adjacency[row.target] = adjacency[row.target] || []).push({ target: Number(row.source), ...edge });
+    }
+    return { nodes, adjacency };
+}
+
+// Small seeded PRNG so runs are reproducible
+function mulberry32(seed) {
+    return function() {
+        seed |= 0; seed = seed + 0x6D2B79F5 | 0;
+        let t = Math.imul(seed ^ seed >>> 15, 1 | seed);
+        t = t + Math.imul(t ^ t >>> 7, 61 | t) ^ t;
+        return ((t ^ t >>> 14) >>> 0) / 4294967296;
+    };
+}
+
+function timeQueries(pairs, query) {
+    const times = [];
+    let found = 0;
+    for (const [start, end] of pairs) {
+        const t0 = performance.now();
+        const route = query(start, end);
+        times.push(performance.now() - t0);
+        if (route) found++;
+    }
+    times.sort((a, b) => a - b);
+    const total = times.reduce((sum, t) => sum + t, 0);
+    return { total, median: times[times.length >>> 1], p95: times[Math.floor(times.length * 0.95)], found };
+}
+
+function main() {
+    const numPairs = Number(process.argv[2] || 50);
+    const random = mulberry32(Number(process.argv[3] || 42));
+
+    const graph = loadGraph();
+    const ids = Object.keys(graph.adjacency);
+    const pairs = [];
+    for (let i = 0; i < numPairs; i++) {
+        pairs.push([ids[Math.floor(random() * ids.length)], ids[Math.floor(random() * ids.length)]]);
+    }
+
+    console.log('='.repeat(80));
+    console.log('A* OPEN SET BENCHMARK');
+    console.log('='.repeat(80));
+    console.log(`\n📊 ${Object.keys(graph.nodes).length} nodes, ${ids.length} with edges, ${numPairs} OD pairs (safest, weightFactor=0.9)`);
+
+    // Silence astar()'s per-search summary lines while timing
+    const log = console.log;
+    console.log = () => {};
+    const sorted = timeQueries(pairs, (s, t) => astar(graph.adjacency, graph.nodes, s, t, 0.9, { queue: SortedArrayQueue }));
+    const heap = timeQueries(pairs, (s, t) => astar(graph.adjacency, graph.nodes, s, t, 0.9, { queue: PriorityQueue }));
+    console.log = log;
+
+    report([['sorted array', sorted], ['binary heap', heap]], numPairs);
+    console.log(`\n⚡ Speedup: ${(sorted.total / heap.total).toFixed(2)}x`);
+
+    // All three alternatives: one A* per weightFactor vs one multi-criteria search
+    console.log('\n' + '='.repeat(80));
+    console.log('ROUTE ALTERNATIVES (safest + balanced + shortest)');
+    console.log('='.repeat(80));
+    console.log = () => {};
+    const threeSearches = timeQueries(pairs, (s, t) => {
+        const routes = [0.9, 0.5, 0.1].map(w => astar(graph.adjacency, graph.nodes, s, t, w));
+        return routes.every(Boolean) ? routes : null;
+    });
+    const pareto = timeQueries(pairs, (s, t) => calculateRoutes(graph.adjacency, graph.nodes, s, t));
+    console.log = log;
+
+    report([['3x A*', threeSearches], ['Pareto search', pareto]], numPairs);
+    console.log(`\n⚡ Speedup: ${(threeSearches.total / pareto.total).toFixed(2)}x`);
+}
+
+function report(results, numPairs) {
+    for (const [name, r] of results) {
+        console.log(`  ${name.padEnd(13)} total ${r.total.toFixed(1)}ms | median ${r.median.toFixed(2)}ms | p95 ${r.p95.toFixed(2)}ms | ${r.found}/${numPairs} found`);
+    }
+}
+
+main();
@@ -0,0 +1,79 @@
+"""
+Benchmark the Python routing engine over random origin/destination pairs
+drawn from routing_edges.csv
+
+Usage: python benchmark_routing.py [num_pairs] [seed]
+"""
+import os
+import sys
+import time
+import numpy as np
+
+from contraction_hierarchy import load_overlay, DEFAULT_PATH as CH_PATH
+from routing_engine import RoutingGraph, ROUTE_MODES
+
+
+def random_od_pairs(graph, num_pairs, seed=42):
+    """Random (start, end) node pairs among nodes that have at least one edge"""
+    rng = np.random.default_rng(seed)
+    candidates = np.flatnonzero(np.diff(graph.offsets) > 0)
+    return rng.choice(candidates, size=(num_pairs, 2)).tolist()
+
+
+def time_queries(query, pairs):
+    """Run query(start, end) for every pair; return per-query times (ms) and number of routes found"""
+    times = []
+    found = 0
+    for start, end in pairs:
+        t0 = time.perf_counter()
+        result = query(start, end)
+        times.append((time.perf_counter() - t0) * 1000)
+        if result is not None:
+            found += 1
+    return np.array(times), found
+
+
+def report(name, times, found, num_pairs):
+    print(f"  {name:20s} total {times.sum():8.1f}ms | median {np.median(times):6.2f}ms | "
+          f"p95 {np.percentile(times, 95):6.2f}ms | {found}/{num_pairs} found")
+
+
+if __name__ == "__main__":
+    num_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 42
+
+    print("="*80)
+    print("PYTHON ROUTING ENGINE BENCHMARK")
+    print("="*80)
+
+    graph = RoutingGraph.from_csv()
+    pairs = random_od_pairs(graph, num_pairs, seed)
+    print(f"\n📊 {graph.num_nodes} nodes, {graph.num_edges} edges, {num_pairs} OD pairs\n")
+
+    t0 = time.perf_counter()
+    graph.landmarks
+    print(f"🗺️  {len(graph.landmarks.ids)} ALT landmarks in {(time.perf_counter() - t0) * 1000:.0f}ms\n")
+
+    for mode, weight_factor in ROUTE_MODES.items():
+        for name, use_landmarks in (('A*', False), ('A* ALT', True)):
+            expanded = []
+
+            def query(s, t):
+                route = graph.astar(s, t, weight_factor, use_landmarks=use_landmarks)
+                expanded.append(graph.last_expanded)
+                return route
+
+            times, found = time_queries(query, pairs)
+            report(f"{name} {mode}", times, found, num_pairs)
+            print(f"  {'':20s} {sum(expanded)} nodes expanded")
+
+    if os.path.exists(CH_PATH):
+        stale = graph.attach_hierarchies(load_overlay(CH_PATH))
+        print(f"\n⚡ Contraction hierarchies ({CH_PATH}{', stale: ' + ', '.join(stale) if stale else ''})")
+        for mode, weight_factor in ROUTE_MODES.items():
+            if mode not in graph.hierarchies:
+                continue
+            times, found = time_queries(lambda s, t: graph.ch_query(s, t, weight_factor), pairs)
+            report(f"CH {mode}", times, found, num_pairs)
+    else:
+        print(f"\n(no {CH_PATH}; run contraction_hierarchy.py to benchmark CH queries)")
@@ -1,323 +1,362 @@
 """
 Calculate intelligent weights for each intersection in downtown Toronto
 Uses crime RATES (already normalized by population) + POI density + street type
+
+Intersections are weighed in spatial chunks (one grid cell of CHUNK_CELL_M each), so a
+full-city extract can be spread over worker processes. Chunks are merged back in
+intersection order, so the output is identical for any number of workers.
+
+Usage: python calculate_intersection_weights.py [workers]   (default: all cores, 1 = in-process)
 """
 import json
+import os
+import sys
+import time
 import pandas as pd
 import numpy as np
-from shapely.geometry import shape, Point, LineString
-from shapely.ops import nearest_points
-from collections import defaultdict
-import math
-
-print("="*80)
-print("CALCULATING INTERSECTION WEIGHTS FOR DOWNTOWN TORONTO")
-print("="*80)
-
-# ===========================
-# STEP 1: Load Crime Data
-# ===========================
-print("\n📊 Loading crime data...")
-crime_df = pd.read_csv('Neighbourhood_Crime_Rates_Open_Data_6759951416839911996.csv')
-
-# Use RATE columns (already normalized by population)
-rate_cols_2024 = [col for col in crime_df.columns if '2024' in col and 'RATE' in col]
-print(f"Found {len(rate_cols_2024)} crime rate columns for 2024")
-
-# Calculate weighted risk score using RATES
-weights = {
-    'HOMICIDE': 10.0,
-    'SHOOTING': 10.0,
-    'ROBBERY': 5.0,
-    'ASSAULT': 3.0,
-    'BREAKENTER': 2.0,
-    'AUTOTHEFT': 2.0,
-    'THEFTFROMMV': 1.0,
-    'THEFTOVER': 1.0,
-    'BIKETHEFT': 1.0
+import shapely
+from shapely import STRtree
+from shapely.geometry import shape
+from multiprocessing import get_context
+
+from geoparquet import INTERSECTION_LAYOUT, parquet_available, write_geoparquet
+from spatial_index import PointIndex, project
+from street_network import StreetNetwork
+from risk_model import (CRIME_YEAR, CRIME_SHARE, POI_SHARE, STREET_SHARE, DEGREE_SHARE,
+                        rate_columns, add_risk_scores, risk_by_neighborhood, node_category)
+
+CRIME_RATES_CSV = 'Neighbourhood_Crime_Rates_Open_Data_6759951416839911996.csv'
+NEIGHBORHOODS_GEOJSON = 'Neighbourhood_Crime_Rates_Open_Data_-5291801778870948764.geojson'
+
+# POI counts are computed for every radius in one pass; the weight uses POI_DENSITY_RADIUS_M
+POI_RADII_M = (50, 100, 250)
+POI_DENSITY_RADIUS_M = 100
+
+# Street type importance (feature 3)
+HIGHWAY_PRIORITIES = {
+    'motorway': 1.0,
+    'trunk': 0.9,
+    'primary': 0.8,
+    'secondary': 0.7,
+    'tertiary': 0.6,
+    'residential': 0.4,
+    'service': 0.2,
+    'footway': 0.1,
+    'path': 0.1,
+    'cycleway': 0.1,
+    'steps': 0.1,
+    'unclassified': 0.3
 }
 
-crime_df['RISK_SCORE'] = 0
-for col in rate_cols_2024:
-    crime_type = col.split('_')[0]
-    if crime_type in weights:
-        crime_df['RISK_SCORE'] += crime_df[col] * weights[crime_type]
-
-# Normalize 0-1
-crime_df['RISK_NORMALIZED'] = (crime_df['RISK_SCORE'] - crime_df['RISK_SCORE'].min()) / \
-                               (crime_df['RISK_SCORE'].max() - crime_df['RISK_SCORE'].min())
-
-print(f"Risk scores calculated for {len(crime_df)} neighborhoods")
-print(f"  Min: {crime_df['RISK_NORMALIZED'].min():.3f}")
-print(f"  Max: {crime_df['RISK_NORMALIZED'].max():.3f}")
-print(f"  Mean: {crime_df['RISK_NORMALIZED'].mean():.3f}")
-
-# ===========================
-# STEP 2: Load Neighborhood Boundaries
-# ===========================
-print("\n🗺️  Loading neighborhood boundaries...")
-with open('Neighbourhood_Crime_Rates_Open_Data_-5291801778870948764.geojson', 'r') as f:
-    neighborhoods = json.load(f)
-
-neighborhood_shapes = {}
-neighborhood_risk = {}
-
-for feature in neighborhoods['features']:
-    name = feature['properties'].get('AREA_NAME') or feature['properties'].get('NEIGHBOURHOOD_NAME')
-    if name:
-        neighborhood_shapes[name] = shape(feature['geometry'])
-        # Get risk from crime_df
-        risk_row = crime_df[crime_df['NEIGHBOURHOOD_NAME'] == name]
-        if not risk_row.empty:
-            neighborhood_risk[name] = risk_row['RISK_NORMALIZED'].values[0]
-        else:
-            neighborhood_risk[name] = 0.5  # default
-
-print(f"Loaded {len(neighborhood_shapes)} neighborhood polygons")
-
-# ===========================
-# STEP 3: Load Downtown Streets
-# ===========================
-print("\n🛣️  Loading downtown streets...")
-with open('downtown_streets.geojson', 'r') as f:
-    streets_data = json.load(f)
-
-print(f"Loaded {len(streets_data['features'])} streets")
-
-# ===========================
-# STEP 4: Load POIs and Build Spatial Index
-# ===========================
-print("\n🏪 Loading POIs...")
-with open('downtown_pois.geojson', 'r') as f:
-    pois_data = json.load(f)
-
-# Create grid-based spatial index for fast lookup
-poi_grid = defaultdict(list)
-grid_size = 0.002  # ~200m
-
-for poi in pois_data['features']:
-    geom = shape(poi['geometry'])
-    if geom.geom_type == 'Point':
-        pt = geom
+# Side of the grid cells intersections are partitioned into for parallel weighing
+CHUNK_CELL_M = 1000.0
+
+# Set in each worker by _init_worker (or in-process when running with 1 worker)
+_weigher = None
+
+
+class IntersectionWeigher:
+    """Neighborhood polygons and POI index needed to weigh any chunk of intersections"""
+
+    def __init__(self, neighborhood_names, neighborhood_polygons, neighborhood_risk, poi_points):
+        self.neighborhood_names = np.asarray(neighborhood_names, dtype=object)
+        self.neighborhood_risk = neighborhood_risk
+        # STRtree over the polygons for bulk point-in-polygon joins
+        self.neighborhood_tree = STRtree(list(neighborhood_polygons))
+        # KD-tree over POI locations in projected meters
+        self.poi_index = PointIndex(poi_points[:, 1], poi_points[:, 0])
+
+    def assign_neighborhoods(self, lons, lats):
+        """
+        Spatial join: neighborhood name and risk for every point at once.
+        Points outside all polygons get 'Unknown' / 0.5; a point on a boundary counts
+        as inside, and one on a shared boundary takes the first polygon in file order.
+        """
+        points = shapely.points(lons, lats)
+        point_idx, poly_idx = self.neighborhood_tree.query(points, predicate='intersects')
+
+        # Keep the lowest polygon index per point
+        order = np.lexsort((poly_idx, point_idx))
+        point_idx, poly_idx = point_idx[order], poly_idx[order]
+        first = np.unique(point_idx, return_index=True)[1]
+
+        names = np.full(len(points), 'Unknown', dtype=object)
+        names[point_idx[first]] = self.neighborhood_names[poly_idx[first]]
+        risks = pd.Series(names).map(self.neighborhood_risk).fillna(0.5).to_numpy()
+        return names, risks
+
+    def weigh(self, coords, street_priorities):
+        """
+        Weight rows for intersections at coords ((lon, lat) pairs), given the
+        highway priorities of the streets meeting at each one.
+        """
+        # Feature 1 (bulk): neighborhood risk score via one spatial join for the chunk
+        neighborhoods, risks = self.assign_neighborhoods(coords[:, 0], coords[:, 1])
+
+        # Feature 2 (bulk): POI counts within each radius in one KD-tree pass
+        poi_counts = self.poi_index.count_within_radii(coords[:, 1], coords[:, 0], POI_RADII_M)
+
+        rows = []
+        for i, priorities in enumerate(street_priorities):
+            # Feature 1: Neighborhood risk score
+            risk_score = float(risks[i])
+
+            # Feature 2: POI density (count within POI_DENSITY_RADIUS_M), normalized 0-1, cap at 50
+            num_pois = int(poi_counts[POI_DENSITY_RADIUS_M][i])
+            poi_density = min(num_pois / 50.0, 1.0)
+
+            # Feature 3: Street type importance (average of connected streets)
+            avg_street_priority = float(np.mean(priorities)) if priorities else 0.3
+
+            # Feature 4: Number of connected streets (degree)
+            degree = len(priorities)
+            degree_normalized = min(degree / 8.0, 1.0)  # cap at 8 streets
+
+            # ===========================
+            # WEIGHT FORMULA
+            # ===========================
+            # Components:
+            # 1. Base weight from neighborhood crime rate (40%)
+            # 2. POI density contribution (20%) - more POIs = more activity = potential risk
+            # 3. Street importance (20%) - major roads = more exposure
+            # 4. Intersection complexity (20%) - more streets = more conflict points
+            weight_components = {
+                'crime_rate': risk_score * CRIME_SHARE,
+                'poi_density': poi_density * POI_SHARE,
+                'street_importance': avg_street_priority * STREET_SHARE,
+                'degree': degree_normalized * DEGREE_SHARE
+            }
+
+            # Scale to meaningful range (0-100)
+            final_weight = sum(weight_components.values()) * 100
+            category, color = node_category(final_weight)
+
+            rows.append({
+                'lat': coords[i, 1],
+                'lon': coords[i, 0],
+                'neighborhood': neighborhoods[i],
+                'num_streets': degree,
+                'num_pois_nearby': num_pois,
+                **{f'num_pois_{r}m': int(poi_counts[r][i]) for r in POI_RADII_M},
+                'risk_score': round(risk_score, 3),
+                'poi_density': round(poi_density, 3),
+                'street_importance': round(avg_street_priority, 3),
+                'degree_normalized': round(degree_normalized, 3),
+                'weight': round(final_weight, 2),
+                'category': category,
+                'color': color,
+                'weight_breakdown': {
+                    'crime_contribution': round(weight_components['crime_rate'] * 100, 2),
+                    'poi_contribution': round(weight_components['poi_density'] * 100, 2),
+                    'street_contribution': round(weight_components['street_importance'] * 100, 2),
+                    'degree_contribution': round(weight_components['degree'] * 100, 2)
+                }
+            })
+        return rows
+
+
+def _init_worker(*weigher_args):
+    global _weigher
+    _weigher = IntersectionWeigher(*weigher_args)
+
+
+def _weigh_chunk(task):
+    """Weigh one spatial chunk in a worker; returns (intersection indices, rows)"""
+    indices, coords, street_priorities = task
+    return indices, _weigher.weigh(coords, street_priorities)
+
+
+def spatial_chunks(coords, cell_m=CHUNK_CELL_M):
+    """Intersection indices grouped by grid cell (row-major order), one array per non-empty cell"""
+    cells = np.floor(project(coords[:, 1], coords[:, 0]) / cell_m).astype(np.int64)
+    order = np.lexsort((cells[:, 0], cells[:, 1]))
+    cells = cells[order]
+    breaks = np.flatnonzero((np.diff(cells, axis=0) != 0).any(axis=1)) + 1
+    return np.split(order, breaks)
+
+
+def weigh_intersections(coords, street_priorities, weigher_args, workers=1):
+    """
+    Weight rows for every intersection, computed chunk by chunk (in a spawn pool if workers > 1)
+    and returned in the original intersection order.
+    """
+    tasks = [(chunk, coords[chunk], [street_priorities[i] for i in chunk.tolist()])
+             for chunk in spatial_chunks(coords)]
+    rows = [None] * len(coords)
+
+    if workers > 1:
+        with get_context('spawn').Pool(workers, initializer=_init_worker, initargs=weigher_args) as pool:
+            results = pool.imap_unordered(_weigh_chunk, tasks)
+            for indices, chunk_rows in results:
+                for i, row in zip(indices.tolist(), chunk_rows):
+                    rows[i] = row
     else:
-        pt = geom.centroid
-    
-    # Assign to grid cell
-    grid_x = int(pt.x / grid_size)
-    grid_y = int(pt.y / grid_size)
-    poi_grid[(grid_x, grid_y)].append(pt)
-
-print(f"Loaded {sum(len(pois) for pois in poi_grid.values())} POIs into spatial grid")
-
-# ===========================
-# STEP 5: Extract Intersections
-# ===========================
-print("\n🔗 Extracting intersections from street network...")
-
-# Build adjacency: coord -> list of street indices
-coord_to_streets = defaultdict(list)
-
-for i, street in enumerate(streets_data['features']):
-    geom = shape(street['geometry'])
-    if geom.geom_type == 'LineString':
-        coords = list(geom.coords)
-        # Start and end points are intersections
-        start = (round(coords[0][0], 6), round(coords[0][1], 6))
-        end = (round(coords[-1][0], 6), round(coords[-1][1], 6))
-        
-        coord_to_streets[start].append(i)
-        coord_to_streets[end].append(i)
-
-# Intersections are points where 2+ streets meet
-intersections = {coord: streets for coord, streets in coord_to_streets.items() 
-                 if len(streets) >= 2}
-
-print(f"Found {len(intersections)} intersections (2+ streets)")
-
-# ===========================
-# STEP 6: Calculate Weight for Each Intersection
-# ===========================
-print("\n⚖️  Calculating weights for intersections...")
-
-intersection_data = []
-
-for coord, street_indices in intersections.items():
-    point = Point(coord[0], coord[1])
-    
-    # Feature 1: Neighborhood risk score
-    neighborhood_name = "Unknown"
-    risk_score = 0.5  # default
-    
-    for name, poly in neighborhood_shapes.items():
-        if poly.contains(point):
-            neighborhood_name = name
-            risk_score = neighborhood_risk.get(name, 0.5)
-            break
-    
-    # Feature 2: POI density (count within 100m using spatial grid)
-    buffer_dist = 0.001  # ~100m
-    
-    # Check nearby grid cells
-    grid_x = int(coord[0] / grid_size)
-    grid_y = int(coord[1] / grid_size)
-    
-    num_pois = 0
-    # Check this cell and 8 neighbors
-    for dx in [-1, 0, 1]:
-        for dy in [-1, 0, 1]:
-            cell = (grid_x + dx, grid_y + dy)
-            if cell in poi_grid:
-                for poi_pt in poi_grid[cell]:
-                    if point.distance(poi_pt) <= buffer_dist:
-                        num_pois += 1
-    
-    # Normalize POI count (0-1 scale, cap at 50)
-    poi_density = min(num_pois / 50.0, 1.0)
-    
-    # Feature 3: Street type importance (average of connected streets)
-    highway_priorities = {
-        'motorway': 1.0,
-        'trunk': 0.9,
-        'primary': 0.8,
-        'secondary': 0.7,
-        'tertiary': 0.6,
-        'residential': 0.4,
-        'service': 0.2,
-        'footway': 0.1,
-        'path': 0.1,
-        'cycleway': 0.1,
-        'steps': 0.1,
-        'unclassified': 0.3
-    }
-    
-    street_priorities = []
-    for idx in street_indices:
-        street = streets_data['features'][idx]
-        highway_type = street['properties'].get('highway', 'unclassified')
-        priority = highway_priorities.get(highway_type, 0.3)
-        street_priorities.append(priority)
-    
-    avg_street_priority = np.mean(street_priorities) if street_priorities else 0.3
-    
-    # Feature 4: Number of connected streets (degree)
-    degree = len(street_indices)
-    degree_normalized = min(degree / 8.0, 1.0)  # cap at 8 streets
-    
+        _init_worker(*weigher_args)
+        for task in tasks:
+            indices, chunk_rows = _weigh_chunk(task)
+            for i, row in zip(indices.tolist(), chunk_rows):
+                rows[i] = row
+    return rows, len(tasks)
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+
+    print("="*80)
+    print("CALCULATING INTERSECTION WEIGHTS FOR DOWNTOWN TORONTO")
+    print("="*80)
+
     # ===========================
-    # WEIGHT FORMULA
+    # STEP 1: Load Crime Data
     # ===========================
-    # Components:
-    # 1. Base weight from neighborhood crime rate (40%)
-    # 2. POI density contribution (20%) - more POIs = more activity = potential risk
-    # 3. Street importance (20%) - major roads = more exposure
-    # 4. Intersection complexity (20%) - more streets = more conflict points
-    
-    weight_components = {
-        'crime_rate': risk_score * 0.40,
-        'poi_density': poi_density * 0.20,
-        'street_importance': avg_street_priority * 0.20,
-        'degree': degree_normalized * 0.20
-    }
-    
-    total_weight = sum(weight_components.values())
-    
-    # Scale to meaningful range (0-100)
-    final_weight = total_weight * 100
-    
-    # Categorize
-    if final_weight < 30:
-        category = 'Low'
-        color = '#00ff00'  # green
-    elif final_weight < 60:
-        category = 'Medium'
-        color = '#ffff00'  # yellow
+    print("\n📊 Loading crime data...")
+    crime_df = pd.read_csv(CRIME_RATES_CSV)
+
+    # Use RATE columns (already normalized by population)
+    print(f"Found {len(rate_columns(crime_df))} crime rate columns for {CRIME_YEAR}")
+
+    # Calculate weighted risk score using RATES, normalized 0-1 (see risk_model.py)
+    add_risk_scores(crime_df)
+
+    print(f"Risk scores calculated for {len(crime_df)} neighborhoods")
+    print(f"  Min: {crime_df['RISK_NORMALIZED'].min():.3f}")
+    print(f"  Max: {crime_df['RISK_NORMALIZED'].max():.3f}")
+    print(f"  Mean: {crime_df['RISK_NORMALIZED'].mean():.3f}")
+
+    # ===========================
+    # STEP 2: Load Neighborhood Boundaries
+    # ===========================
+    print("\n🗺️  Loading neighborhood boundaries...")
+    with open(NEIGHBORHOODS_GEOJSON, 'r') as f:
+        neighborhoods = json.load(f)
+
+    neighborhood_shapes = {}
+
+    for feature in neighborhoods['features']:
+        name = feature['properties'].get('AREA_NAME') or feature['properties'].get('NEIGHBOURHOOD_NAME')
+        if name:
+            neighborhood_shapes[name] = shape(feature['geometry'])
+
+    # Risk per neighborhood via a join on the name (0.5 default for names missing from the CSV)
+    neighborhood_risk = risk_by_neighborhood(crime_df).reindex(list(neighborhood_shapes)).fillna(0.5).to_dict()
+
+    print(f"Loaded {len(neighborhood_shapes)} neighborhood polygons")
+
+    # ===========================
+    # STEP 3: Load Downtown Streets
+    # ===========================
+    print("\n🛣️  Loading downtown streets...")
+    with open('downtown_streets.geojson', 'r') as f:
+        streets_data = json.load(f)
+
+    print(f"Loaded {len(streets_data['features'])} streets")
+
+    # ===========================
+    # STEP 4: Load POIs
+    # ===========================
+    print("\n🏪 Loading POIs...")
+    with open('downtown_pois.geojson', 'r') as f:
+        pois_data = json.load(f)
+
+    poi_points = []
+    for poi in pois_data['features']:
+        geom = shape(poi['geometry'])
+        pt = geom if geom.geom_type == 'Point' else geom.centroid
+        poi_points.append((pt.x, pt.y))
+
+    poi_points = np.array(poi_points).reshape(-1, 2)
+
+    print(f"Loaded {len(poi_points)} POIs")
+
+    # ===========================
+    # STEP 5: Extract Intersections
+    # ===========================
+    print("\n🔗 Extracting intersections from street network...")
+
+    # Intersections are vertices shared by 2+ street parts - street ends and interior
+    # crossings alike, the same split points create_routing_graph.py uses (see street_network.py)
+    network = StreetNetwork(streets_data['features'])
+    intersection_vertices, intersection_streets = network.intersections()
+    intersection_coords = network.vertex_coords[intersection_vertices]  # (lon, lat) pairs
+
+    print(f"Found {len(intersection_coords)} intersections (2+ streets)")
+
+    # ===========================
+    # STEP 6: Calculate Weight for Each Intersection
+    # ===========================
+    print(f"\n⚖️  Calculating weights for intersections ({workers} worker{'s' if workers > 1 else ''})...")
+
+    feature_priority = [HIGHWAY_PRIORITIES.get(street['properties'].get('highway', 'unclassified'), 0.3)
+                        for street in streets_data['features']]
+    street_priorities = [[feature_priority[idx] for idx in streets] for streets in intersection_streets]
+    weigher_args = (list(neighborhood_shapes), list(neighborhood_shapes.values()), neighborhood_risk, poi_points)
+
+    t0 = time.perf_counter()
+    intersection_data, num_chunks = weigh_intersections(intersection_coords, street_priorities,
+                                                        weigher_args, workers)
+    print(f"  {num_chunks} chunks of {CHUNK_CELL_M:.0f}m in {time.perf_counter() - t0:.2f}s")
+
+    # Convert to DataFrame
+    df = pd.DataFrame(intersection_data)
+
+    print(f"\n✅ Calculated weights for {len(df)} intersections")
+    print("\n📊 Weight Statistics:")
+    print(df['weight'].describe())
+
+    print("\n📈 Category Distribution:")
+    print(df['category'].value_counts())
+
+    print("\n🔴 Top 10 Most Dangerous Intersections:")
+    top_dangerous = df.nlargest(10, 'weight')[['lat', 'lon', 'neighborhood', 'weight', 'num_pois_nearby', 'num_streets']]
+    print(top_dangerous.to_string(index=False))
+
+    print("\n🟢 Top 10 Safest Intersections:")
+    top_safe = df.nsmallest(10, 'weight')[['lat', 'lon', 'neighborhood', 'weight', 'num_pois_nearby', 'num_streets']]
+    print(top_safe.to_string(index=False))
+
+    # ===========================
+    # STEP 7: Save Results
+    # ===========================
+    print("\n💾 Saving results...")
+
+    # Save as CSV
+    df.to_csv('intersection_weights.csv', index=False)
+    print("  ✅ intersection_weights.csv")
+
+    # Save as GeoParquet for the next stages (float32 coordinates, WKB points; see geoparquet.py)
+    if parquet_available():
+        write_geoparquet('intersection_weights.parquet', df.assign(weight_breakdown=df['weight_breakdown'].astype(str)),
+                         shapely.points(df['lon'].to_numpy(), df['lat'].to_numpy()), **INTERSECTION_LAYOUT)
+        print("  ✅ intersection_weights.parquet")
     else:
-        category = 'High'
-        color = '#ff0000'  # red
-    
-    intersection_data.append({
-        'lat': coord[1],
-        'lon': coord[0],
-        'neighborhood': neighborhood_name,
-        'num_streets': degree,
-        'num_pois_nearby': num_pois,
-        'risk_score': round(risk_score, 3),
-        'poi_density': round(poi_density, 3),
-        'street_importance': round(avg_street_priority, 3),
-        'degree_normalized': round(degree_normalized, 3),
-        'weight': round(final_weight, 2),
-        'category': category,
-        'color': color,
-        'weight_breakdown': {
-            'crime_contribution': round(weight_components['crime_rate'] * 100, 2),
-            'poi_contribution': round(weight_components['poi_density'] * 100, 2),
-            'street_contribution': round(weight_components['street_importance'] * 100, 2),
-            'degree_contribution': round(weight_components['degree'] * 100, 2)
-        }
-    })
-
-# Convert to DataFrame
-df = pd.DataFrame(intersection_data)
-
-print(f"\n✅ Calculated weights for {len(df)} intersections")
-print("\n📊 Weight Statistics:")
-print(df['weight'].describe())
-
-print("\n📈 Category Distribution:")
-print(df['category'].value_counts())
-
-print("\n🔴 Top 10 Most Dangerous Intersections:")
-top_dangerous = df.nlargest(10, 'weight')[['lat', 'lon', 'neighborhood', 'weight', 'num_pois_nearby', 'num_streets']]
-print(top_dangerous.to_string(index=False))
-
-print("\n🟢 Top 10 Safest Intersections:")
-top_safe = df.nsmallest(10, 'weight')[['lat', 'lon', 'neighborhood', 'weight', 'num_pois_nearby', 'num_streets']]
-print(top_safe.to_string(index=False))
-
-# ===========================
-# STEP 7: Save Results
-# ===========================
-print("\n💾 Saving results...")
-
-# Save as CSV
-df.to_csv('intersection_weights.csv', index=False)
-print("  ✅ intersection_weights.csv")
-
-# Save as GeoJSON for mapping
-geojson_features = []
-for _, row in df.iterrows():
-    feature = {
-        'type': 'Feature',
-        'geometry': {
-            'type': 'Point',
-            'coordinates': [row['lon'], row['lat']]
-        },
-        'properties': {
-            'neighborhood': row['neighborhood'],
-            'weight': row['weight'],
-            'category': row['category'],
-            'color': row['color'],
-            'num_streets': row['num_streets'],
-            'num_pois_nearby': row['num_pois_nearby'],
-            'risk_score': row['risk_score'],
-            'breakdown': row['weight_breakdown']
+        print("  ⚠️  pyarrow not installed, skipping intersection_weights.parquet")
+
+    # Save as GeoJSON for mapping (columns to Python lists once instead of a per-row iterrows loop)
+    property_columns = ['neighborhood', 'weight', 'category', 'color', 'num_streets', 'num_pois_nearby', 'risk_score']
+    geojson_features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+            'properties': {**properties, 'breakdown': breakdown}
         }
+        for lon, lat, properties, breakdown in zip(df['lon'].tolist(), df['lat'].tolist(),
+                                                   df[property_columns].to_dict('records'),
+                                                   df['weight_breakdown'].tolist())
+    ]
+
+    intersection_geojson = {
+        'type': 'FeatureCollection',
+        'features': geojson_features
     }
-    geojson_features.append(feature)
-
-intersection_geojson = {
-    'type': 'FeatureCollection',
-    'features': geojson_features
-}
 
-with open('intersection_weights.geojson', 'w') as f:
-    json.dump(intersection_geojson, f, indent=2)
-print("  ✅ intersection_weights.geojson")
-
-print("\n" + "="*80)
-print("✅ WEIGHT CALCULATION COMPLETE")
-print("="*80)
-print("\n💡 Next steps:")
-print("  1. Visualize intersection_weights.geojson on your HTML map")
-print("  2. Use weights for routing algorithm")
-print("  3. Analyze patterns in weight distribution")
+    with open('intersection_weights.geojson', 'w') as f:
+        json.dump(intersection_geojson, f)
+    print("  ✅ intersection_weights.geojson")
+
+    print("\n" + "="*80)
+    print("✅ WEIGHT CALCULATION COMPLETE")
+    print("="*80)
+    print("\n💡 Next steps:")
+    print("  1. Visualize intersection_weights.geojson on your HTML map")
+    print("  2. Use weights for routing algorithm")
+    print("  3. Analyze patterns in weight distribution")
@@ -0,0 +1,227 @@
+"""
+Chat and live-incident API for SafeRoute AI
+Long-lived worker service behind server.js /chat and /fetch-live-crimes. google.genai,
+playwright, bs4 and requests are imported once and the Gemini client is created once.
+The gtaupdate.com incident table is kept in memory by incident_feed.IncidentFeed, which
+re-checks it in the background with conditional GETs; chat context and the map's crime
+events are read from that snapshot, so each message only pays for the model call and
+/fetch-live-crimes answers immediately.
+
+Messages run on a small pool of warm worker threads. At most CHAT_WORKERS run at
+once, up to CHAT_QUEUE_SIZE more wait for a free worker and anything beyond that is
+rejected with 503. A message that takes longer than CHAT_TIMEOUT_S gets a 504.
+
+POST /chat {"street": ..., "time": ..., "situation": ...}   -> {"reply": ...}
+GET  /chat-status                    pool size, queue, timeouts and latency
+GET  /fetch-live-crimes              geocoded crime events from the current incident snapshot
+GET  /incident-feed                  feed freshness, version and 304 / error counts
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import gemini_api
+from extraction_cache import ExtractionCache
+from fetch_live_crimes import build_crime_events
+from incident_feed import IncidentFeed, GTA_UPDATE_URL
+
+PORT = int(os.getenv('CHAT_SERVER_PORT', '3002'))
+CHAT_WORKERS = int(os.getenv('CHAT_WORKERS', '4'))            # messages sent to Gemini at once
+CHAT_QUEUE_SIZE = int(os.getenv('CHAT_QUEUE_SIZE', '16'))     # messages waiting for a worker
+CHAT_TIMEOUT_S = float(os.getenv('CHAT_TIMEOUT_S', '30'))     # per message, queue wait included
+INCIDENT_REFRESH_S = float(os.getenv('INCIDENT_REFRESH_S', '120'))  # gtaupdate.com re-check interval
+INCIDENT_TTL_S = float(os.getenv('INCIDENT_TTL_S', '900'))          # stop serving a snapshot this old
+
+
+class LiveCrimes:
+    """
+    Map-ready crime events, rebuilt (Gemini + geocoding) only when the incident table changes.
+    Runs on the feed's callback thread; the previous events are served until the rebuild finishes.
+    Extractions are memoized per incident, so a refresh only sends new rows to the model.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else ExtractionCache()
+        self.events = []
+        self.updated_at = None
+
+    def update(self, incidents):
+        try:
+            self.events = build_crime_events(incidents, self.cache)
+        except Exception as e:  # keep the previous events if extraction fails
+            print(f"[chat] Crime event extraction failed: {e}", file=sys.stderr)
+            return
+        self.updated_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+
+class ChatPool:
+    """Warm worker threads answering chat messages with a bounded queue and a per-message timeout"""
+
+    def __init__(self, feed, workers=CHAT_WORKERS, queue_size=CHAT_QUEUE_SIZE, timeout_s=CHAT_TIMEOUT_S):
+        self.feed = feed
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout_s = timeout_s
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='chat')
+        # A slot is held from admission until the model call really finishes (even after a timeout)
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_seconds = 0.0
+
+    def _answer(self, message):
+        user_input = gemini_api.format_user_input(message)
+        return asyncio.run(gemini_api.chat(user_input, self.feed.get()))
+
+    def _release(self, future):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def submit(self, message):
+        """Answer one message; returns (status, payload)"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            return 503, {'error': 'Chat service busy, try again shortly'}
+
+        with self._lock:
+            self.in_flight += 1
+        t0 = time.perf_counter()
+        future = self._executor.submit(self._answer, message)
+        future.add_done_callback(self._release)
+        try:
+            reply = future.result(timeout=self.timeout_s)
+        except FutureTimeout:
+            with self._lock:
+                self.timed_out += 1
+            return 504, {'error': f'Chat response took longer than {self.timeout_s:g}s'}
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            print(f"[chat] Gemini error: {e}", file=sys.stderr)
+            return 500, {'error': 'Chat model error'}
+
+        with self._lock:
+            self.completed += 1
+            self.total_seconds += time.perf_counter() - t0
+        return 200, {'reply': reply}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'timeout_s': self.timeout_s,
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'avg_ms': self.total_seconds / self.completed * 1000 if self.completed else 0.0
+            }
+
+
+feed = None
+live_crimes = None
+pool = None
+
+
+def handle_chat(params, body=None):
+    """Answer a {street, time, situation} message from chat.js"""
+    try:
+        message = json.loads(body or b'{}')
+    except json.JSONDecodeError:
+        return 400, {'error': 'Invalid JSON body'}
+    if not isinstance(message, dict):
+        return 400, {'error': 'Expected a JSON object'}
+    return pool.submit(message)
+
+
+def handle_chat_status(params, body=None):
+    return 200, pool.stats()
+
+
+def handle_live_crimes(params, body=None):
+    """Crime events for app.js fetchLiveCrimes() from the in-memory snapshot"""
+    if not feed.is_fresh():
+        return 503, {'error': 'Live incident feed is unavailable, try again shortly'}
+    return 200, {
+        'success': True,
+        'events': live_crimes.events,
+        'count': len(live_crimes.events),
+        'source': feed.url,
+        'timestamp': live_crimes.updated_at
+    }
+
+
+def handle_incident_feed(params, body=None):
+    return 200, feed.stats()
+
+
+class ChatRequestHandler(BaseHTTPRequestHandler):
+    routes = {
+        ('POST', '/chat'): handle_chat,
+        ('GET', '/chat-status'): handle_chat_status,
+        ('GET', '/fetch-live-crimes'): handle_live_crimes,
+        ('GET', '/incident-feed'): handle_incident_feed
+    }
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def dispatch(self, method):
+        url = urlparse(self.path)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            self.send_json(404, {'error': 'Not found'})
+            return
+        body = None
+        if method == 'POST':
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        status, payload = handler(parse_qs(url.query), body)
+        self.send_json(status, payload)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        print(f"[chat] {format % args}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    gemini_api.get_client()
+    live_crimes = LiveCrimes()
+    feed = IncidentFeed(GTA_UPDATE_URL, INCIDENT_REFRESH_S, INCIDENT_TTL_S, on_change=live_crimes.update).start()
+    pool = ChatPool(feed)
+    print(f"🚨 Incident feed: {len(feed.get())} incidents from {feed.url} "
+          f"(refresh {INCIDENT_REFRESH_S:g}s, ttl {INCIDENT_TTL_S:g}s); mapping crime events in the background",
+          file=sys.stderr)
+    print(f"🤖 Chat workers ready: {CHAT_WORKERS} workers, queue {CHAT_QUEUE_SIZE}, "
+          f"timeout {CHAT_TIMEOUT_S:g}s ({(time.perf_counter() - t0) * 1000:.0f}ms)", file=sys.stderr)
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', PORT), ChatRequestHandler)
+    print(f"💬 Chat API running at http://127.0.0.1:{PORT}/", file=sys.stderr)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -1,17 +1,30 @@
-import json
+import numpy as np
 
-with open('routing_graph.json') as f:
-    g = json.load(f)
+from graph_artifact import open_graph_artifact
+
+g = open_graph_artifact('routing_graph.bin')
+
+num_nodes = int(np.isfinite(g['node_lat']).sum())
+degree = np.bincount(np.concatenate([g['edge_source'], g['edge_target']]),
+                     minlength=len(g['node_lat']))
+component = np.asarray(g['node_component'])
 
 test_nodes = ['1701', '3736', '2109', '1262', '5677', '4257']
 
 print("Checking node connectivity:")
 for n in test_nodes:
-    has_adj = n in g['adjacency_list']
-    status = "CONNECTED" if has_adj else "ISOLATED"
+    has_adj = int(n) < len(degree) and degree[int(n)] > 0
+    if not has_adj:
+        status = "ISOLATED"
+    elif component[int(n)] == 0:
+        status = "CONNECTED"
+    else:
+        status = f"ISLAND (component {component[int(n)]})"
     print(f"  Node {n}: {status}")
     
 print(f"\n📊 Summary:")
-print(f"  Total nodes: {len(g['nodes'])}")
-print(f"  Nodes with neighbors: {len(g['adjacency_list'])}")
-print(f"  Isolated nodes: {len(g['nodes']) - len(g['adjacency_list'])}")
+print(f"  Total nodes: {num_nodes}")
+print(f"  Nodes with neighbors: {int((degree > 0).sum())}")
+print(f"  Isolated nodes: {num_nodes - int((degree > 0).sum())}")
+print(f"  Main network: {int((component == 0).sum())} nodes")
+print(f"  Other components: {int(component.max())} ({int((component > 0).sum())} nodes)")
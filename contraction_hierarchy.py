@@ -0,0 +1,309 @@
+"""
+Contraction hierarchies (CH) for the routing graph
+Offline stage: contract nodes one by one (edge-difference order, lazy updates,
+bounded witness search) and record the shortcuts needed to keep distances exact.
+Query stage: bidirectional Dijkstra that only climbs to higher-ranked nodes,
+then shortcuts are unpacked back into street edges for build_route().
+
+One hierarchy is built per route mode because each weightFactor is a different metric.
+Hierarchies ignore live incidents - RoutingGraph falls back to A* while incidents are active.
+
+Usage: python contraction_hierarchy.py [graph path]   (writes routing_ch.npz)
+"""
+import heapq
+import numpy as np
+
+DEFAULT_PATH = 'routing_ch.npz'
+
+# Witness searches stop after settling this many nodes; a missed witness only
+# costs an unnecessary shortcut, never a wrong distance
+WITNESS_SETTLE_LIMIT = 60
+
+
+def edge_costs(graph, weight_factor):
+    """Per-edge cost for a weightFactor, same formula as RoutingGraph.arc_costs (without incidents)"""
+    lengths = np.zeros(graph.num_edges)
+    lengths[graph.edge_ids] = graph.lengths
+    return (lengths / 1000.0) * (1 - weight_factor) + graph.edge_weights * weight_factor
+
+
+def _witness_costs(adj, source, skip, max_cost):
+    """Bounded Dijkstra from source that avoids the node being contracted"""
+    dist = {source: 0.0}
+    heap = [(0.0, source)]
+    settled = 0
+    while heap and settled < WITNESS_SETTLE_LIMIT:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        if d > max_cost:
+            break
+        settled += 1
+        for v, (cost, _) in adj[u].items():
+            if v == skip:
+                continue
+            nd = d + cost
+            if nd < dist.get(v, float('inf')):
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+
+def _shortcuts_needed(adj, v):
+    """Shortcuts (u, w, cost, arc_uv, arc_vw) that contracting v would have to add"""
+    neighbors = list(adj[v].items())
+    shortcuts = []
+    for i, (u, (cost_u, arc_u)) in enumerate(neighbors):
+        targets = neighbors[i + 1:]
+        if not targets:
+            continue
+        max_cost = cost_u + max(cost_w for _, (cost_w, _) in targets)
+        witness = _witness_costs(adj, u, v, max_cost)
+        for w, (cost_w, arc_w) in targets:
+            via = cost_u + cost_w
+            if witness.get(w, float('inf')) > via:
+                shortcuts.append((u, w, via, arc_u, arc_w))
+    return shortcuts
+
+
+class ContractionHierarchy:
+    """
+    Upward CH graph in CSR form plus the arc table needed to unpack shortcuts.
+
+    up_offsets[u]:up_offsets[u + 1] are the arcs from u to higher-ranked nodes;
+    each CH arc is either a street edge (arc_edge >= 0) or a shortcut through
+    arc_middle built from arcs arc_first (touching arc_u) and arc_second (touching arc_v).
+    """
+
+    ARRAYS = ('rank', 'up_offsets', 'up_targets', 'up_costs', 'up_arcs',
+              'arc_u', 'arc_v', 'arc_edge', 'arc_middle', 'arc_first', 'arc_second', 'edge_costs')
+
+    def __init__(self, weight_factor, **arrays):
+        self.weight_factor = weight_factor
+        for name in self.ARRAYS:
+            setattr(self, name, np.asarray(arrays[name]))
+        self._up_offsets = self.up_offsets.tolist()
+        self._up_targets = self.up_targets.tolist()
+        self._up_costs = self.up_costs.tolist()
+        self._up_arcs = self.up_arcs.tolist()
+
+    @property
+    def num_shortcuts(self):
+        return int((self.arc_edge < 0).sum())
+
+    @classmethod
+    def build(cls, graph, weight_factor):
+        """Contract every node of graph under the weightFactor metric"""
+        num_nodes = graph.num_nodes
+        costs = edge_costs(graph, weight_factor)
+
+        # CH arc table; starts with one arc per street edge (parallel edges keep the cheapest)
+        arc_u, arc_v, arc_edge, arc_middle, arc_first, arc_second = [], [], [], [], [], []
+        adj = [dict() for _ in range(num_nodes)]
+
+        def add_arc(u, w, cost, edge=-1, middle=-1, first=-1, second=-1):
+            arc_u.append(u)
+            arc_v.append(w)
+            arc_edge.append(edge)
+            arc_middle.append(middle)
+            arc_first.append(first)
+            arc_second.append(second)
+            arc = len(arc_u) - 1
+            adj[u][w] = (cost, arc)
+            adj[w][u] = (cost, arc)
+
+        for edge, (u, w) in enumerate(zip(graph.sources.tolist(), graph.edge_targets.tolist())):
+            if u == w:
+                continue
+            if w not in adj[u] or costs[edge] < adj[u][w][0]:
+                add_arc(u, w, float(costs[edge]), edge=edge)
+
+        def priority(v):
+            return len(_shortcuts_needed(adj, v)) - len(adj[v]) + contracted_neighbors[v]
+
+        contracted_neighbors = [0] * num_nodes
+        heap = [(priority(v), v) for v in range(num_nodes)]
+        heapq.heapify(heap)
+
+        rank = np.zeros(num_nodes, dtype=np.int32)
+        up_lists = [None] * num_nodes
+        order = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            # Lazy update: re-evaluate and push back if v is no longer the cheapest
+            current = priority(v)
+            if heap and current > heap[0][0]:
+                heapq.heappush(heap, (current, v))
+                continue
+
+            for u, w, cost, first, second in _shortcuts_needed(adj, v):
+                if w not in adj[u] or cost < adj[u][w][0]:
+                    add_arc(u, w, cost, middle=v, first=first, second=second)
+
+            # Every remaining neighbor is uncontracted, i.e. ranked above v
+            up_lists[v] = [(w, cost, arc) for w, (cost, arc) in adj[v].items()]
+            for w in adj[v]:
+                del adj[w][v]
+                contracted_neighbors[w] += 1
+            adj[v] = {}
+            rank[v] = order
+            order += 1
+
+        up_offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum([len(arcs) for arcs in up_lists], out=up_offsets[1:])
+        flat = [arc for arcs in up_lists for arc in arcs]
+
+        return cls(
+            weight_factor,
+            rank=rank,
+            up_offsets=up_offsets,
+            up_targets=np.array([a[0] for a in flat], dtype=np.int32),
+            up_costs=np.array([a[1] for a in flat], dtype=np.float64),
+            up_arcs=np.array([a[2] for a in flat], dtype=np.int32),
+            arc_u=np.array(arc_u, dtype=np.int32),
+            arc_v=np.array(arc_v, dtype=np.int32),
+            arc_edge=np.array(arc_edge, dtype=np.int32),
+            arc_middle=np.array(arc_middle, dtype=np.int32),
+            arc_first=np.array(arc_first, dtype=np.int32),
+            arc_second=np.array(arc_second, dtype=np.int32),
+            edge_costs=costs
+        )
+
+    def query(self, start, end):
+        """
+        Bidirectional upward Dijkstra.
+        Returns (cost, list of (edge id, from node) in travel order), or None if unreachable.
+        """
+        if start == end:
+            return 0.0, []
+
+        offsets, targets, costs, up_arcs = self._up_offsets, self._up_targets, self._up_costs, self._up_arcs
+        dist = ({start: 0.0}, {end: 0.0})
+        parent = ({}, {})
+        heaps = ([(0.0, start)], [(0.0, end)])
+        best = float('inf')
+        meeting = None
+
+        while heaps[0] or heaps[1]:
+            # Advance the side with the smaller frontier; stop once neither can improve best
+            side = 0 if heaps[0] and (not heaps[1] or heaps[0][0][0] <= heaps[1][0][0]) else 1
+            d, u = heapq.heappop(heaps[side])
+            if d >= best:
+                if not heaps[1 - side] or heaps[1 - side][0][0] >= best:
+                    break
+                heaps[side].clear()
+                continue
+            if d > dist[side][u]:
+                continue
+
+            mine, other = dist[side], dist[1 - side]
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                nd = d + costs[i]
+                if nd < mine.get(v, float('inf')):
+                    mine[v] = nd
+                    parent[side][v] = (u, up_arcs[i])
+                    heapq.heappush(heaps[side], (nd, v))
+                    if v in other and nd + other[v] < best:
+                        best = nd + other[v]
+                        meeting = v
+            if u in other and d + other[u] < best:
+                best = d + other[u]
+                meeting = u
+
+        if meeting is None:
+            return None
+
+        # CH arcs from start up to the meeting node, then back down to end
+        forward = []
+        node = meeting
+        while node != start:
+            prev, arc = parent[0][node]
+            forward.append((arc, prev))
+            node = prev
+        forward.reverse()
+
+        backward = []
+        node = meeting
+        while node != end:
+            nxt, arc = parent[1][node]
+            backward.append((arc, node))
+            node = nxt
+
+        steps = []
+        for arc, from_node in forward + backward:
+            steps.extend(self.unpack(arc, from_node))
+        return best, steps
+
+    def unpack(self, arc, from_node):
+        """Expand a CH arc traversed from from_node into (edge id, from node) street steps"""
+        steps = []
+        stack = [(int(arc), int(from_node))]
+        while stack:
+            arc, node = stack.pop()
+            edge = int(self.arc_edge[arc])
+            if edge >= 0:
+                steps.append((edge, node))
+                continue
+            middle = int(self.arc_middle[arc])
+            first, second = int(self.arc_first[arc]), int(self.arc_second[arc])
+            # first touches arc_u, second touches arc_v; push in reverse travel order
+            if node == self.arc_u[arc]:
+                stack.append((second, middle))
+                stack.append((first, node))
+            else:
+                stack.append((first, middle))
+                stack.append((second, node))
+        return steps
+
+    def matches(self, graph):
+        """True if the hierarchy was built for this graph's edges and current weights"""
+        return (len(self.edge_costs) == graph.num_edges and
+                len(self.rank) == graph.num_nodes and
+                np.allclose(self.edge_costs, edge_costs(graph, self.weight_factor), rtol=1e-5, atol=1e-6))
+
+
+def save_overlay(path, hierarchies):
+    """Write {mode: ContractionHierarchy} to one .npz overlay artifact"""
+    arrays = {}
+    for mode, ch in hierarchies.items():
+        arrays[f'{mode}/weight_factor'] = np.array(ch.weight_factor)
+        for name in ContractionHierarchy.ARRAYS:
+            arrays[f'{mode}/{name}'] = getattr(ch, name)
+    np.savez(path, **arrays)
+
+
+def load_overlay(path=DEFAULT_PATH):
+    """Read the overlay artifact back into {mode: ContractionHierarchy}"""
+    with np.load(path) as data:
+        modes = sorted({key.split('/')[0] for key in data.files})
+        return {
+            mode: ContractionHierarchy(
+                float(data[f'{mode}/weight_factor']),
+                **{name: data[f'{mode}/{name}'] for name in ContractionHierarchy.ARRAYS}
+            )
+            for mode in modes
+        }
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from routing_engine import load_graph, ROUTE_MODES
+
+    print("="*80)
+    print("CONTRACTION HIERARCHY PREPROCESSING")
+    print("="*80)
+
+    graph = load_graph(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"\n📊 {graph.num_nodes} nodes, {graph.num_edges} edges")
+
+    hierarchies = {}
+    for mode, weight_factor in ROUTE_MODES.items():
+        t0 = time.perf_counter()
+        hierarchies[mode] = ContractionHierarchy.build(graph, weight_factor)
+        print(f"  {mode:9s} {hierarchies[mode].num_shortcuts} shortcuts "
+              f"({time.perf_counter() - t0:.1f}s)")
+
+    save_overlay(DEFAULT_PATH, hierarchies)
+    print(f"\n💾 {DEFAULT_PATH}")
@@ -5,9 +5,22 @@ Nodes = intersections, Edges = street segments with weights
 import json
 import pandas as pd
 import numpy as np
-from shapely.geometry import shape, Point, LineString
+from shapely.geometry import LineString
 from collections import defaultdict
-import math
+
+from geoparquet import EDGE_LAYOUT, parquet_available, read_stage, write_geoparquet
+from graph_artifact import write_graph_artifact, label_components
+from spatial_index import PointIndex
+from street_network import StreetNetwork
+from risk_model import edge_weight as compute_edge_weight, edge_category
+
+# Street split points snap to an intersection within this distance
+NODE_SNAP_DISTANCE_M = 10.0
+
+# Components smaller than this are islands: joined to the main network by a connector
+# if one of their intersections is within ISLAND_MERGE_DISTANCE_M of it, otherwise dropped
+MIN_COMPONENT_NODES = 50
+ISLAND_MERGE_DISTANCE_M = 20.0
 
 print("="*80)
 print("CREATING ROUTING GRAPH WITH WEIGHTED EDGES")
@@ -17,7 +30,8 @@ print("="*80)
 # STEP 1: Load Intersections (Nodes)
 # ===========================
 print("\n📍 Loading intersection nodes...")
-intersections_df = pd.read_csv('intersection_weights.csv')
+# intersection_weights.parquet when available (typed columns, no text parsing), else the CSV
+intersections_df = read_stage('intersection_weights', columns=['lat', 'lon', 'weight', 'neighborhood'])
 print(f"Loaded {len(intersections_df)} intersection nodes")
 
 # Create node lookup by coordinates
@@ -34,6 +48,10 @@ for idx, row in intersections_df.iterrows():
 
 print(f"Created {len(nodes)} node lookup")
 
+# KD-tree over intersections for endpoints that miss the exact coordinate key
+node_keys = list(nodes.keys())
+node_index = PointIndex([n['lat'] for n in nodes.values()], [n['lon'] for n in nodes.values()])
+
 # ===========================
 # STEP 2: Load Streets and Create Edges
 # ===========================
@@ -44,77 +62,49 @@ with open('downtown_streets.geojson', 'r') as f:
 print(f"Loaded {len(streets_data['features'])} streets")
 
 # ===========================
-# STEP 3: Build Edges
+# STEP 3: Node the Network and Build Edges
 # ===========================
-print("\n🔗 Building edges from streets...")
+print("\n🔗 Splitting streets at shared vertices...")
+
+# Every part of every street, split wherever it shares a vertex with another street
+network = StreetNetwork(streets_data['features'])
+print(f"  {network.num_parts} street parts, {len(network.vertex_coords)} distinct vertices, "
+      f"{int((network.vertex_degree >= 2).sum())} shared")
+
+# Split points: shared vertices and street ends that resolve to an intersection node
+# (exact coordinate or within NODE_SNAP_DISTANCE_M); other vertices stay inside their edge
+node_ids = np.array([n['id'] for n in nodes.values()])
+nearest, _ = node_index.nearest(network.vertex_coords[:, 1], network.vertex_coords[:, 0], NODE_SNAP_DISTANCE_M)
+vertex_node = np.where(nearest >= 0, node_ids[np.maximum(nearest, 0)], -1)
+coord_node = vertex_node[network.vertex]
+split_mask = (coord_node >= 0) & ((network.vertex_degree[network.vertex] >= 2) | network.is_part_end())
+
+piece_start, piece_end, piece_feature, piece_length = network.split(split_mask)
+print(f"  {len(piece_start)} street pieces between intersections")
+
+print("\n🔗 Building edges from street pieces...")
 
 edges = []
 edge_features = []
+node_by_id = {n['id']: n for n in nodes.values()}
 
-def coord_to_key(lat, lon):
-    """Convert coordinate to lookup key"""
-    return f"{lat:.6f},{lon:.6f}"
-
-def find_nearest_node(lat, lon, max_distance=0.0001):
-    """Find nearest intersection node within max_distance"""
-    key = coord_to_key(lat, lon)
-    if key in nodes:
-        return key
-    
-    # Search nearby
-    min_dist = float('inf')
-    nearest = None
-    for node_key, node in nodes.items():
-        dist = math.sqrt((node['lat'] - lat)**2 + (node['lon'] - lon)**2)
-        if dist < min_dist and dist < max_distance:
-            min_dist = dist
-            nearest = node_key
-    
-    return nearest
-
-# Process each street
 count = 0
-for street in streets_data['features']:
-    geom = shape(street['geometry'])
-    props = street['properties']
-    
-    # Get coordinates of the street
-    if geom.geom_type == 'LineString':
-        coords = list(geom.coords)
-    elif geom.geom_type == 'MultiLineString':
-        # Take first segment
-        coords = list(geom.geoms[0].coords)
-    else:
-        continue
-    
-    if len(coords) < 2:
+for start, end, feature_idx, length_m in zip(piece_start.tolist(), piece_end.tolist(),
+                                              piece_feature.tolist(), piece_length.tolist()):
+    source, target = int(coord_node[start]), int(coord_node[end])
+    if source == target:
         continue
-    
-    # Find nodes at start and end
-    start_lat, start_lon = coords[0][1], coords[0][0]
-    end_lat, end_lon = coords[-1][1], coords[-1][0]
-    
-    start_node = find_nearest_node(start_lat, start_lon)
-    end_node = find_nearest_node(end_lat, end_lon)
-    
-    if not start_node or not end_node or start_node == end_node:
-        continue
-    
-    # Calculate edge weight (average of node weights + length factor)
-    start_weight = nodes[start_node]['weight']
-    end_weight = nodes[end_node]['weight']
-    avg_weight = (start_weight + end_weight) / 2
-    
-    # Calculate length
-    length_m = geom.length * 111000  # degrees to meters
-    
-    # Final edge weight = average node weight * length factor
-    edge_weight = avg_weight * (1 + length_m / 1000)  # normalized by km
-    
+    props = streets_data['features'][feature_idx]['properties']
+
+    # Edge weight = average node weight * length factor
+    start_weight = node_by_id[source]['weight']
+    end_weight = node_by_id[target]['weight']
+    edge_weight = compute_edge_weight(start_weight, end_weight, length_m)
+
     # Create edge
     edge = {
-        'source': nodes[start_node]['id'],
-        'target': nodes[end_node]['id'],
+        'source': source,
+        'target': target,
         'weight': edge_weight,
         'length_m': length_m,
         'street_name': props.get('name', 'Unnamed'),
@@ -122,34 +112,113 @@ for street in streets_data['features']:
         'start_node_weight': start_weight,
         'end_node_weight': end_weight
     }
-    
+
     edges.append(edge)
-    
-    # Create GeoJSON feature for visualization
+
+    # Create GeoJSON feature for visualization (only this piece of the street)
     edge_feature = {
         'type': 'Feature',
-        'geometry': street['geometry'],
+        'geometry': {
+            'type': 'LineString',
+            'coordinates': network.coords[start:end + 1].tolist()
+        },
         'properties': {
-            'source': nodes[start_node]['id'],
-            'target': nodes[end_node]['id'],
+            'source': source,
+            'target': target,
             'weight': round(edge_weight, 2),
             'length_m': round(length_m, 2),
             'street_name': props.get('name', 'Unnamed'),
             'highway_type': props.get('highway', 'unclassified'),
-            'category': 'Low' if edge_weight < 50 else 'Medium' if edge_weight < 100 else 'High'
+            'category': edge_category(edge_weight)
         }
     }
-    
+
     edge_features.append(edge_feature)
-    
+
     count += 1
     if count % 1000 == 0:
-        print(f"  Processed {count} streets...")
+        print(f"  Processed {count} edges...")
 
 print(f"\n✅ Created {len(edges)} edges connecting {len(nodes)} nodes")
 
 # ===========================
-# STEP 4: Statistics
+# STEP 4: Connected Components
+# ===========================
+print("\n🧩 Labelling connected components...")
+
+# Node arrays indexed by id (ids dropped as duplicate coordinates stay NaN)
+node_lat = np.full(len(intersections_df), np.nan)
+node_lon = np.full(len(intersections_df), np.nan)
+node_weight = np.zeros(len(intersections_df))
+for node in nodes.values():
+    node_lat[node['id']] = node['lat']
+    node_lon[node['id']] = node['lon']
+    node_weight[node['id']] = node['weight']
+
+def components_of(edge_list):
+    """Component id per node and component sizes for a list of edge dicts"""
+    labels = label_components(len(node_lat), [e['source'] for e in edge_list], [e['target'] for e in edge_list])
+    return labels, np.bincount(labels[labels >= 0])
+
+node_component, component_sizes = components_of(edges)
+print(f"  {len(component_sizes)} components, main network {component_sizes[0]} nodes, "
+      f"{int((component_sizes < MIN_COMPONENT_NODES).sum())} islands under {MIN_COMPONENT_NODES} nodes")
+
+# Join each island at its closest intersection to the main network
+main_ids = np.flatnonzero(node_component == 0)
+main_index = PointIndex(node_lat[main_ids], node_lon[main_ids], main_ids)
+island_nodes = np.flatnonzero(node_component > 0)
+island_nodes = island_nodes[component_sizes[node_component[island_nodes]] < MIN_COMPONENT_NODES]
+nearest_main, gap_m = main_index.nearest(node_lat[island_nodes], node_lon[island_nodes], ISLAND_MERGE_DISTANCE_M)
+in_reach = nearest_main >= 0
+island_nodes, nearest_main, gap_m = island_nodes[in_reach], nearest_main[in_reach], gap_m[in_reach]
+order = np.lexsort((gap_m, node_component[island_nodes]))
+first = np.ones(len(order), dtype=bool)
+first[1:] = np.diff(node_component[island_nodes[order]]) != 0
+
+for i in order[first]:
+    source, target, length_m = int(island_nodes[i]), int(nearest_main[i]), float(gap_m[i])
+    edge_weight = compute_edge_weight(node_weight[source], node_weight[target], length_m)
+    edges.append({
+        'source': source,
+        'target': target,
+        'weight': edge_weight,
+        'length_m': length_m,
+        'street_name': 'Connector',
+        'highway_type': 'connector',
+        'start_node_weight': node_weight[source],
+        'end_node_weight': node_weight[target]
+    })
+    edge_features.append({
+        'type': 'Feature',
+        'geometry': {'type': 'LineString',
+                     'coordinates': [[node_lon[source], node_lat[source]], [node_lon[target], node_lat[target]]]},
+        'properties': {
+            'source': source,
+            'target': target,
+            'weight': round(edge_weight, 2),
+            'length_m': round(length_m, 2),
+            'street_name': 'Connector',
+            'highway_type': 'connector',
+            'category': edge_category(edge_weight)
+        }
+    })
+print(f"  🔗 Merged {int(first.sum())} islands into the main network (gap <= {ISLAND_MERGE_DISTANCE_M:.0f}m)")
+
+# Drop the islands that are still cut off; nobody can route to or from them
+node_component, component_sizes = components_of(edges)
+keep = [node_component[e['source']] == 0 or component_sizes[node_component[e['source']]] >= MIN_COMPONENT_NODES
+        for e in edges]
+dropped = len(edges) - sum(keep)
+edges = [e for e, k in zip(edges, keep) if k]
+edge_features = [f for f, k in zip(edge_features, keep) if k]
+node_component, component_sizes = components_of(edges)
+print(f"  🗑️  Dropped {dropped} island edges")
+print(f"  ✅ {len(component_sizes)} components left, main network {component_sizes[0]} nodes "
+      f"({component_sizes[0] / len(nodes) * 100:.1f}% of intersections)")
+
+# ===========================
+# STEP 5: Statistics
 # ===========================
 edges_df = pd.DataFrame(edges)
 
@@ -157,13 +226,12 @@ print("\n📊 Edge Weight Statistics:")
 print(edges_df['weight'].describe())
 
 print("\n📈 Edge Category Distribution:")
-edges_df['category'] = pd.cut(edges_df['weight'], 
-                               bins=[0, 50, 100, float('inf')],
-                               labels=['Low', 'Medium', 'High'])
+# Same rule as the GeoJSON and update_crime_weights.py (risk_model.edge_category)
+edges_df['category'] = edges_df['weight'].map(edge_category)
 print(edges_df['category'].value_counts())
 
 # ===========================
-# STEP 5: Save Results
+# STEP 6: Save Results
 # ===========================
 print("\n💾 Saving results...")
 
@@ -171,6 +239,14 @@ print("\n💾 Saving results...")
 edges_df.to_csv('routing_edges.csv', index=False)
 print("  ✅ routing_edges.csv")
 
+# Save edges as GeoParquet (categorical street/highway columns, WKB street geometry)
+if parquet_available():
+    edge_geometries = [LineString(f['geometry']['coordinates']) for f in edge_features]
+    write_geoparquet('routing_edges.parquet', edges_df, edge_geometries, **EDGE_LAYOUT)
+    print("  ✅ routing_edges.parquet")
+else:
+    print("  ⚠️  pyarrow not installed, skipping routing_edges.parquet")
+
 # Save edges GeoJSON for visualization
 edges_geojson = {
     'type': 'FeatureCollection',
@@ -198,7 +274,8 @@ for edge in edges:
 
 # Save graph structure
 graph_data = {
-    'nodes': [{'id': node['id'], 'lat': node['lat'], 'lon': node['lon'], 'weight': node['weight']} 
+    'nodes': [{'id': node['id'], 'lat': node['lat'], 'lon': node['lon'], 'weight': node['weight'],
+               'component': int(node_component[node['id']])}
               for node in nodes.values()],
     'edges': edges,
     'adjacency_list': {k: v for k, v in graph.items()}
@@ -208,6 +285,10 @@ with open('routing_graph.json', 'w') as f:
     json.dump(graph_data, f)
 print("  ✅ routing_graph.json")
 
+# Same graph as fixed-width binary arrays for np.memmap / typed-array loading
+write_graph_artifact('routing_graph.bin', node_lat, node_lon, node_weight, edges_df, node_component)
+print("  ✅ routing_graph.bin")
+
 print("\n" + "="*80)
 print("✅ ROUTING GRAPH CREATED")
 print("="*80)
@@ -215,6 +296,7 @@ print("="*80)
 print(f"\n📊 Graph Summary:")
 print(f"  Nodes (intersections): {len(nodes)}")
 print(f"  Edges (street segments): {len(edges)}")
+print(f"  Main network: {component_sizes[0]} nodes")
 print(f"  Average edges per node: {len(edges)*2/len(nodes):.1f}")
 print(f"  Weight range: {edges_df['weight'].min():.1f} - {edges_df['weight'].max():.1f}")
 
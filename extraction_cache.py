@@ -0,0 +1,62 @@
+"""
+Per-incident cache of crime extraction results for fetch_live_crimes.py
+Keyed by a hash of the incident row (time, district, details), so an incident that is
+still on gtaupdate.com at the next poll is not sent to Gemini again. Values are the
+extracted {location, type, severity, description}. The cache is a JSON file, written
+atomically after each update, so it survives restarts of chat_server.py.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = 'crime_extraction_cache.json'
+DEFAULT_MAX_ENTRIES = 2000  # the feed shows a few dozen rows; this covers weeks of polls
+
+CACHE_FIELDS = ('location', 'type', 'severity', 'description')
+
+
+def incident_key(incident):
+    """Content hash of an incident row (whitespace-normalized)"""
+    text = '\x1f'.join(' '.join(str(incident.get(field, '')).split()) for field in ('time', 'district', 'details'))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class ExtractionCache:
+    """Thread-safe, disk-backed map of incident hash -> extracted crime (oldest entries evicted first)"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self._entries.update(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable extraction cache {path}: {e}", file=sys.stderr)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, incident):
+        with self._lock:
+            return self._entries.get(incident_key(incident))
+
+    def update(self, results):
+        """Store (incident, crime dict) pairs and write the file once"""
+        with self._lock:
+            for incident, crime in results:
+                key = incident_key(incident)
+                self._entries.pop(key, None)
+                self._entries[key] = {field: crime[field] for field in CACHE_FIELDS}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self.path:
+                tmp_path = self.path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp_path, self.path)
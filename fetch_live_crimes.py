@@ -2,53 +2,47 @@ import os
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
-import requests
-from bs4 import BeautifulSoup
 import json
 import re
 import sys
 
+from extraction_cache import ExtractionCache
+from incident_feed import fetch_gta_updates
+
 load_dotenv()
 
-def fetch_gta_updates():
-    """Scrape recent incidents from gtaupdate.com"""
-    url = "https://gtaupdate.com/"
-    response = requests.get(url)
+MAX_INCIDENTS = 10  # newest rows of the incident table considered
+MAX_EVENTS = 5
 
-    if response.status_code != 200:
-        print(json.dumps({"error": "Failed to fetch incidents"}))
-        return []
+_gazetteer = None
+_geocoder = None
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    table = soup.find("table")
-    
-    if not table:
-        print(json.dumps({"error": "No incident table found"}))
-        return []
+def get_gazetteer():
+    """Offline street/landmark index over the routing graph, built on first use (None if no graph)"""
+    global _gazetteer
+    if _gazetteer is None:
+        from gazetteer import Gazetteer
+        from routing_engine import load_graph
+        try:
+            _gazetteer = Gazetteer(load_graph(os.getenv('ROUTING_GRAPH'), ch_path=None))
+        except FileNotFoundError as e:
+            print(f"Gazetteer unavailable (no routing graph): {e}", file=sys.stderr)
+            _gazetteer = False
+    return _gazetteer or None
 
-    tbody = table.find("tbody")
-    rows = tbody.find_all("tr")
-    
-    incidents = []
-    for row in rows[:10]:  # Get top 10 incidents
-        cols = row.find_all("td")
-        if len(cols) < 3:
-            continue
-            
-        time = cols[0].text.strip()
-        district = cols[1].text.strip()
-        details = cols[2].text.strip()
-        
-        incidents.append({
-            "time": time,
-            "district": district,
-            "details": details
-        })
-    
-    return incidents
+def get_geocoder():
+    """Cached, rate-limited Nominatim client (geocoder.py), created on first use"""
+    global _geocoder
+    if _geocoder is None:
+        from geocoder import Geocoder
+        _geocoder = Geocoder()
+    return _geocoder
 
-def geocode_location(location_text):
-    """Use Nominatim to get coordinates for a location in Toronto"""
+def resolve_offline(location_text):
+    """
+    Coordinates for a location in Toronto without the network: TFS district table, then the
+    offline gazetteer (street pairs / landmarks -> routing node, includes node_id). None if neither matches.
+    """
     
     # Hardcoded coordinates for Toronto Fire Service districts and common areas
     toronto_locations = {
@@ -119,129 +113,146 @@ def geocode_location(location_text):
             if tfs_key in toronto_locations:
                 return toronto_locations[tfs_key]
     
-    try:
-        # Add "Toronto" to improve accuracy
-        search_query = f"{location_text}, Toronto, Ontario, Canada"
-        
-        url = "https://nominatim.openstreetmap.org/search"
-        params = {
-            "q": search_query,
-            "format": "json",
-            "limit": 1,
-            "countrycodes": "ca"
-        }
-        headers = {
-            "User-Agent": "SafeRouteAI/1.0"
-        }
-        
-        response = requests.get(url, params=params, headers=headers)
-        data = response.json()
-        
-        if data and len(data) > 0:
-            return {
-                "lat": float(data[0]["lat"]),
-                "lon": float(data[0]["lon"])
-            }
-    except Exception as e:
-        print(f"Geocoding error for '{location_text}': {e}", file=sys.stderr)
+    # Street intersections and landmarks on the routing graph (no network)
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        hit = gazetteer.lookup(location_clean)
+        if hit:
+            return hit
     
     return None
 
-def extract_crimes_simple(incidents):
-    """Extract crimes directly from incidents without Gemini (fallback)"""
-    crimes = []
-    
-    # Map keywords to crime types
-    crime_keywords = {
-        'shooting': ['shooting', 'shot', 'gunfire', 'firearm'],
-        'homicide': ['homicide', 'murder', 'death', 'fatal'],
-        'robbery': ['robbery', 'robbed', 'armed robbery'],
-        'assault': ['assault', 'stabbing', 'stabbed', 'attacked'],
-        'breakenter': ['break', 'enter', 'burglary'],
-        'autotheft': ['auto theft', 'vehicle theft', 'stolen car']
+# Street / place names in incident text: capitalized words ("King St W", "Union Station")
+PLACE_NAME = r"[A-Z0-9][\w'’-]*(?: [A-Z][\w'’-]*)*"
+STREET_NEAR_PATTERN = re.compile(rf"\bon ({PLACE_NAME}) (?:near|at) ({PLACE_NAME})")    # on Yonge St near Dundas St
+STREET_PAIR_PATTERN = re.compile(rf"({PLACE_NAME}) ?(?:&|@|/| and | at ) ?({PLACE_NAME})")  # King St W & Spadina Ave
+PLACE_PATTERN = re.compile(rf"\b(?:at|near|on) ({PLACE_NAME})")                           # near Union Station
+
+def district_location(incident):
+    """Fallback location when the details name no place the gazetteer knows"""
+    return f"District {incident['district']}"
+
+def details_location(details):
+    """First street pair or landmark in the incident text that the offline gazetteer resolves, or None"""
+    gazetteer = get_gazetteer()
+    if gazetteer is None:
+        return None
+    candidates = [f"{a} & {b}" for a, b in STREET_NEAR_PATTERN.findall(details)]
+    candidates += [f"{a} & {b}" for a, b in STREET_PAIR_PATTERN.findall(details)]
+    candidates += PLACE_PATTERN.findall(details)
+    for candidate in candidates:
+        if gazetteer.lookup(candidate):
+            return candidate
+    return None
+
+# Map keywords to crime types (first match wins)
+CRIME_KEYWORDS = {
+    'shooting': ['shooting', 'shot', 'gunfire', 'firearm'],
+    'homicide': ['homicide', 'murder', 'death', 'fatal'],
+    'robbery': ['robbery', 'robbed', 'armed robbery'],
+    'assault': ['assault', 'stabbing', 'stabbed', 'attacked'],
+    'breakenter': ['break', 'enter', 'burglary'],
+    'autotheft': ['auto theft', 'vehicle theft', 'stolen car']
+}
+
+# Unambiguous phrases: an incident matching exactly one type here skips Gemini
+CONFIDENT_KEYWORDS = {
+    'shooting': ['shooting', 'gunfire', 'shots fired'],
+    'homicide': ['homicide', 'murder'],
+    'robbery': ['robbery', 'robbed'],
+    'assault': ['stabbing', 'stabbed', 'assault'],
+    'breakenter': ['break and enter', 'break-and-enter', 'burglary'],
+    'autotheft': ['auto theft', 'vehicle theft', 'stolen car', 'stolen vehicle']
+}
+
+CRIME_SEVERITY = {'shooting': 95, 'homicide': 95, 'robbery': 80, 'assault': 70}
+
+def keyword_crime(incident):
+    """
+    Keyword extraction for one incident.
+    Returns (crime dict, confident); confident when the text names exactly one crime type unambiguously.
+    Keywords only decide type and severity; the location is the street pair or landmark in the
+    details, or the district when the gazetteer resolves none.
+    """
+    details_lower = incident['details'].lower()
+    district = incident['district']
+    time = incident['time']
+    details = incident['details']
+
+    # Determine crime type
+    crime_type = 'assault'  # default
+    severity = 60  # default
+
+    for ctype, keywords in CRIME_KEYWORDS.items():
+        if any(keyword in details_lower for keyword in keywords):
+            crime_type = ctype
+            # Assign severity based on type
+            severity = CRIME_SEVERITY.get(ctype, 60)
+            break
+
+    confident_types = [ctype for ctype, keywords in CONFIDENT_KEYWORDS.items()
+                       if any(keyword in details_lower for keyword in keywords)]
+    confident = confident_types == [crime_type]
+
+    location = details_location(details) or district_location(incident)
+
+    # Create description
+    description = f"Incident reported at {time} in District {district}. {details[:150]}"
+    if len(details) > 150:
+        description += "..."
+
+    crime = {
+        "location": location,
+        "type": crime_type,
+        "severity": severity,
+        "description": description
     }
-    
-    for incident in incidents[:10]:
-        details_lower = incident['details'].lower()
-        district = incident['district']
-        time = incident['time']
-        details = incident['details']
-        
-        # Determine crime type
-        crime_type = 'assault'  # default
-        severity = 60  # default
-        
-        for ctype, keywords in crime_keywords.items():
-            if any(keyword in details_lower for keyword in keywords):
-                crime_type = ctype
-                # Assign severity based on type
-                if ctype in ['shooting', 'homicide']:
-                    severity = 95
-                elif ctype == 'robbery':
-                    severity = 80
-                elif ctype == 'assault':
-                    severity = 70
-                else:
-                    severity = 60
-                break
-        
-        # Extract location from district or details
-        location = f"District {district}"
-        
-        # Create description
-        description = f"Incident reported at {time} in District {district}. {details[:150]}"
-        if len(details) > 150:
-            description += "..."
-        
-        crimes.append({
-            "location": location,
-            "type": crime_type,
-            "severity": severity,
-            "description": description
-        })
-    
-    # Return top 5 by severity
-    crimes.sort(key=lambda x: x['severity'], reverse=True)
-    return crimes[:5]
+    return crime, confident
 
 def extract_crimes_with_gemini(incidents):
-    """Use Gemini to extract structured crime data with detailed descriptions"""
+    """
+    Use Gemini to extract structured crime data with detailed descriptions, one batched prompt.
+    Returns a list aligned with incidents: a {location, type, severity, description} dict per
+    incident, or None where the model gave no usable answer.
+    """
     client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
     
     incidents_text = "\n".join([
-        f"[{inc['time']}] District {inc['district']}: {inc['details']}" 
-        for inc in incidents
+        f"{i}. [{inc['time']}] District {inc['district']}: {inc['details']}"
+        for i, inc in enumerate(incidents)
     ])
     
     prompt = f"""
 You are analyzing recent crime incidents in Toronto to help create safety alerts for citizens.
 
-Analyze these incidents and select the 5 MOST SERIOUS and RECENT ones that pose immediate danger to public safety.
+Analyze EACH of these numbered incidents.
 
 Incidents:
 {incidents_text}
 
-For EACH of the 5 most serious incidents, provide:
-1. **location**: Specific street intersection, address, or landmark in Toronto (e.g., "Yonge St & Dundas St", "Union Station", "King St W & Spadina Ave")
-2. **type**: One of these exact values: shooting/homicide/robbery/assault/breakenter/autotheft
-3. **severity**: Number 1-100 (shooting/homicide=90-100, robbery=75-85, assault=60-75, other=40-60)
-4. **description**: A 2-3 sentence news-style summary explaining what happened, when, and any important details (victims, suspects, ongoing investigation, etc.)
+For EACH incident, provide:
+1. **id**: The incident number from the list above
+2. **location**: Specific street intersection, address, or landmark in Toronto (e.g., "Yonge St & Dundas St", "Union Station", "King St W & Spadina Ave")
+3. **type**: One of these exact values: shooting/homicide/robbery/assault/breakenter/autotheft/none (none = not a crime, e.g. fire or medical call)
+4. **severity**: Number 1-100 (shooting/homicide=90-100, robbery=75-85, assault=60-75, other=40-60, none=0)
+5. **description**: A 2-3 sentence news-style summary explaining what happened, when, and any important details (victims, suspects, ongoing investigation, etc.)
 
 IMPORTANT:
 - Extract actual street names and intersections from the incident details
 - If no specific location given, use the district number and major landmark in that district
 - Make descriptions informative and professional, like a news alert
-- Focus on incidents from the last few hours
 
-Return ONLY a valid JSON array with this EXACT format (no markdown, no extra text):
+Return ONLY a valid JSON array with one object per incident in this EXACT format (no markdown, no extra text):
 [
   {{
+    "id": 0,
     "location": "Yonge St & College St",
     "type": "shooting",
     "severity": 95,
     "description": "A shooting incident occurred at this intersection around 2:30 AM. Police responded to reports of gunfire and found one victim with serious injuries. Suspects fled the scene and investigation is ongoing."
   }},
   {{
+    "id": 1,
     "location": "King St W & Bathurst St",
     "type": "assault",
     "severity": 72,
@@ -250,62 +261,114 @@ Return ONLY a valid JSON array with this EXACT format (no markdown, no extra tex
 ]
 """
     
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-exp",
-            contents=prompt
-        )
-        
-        # Extract JSON from response
-        response_text = response.text.strip()
-        
-        # Remove markdown code blocks if present
-        response_text = re.sub(r'^```json\s*\n', '', response_text)
-        response_text = re.sub(r'^```\s*\n', '', response_text)
-        response_text = re.sub(r'\n```$', '', response_text)
-        response_text = response_text.strip()
-        
-        crimes = json.loads(response_text)
-        return crimes
-        
-    except Exception as e:
-        print(f"Gemini error: {e}", file=sys.stderr)
-        return []
-
-if __name__ == "__main__":
-    # Fetch incidents
-    incidents = fetch_gta_updates()
-    
-    if not incidents:
-        print(json.dumps({"error": "No incidents found"}))
-        exit(1)
-    
-    # Try Gemini first, fallback to simple extraction
-    crimes = []
-    try:
-        crimes = extract_crimes_with_gemini(incidents)
-        if crimes:
-            print("Using Gemini AI analysis", file=sys.stderr)
-        else:
-            raise Exception("Gemini returned no results")
-    except Exception as e:
-        print(f"Gemini failed, using simple extraction: {e}", file=sys.stderr)
-        crimes = extract_crimes_simple(incidents)
-        print(f"Simple extraction found {len(crimes)} crimes", file=sys.stderr)
+    response = client.models.generate_content(
+        model="gemini-2.0-flash-exp",
+        contents=prompt
+    )
     
-    if not crimes:
-        print(json.dumps({"error": "Failed to extract crime data"}))
-        exit(1)
+    # Extract JSON from response
+    response_text = response.text.strip()
     
-    print(f"Processing {len(crimes)} crimes for geocoding...", file=sys.stderr)
+    # Remove markdown code blocks if present
+    response_text = re.sub(r'^```json\s*\n', '', response_text)
+    response_text = re.sub(r'^```\s*\n', '', response_text)
+    response_text = re.sub(r'\n```$', '', response_text)
+    response_text = response_text.strip()
     
-    # Geocode locations
+    results = [None] * len(incidents)
+    for crime in json.loads(response_text):
+        try:
+            i = int(crime["id"])
+            if 0 <= i < len(incidents):
+                results[i] = {
+                    "location": str(crime["location"]),
+                    "type": str(crime["type"]),
+                    "severity": int(crime["severity"]),
+                    "description": str(crime["description"])
+                }
+        except (KeyError, TypeError, ValueError):
+            continue
+    return results
+
+def extract_crimes(incidents, cache=None):
+    """
+    Crimes for the incidents, most severe first, with per-incident memoization.
+    Incidents seen before come from cache, confident keyword matches skip the model and
+    only the rest go to Gemini in one batched prompt. Model failures fall back to keyword
+    extraction for this run and are retried at the next poll (not cached). Keyword matches
+    located only by district are not cached either, so they are re-located at the next poll.
+    """
+    crimes = [None] * len(incidents)
+    fresh = []    # (incident, crime) pairs to add to the cache
+    pending = []  # indices that need the model
+    cached = keyword = 0
+    for i, incident in enumerate(incidents):
+        crime = cache.get(incident) if cache is not None else None
+        if crime is not None:
+            if crime["location"] == district_location(incident):
+                crime = dict(crime, location=details_location(incident["details"]) or crime["location"])
+            crimes[i] = crime
+            cached += 1
+            continue
+        crime, confident = keyword_crime(incident)
+        if confident:
+            crimes[i] = crime
+            keyword += 1
+            if crime["location"] != district_location(incident):
+                fresh.append((incident, crime))
+        else:
+            pending.append(i)
+
+    if pending:
+        try:
+            results = extract_crimes_with_gemini([incidents[i] for i in pending])
+        except Exception as e:
+            print(f"Gemini failed, using simple extraction: {e}", file=sys.stderr)
+            results = [None] * len(pending)
+        for i, crime in zip(pending, results):
+            if crime is not None:
+                fresh.append((incidents[i], crime))
+            else:
+                crime = keyword_crime(incidents[i])[0]
+            crimes[i] = crime
+
+    if cache is not None and fresh:
+        cache.update(fresh)
+    print(f"Extraction: {len(incidents)} incidents, {cached} cached, {keyword} keyword, "
+          f"{len(pending)} sent to Gemini", file=sys.stderr)
+
+    crimes = [crime for crime in crimes if crime["type"] != "none"]
+    crimes.sort(key=lambda x: x['severity'], reverse=True)
+    return crimes
+
+def build_crime_events(incidents, cache=None):
+    """
+    Incident table rows -> map-ready crime events ({lat, lon, type, impact, location, description}).
+    extract_crimes() picks the most serious incidents (cache, keyword fast path, then Gemini),
+    then each location is geocoded; events without coordinates are dropped.
+    """
+    incidents = incidents[:MAX_INCIDENTS]
+    if not incidents:
+        return []
+
+    crimes = extract_crimes(incidents, cache)
+
+    print(f"Processing {min(len(crimes), MAX_EVENTS)} crimes for geocoding...", file=sys.stderr)
+
+    # Geocode locations: offline where possible, the rest concurrently through the cached geocoder
+    crimes = crimes[:MAX_EVENTS]
+    locations = [crime.get("location", "") for crime in crimes]
+    found = [resolve_offline(location) for location in locations]
+    remote = [i for i, coords in enumerate(found) if coords is None]
+    if remote:
+        print(f"Geocoding {len(remote)} locations not resolved offline (cached Nominatim)...", file=sys.stderr)
+        for i, coords in zip(remote, get_geocoder().geocode_all([locations[i] for i in remote])):
+            found[i] = coords
+
     crime_events = []
-    for crime in crimes[:5]:  # Limit to 5
-        location = crime.get("location", "")
+    for crime, location, coords in zip(crimes, locations, found):
         print(f"Geocoding: {location}", file=sys.stderr)
-        coords = geocode_location(location)
-        
+
         if coords:
             print(f"  -> Found coords: {coords['lat']}, {coords['lon']}", file=sys.stderr)
             crime_events.append({
@@ -314,10 +377,27 @@ if __name__ == "__main__":
                 "type": crime.get("type", "assault"),
                 "impact": crime.get("severity", 80),
                 "location": location,
-                "description": crime.get("description", "No details available")
+                "description": crime.get("description", "No details available"),
+                "node_id": coords.get("node_id")  # routing graph node when the gazetteer matched
             })
         else:
             print(f"  -> No coords found for {location}", file=sys.stderr)
+
+    return crime_events
+
+if __name__ == "__main__":
+    # One-off run; chat_server.py keeps these events up to date for /fetch-live-crimes
+    incidents = fetch_gta_updates()
+    
+    if not incidents:
+        print(json.dumps({"error": "No incidents found"}))
+        exit(1)
+    
+    crime_events = build_crime_events(incidents, ExtractionCache())
+    
+    if not crime_events:
+        print(json.dumps({"error": "Failed to extract crime data"}))
+        exit(1)
     
     # Output JSON
     print(json.dumps({
@@ -0,0 +1,311 @@
+"""
+Offline gazetteer: incident location text -> routing graph intersection
+Built from the street names on the routing graph's edges, so "Yonge St & Dundas St",
+"King and Spadina" or "Union Station" resolve to a real node id (main component,
+routable by /route) without any network request.
+
+Street names are normalized (case, punctuation, St/Ave/Blvd/W/E... abbreviations) and
+indexed at three levels - full name, name without direction, bare name - so
+"King St" matches both King Street West and East. Names that don't match exactly fall
+back to the closest indexed name by edit distance, compared only against names with the
+same first letter and a length within the edit budget. Landmarks come from a short built-in
+list plus named POIs in downtown_pois.geojson (when present), snapped to the nearest node.
+"""
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from spatial_index import project
+
+POIS_GEOJSON = 'downtown_pois.geojson'
+PAIR_SNAP_DISTANCE_M = 50.0       # streets that cross without sharing a node (divided roads, overpasses)
+LANDMARK_SNAP_DISTANCE_M = 300.0  # landmarks farther than this from the network are dropped
+MAX_MEMO_ENTRIES = 10000
+
+ABBREVIATIONS = {
+    'st': 'street', 'ave': 'avenue', 'av': 'avenue', 'rd': 'road', 'blvd': 'boulevard',
+    'dr': 'drive', 'cres': 'crescent', 'crt': 'court', 'ct': 'court', 'pl': 'place',
+    'sq': 'square', 'pkwy': 'parkway', 'hwy': 'highway', 'ln': 'lane', 'expy': 'expressway',
+    'ter': 'terrace', 'terr': 'terrace', 'gdns': 'gardens', 'cir': 'circle', 'trl': 'trail',
+    'e': 'east', 'w': 'west', 'n': 'north', 's': 'south', 'mt': 'mount'
+}
+DIRECTIONS = {'east', 'west', 'north', 'south'}
+STREET_TYPES = {'street', 'avenue', 'road', 'boulevard', 'drive', 'crescent', 'court', 'place',
+                'square', 'parkway', 'highway', 'lane', 'expressway', 'terrace', 'gardens',
+                'circle', 'trail', 'way', 'gate', 'quay'}
+
+# "Yonge St & Dundas St", "King and Spadina", "Queen St W at Bathurst", "Bloor / Bathurst"
+INTERSECTION_SEPARATORS = re.compile(r'\s*(?:&|@|/|\band\b|\bat\b|\bnear\b)\s*', re.IGNORECASE)
+
+# Well-known places the incident feed and Gemini refer to (lat, lon)
+LANDMARKS = {
+    'Union Station': (43.6453, -79.3806),
+    'Yonge-Dundas Square': (43.6561, -79.3802),
+    'Eaton Centre': (43.6544, -79.3807),
+    'St. Lawrence Market': (43.6487, -79.3716),
+    'Nathan Phillips Square': (43.6525, -79.3839),
+    'City Hall': (43.6534, -79.3841),
+    'CN Tower': (43.6426, -79.3871),
+    'Rogers Centre': (43.6414, -79.3894),
+    'Scotiabank Arena': (43.6435, -79.3791),
+    'Ripley\'s Aquarium': (43.6424, -79.3860),
+    'Harbourfront Centre': (43.6388, -79.3817),
+    'Kensington Market': (43.6547, -79.4005),
+    'Chinatown': (43.6529, -79.3980),
+    'Art Gallery of Ontario': (43.6536, -79.3925),
+    'Royal Ontario Museum': (43.6677, -79.3948),
+    'Queen\'s Park': (43.6624, -79.3916),
+    'University of Toronto': (43.6629, -79.3957),
+    'Toronto Metropolitan University': (43.6577, -79.3788),
+    'Allan Gardens': (43.6617, -79.3747),
+    'Moss Park': (43.6549, -79.3683),
+    'Distillery District': (43.6503, -79.3596),
+    'Trinity Bellwoods Park': (43.6475, -79.4137),
+    'Liberty Village': (43.6383, -79.4200),
+    'Exhibition Place': (43.6333, -79.4186),
+    'Entertainment District': (43.6465, -79.3900),
+    'Financial District': (43.6481, -79.3815)
+}
+
+
+def normalize(text):
+    """Lowercase tokens with punctuation dropped and abbreviations expanded ('St.' first = Saint)"""
+    text = text.lower().replace("'", '').replace('’', '').replace('.', ' ')
+    tokens = re.sub(r'[^a-z0-9]+', ' ', text).split()
+    expanded = []
+    for i, token in enumerate(tokens):
+        if token == 'st' and i == 0 and len(tokens) > 1:
+            expanded.append('saint')
+        else:
+            expanded.append(ABBREVIATIONS.get(token, token))
+    return expanded
+
+
+def street_keys(name):
+    """(full, without direction, bare name) keys of a street name; later keys may repeat earlier ones"""
+    tokens = normalize(name)
+    full = ' '.join(tokens)
+    if len(tokens) > 1 and tokens[-1] in DIRECTIONS:
+        tokens = tokens[:-1]
+    base = ' '.join(tokens)
+    if len(tokens) > 1 and tokens[-1] in STREET_TYPES:
+        tokens = tokens[:-1]
+    return full, base, ' '.join(tokens)
+
+
+def edit_distance(a, b, max_distance):
+    """Levenshtein distance, or max_distance + 1 as soon as it is certain to exceed max_distance"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+class FuzzyIndex:
+    """
+    Names bucketed by first letter and length for fuzzy_match(): only names that start with
+    the same letter and are short/long enough to be within the edit budget are compared.
+    """
+
+    def __init__(self, keys=()):
+        self._buckets = {}  # (first letter, length) -> keys
+        for key in keys:
+            self.add(key)
+
+    def add(self, key):
+        if key:
+            self._buckets.setdefault((key[0], len(key)), []).append(key)
+
+    def candidates(self, key, max_distance):
+        """Keys of length len(key) +- max_distance with the same first letter, closest lengths first"""
+        for delta in range(max_distance + 1):
+            for length in ((len(key) - delta, len(key) + delta) if delta else (len(key),)):
+                yield from self._buckets.get((key[0], length), ())
+
+
+def fuzzy_match(key, index):
+    """Closest name in a FuzzyIndex within len(key) // 4 edits (at least 1), or None"""
+    if not key:
+        return None
+    max_distance = max(1, len(key) // 4)
+    best, best_distance = None, max_distance + 1
+    for candidate in index.candidates(key, max_distance):
+        distance = edit_distance(key, candidate, best_distance - 1 if best is not None else max_distance)
+        if distance < best_distance:
+            best, best_distance = candidate, distance
+    return best
+
+
+class Gazetteer:
+    """
+    Street-name and landmark index over a RoutingGraph.
+
+    streets[level][key] is the set of main-component node ids touched by an edge whose
+    street name has that key (level 0 = full name, 1 = without direction, 2 = bare name).
+    Misspelled bare names and landmarks are matched through FuzzyIndex buckets.
+    """
+
+    def __init__(self, graph, pois_path=POIS_GEOJSON):
+        self.graph = graph
+        self._xy = project(graph.node_lat, graph.node_lon)
+        main = graph.node_component == 0
+        self.streets = ({}, {}, {})
+        self.street_names = {}  # full key -> display name
+        for edge_id, name in enumerate(graph.street_names):
+            if not name or name == 'Unnamed':
+                continue
+            ends = [int(n) for n in (graph.sources[edge_id], graph.edge_targets[edge_id]) if main[n]]
+            keys = street_keys(name)
+            self.street_names.setdefault(keys[0], name)
+            for level, key in enumerate(keys):
+                self.streets[level].setdefault(key, set()).update(ends)
+        self._fuzzy_streets = FuzzyIndex(self.streets[2])
+
+        self.landmarks = {}  # normalized name -> (node id, display name)
+        self._fuzzy_landmarks = FuzzyIndex()
+        for name, (lat, lon) in LANDMARKS.items():
+            self.add_landmark(name, lat, lon)
+        if pois_path and os.path.exists(pois_path):
+            self._add_pois(pois_path)
+        self._memo = {}
+
+    def add_landmark(self, name, lat, lon):
+        node_id, _ = self.graph.nearest_node(lat, lon, LANDMARK_SNAP_DISTANCE_M)
+        key = ' '.join(normalize(name.replace('&', ' and ')))
+        if node_id is not None and key:
+            if key not in self.landmarks:
+                self._fuzzy_landmarks.add(key)
+            self.landmarks[key] = (node_id, name)
+        return node_id
+
+    def _add_pois(self, path):
+        """Named point POIs; names used by more than one POI (chains) are ambiguous and skipped"""
+        with open(path, encoding='utf-8') as f:
+            features = json.load(f)['features']
+        named = {}
+        for feature in features:
+            name = feature['properties'].get('name')
+            if name and feature['geometry']['type'] == 'Point':
+                named.setdefault(name, []).append(feature['geometry']['coordinates'])
+        for name, points in named.items():
+            if len(points) == 1 and ' '.join(normalize(name)) not in self.landmarks:
+                lon, lat = points[0][:2]
+                self.add_landmark(name, lat, lon)
+
+    def match_street(self, name):
+        """(nodes, bare name) of the best-matching street: most specific exact key, else the closest bare name"""
+        keys = street_keys(name)
+        for level, key in enumerate(keys):
+            if key in self.streets[level]:
+                return self.streets[level][key], keys[2]
+        match = fuzzy_match(keys[2], self._fuzzy_streets)
+        return (self.streets[2][match], match) if match is not None else (set(), None)
+
+    def street_nodes(self, name):
+        return self.match_street(name)[0]
+
+    def intersection(self, street_a, street_b):
+        """Node where two different streets meet (or pass within PAIR_SNAP_DISTANCE_M), or None"""
+        (nodes_a, bare_a), (nodes_b, bare_b) = self.match_street(street_a), self.match_street(street_b)
+        if not nodes_a or not nodes_b or bare_a == bare_b:
+            return None  # "Dundas St & Dundas St W" names one street, not a crossing
+        shared = nodes_a & nodes_b
+        if shared:
+            # A divided intersection has several nodes; take the one closest to their centre
+            shared = np.fromiter(shared, dtype=np.int64)
+            xy = self._xy[shared]
+            return int(shared[np.argmin(((xy - xy.mean(axis=0)) ** 2).sum(axis=1))])
+        a = np.fromiter(nodes_a, dtype=np.int64)
+        b = np.fromiter(nodes_b, dtype=np.int64)
+        gaps = ((self._xy[a][:, None, :] - self._xy[b][None, :, :]) ** 2).sum(axis=2)
+        i, j = np.unravel_index(np.argmin(gaps), gaps.shape)
+        return int(a[i]) if gaps[i, j] <= PAIR_SNAP_DISTANCE_M ** 2 else None
+
+    def landmark(self, name):
+        key = ' '.join(normalize(name.replace('&', ' and ')))
+        if not key:
+            return None
+        if key not in self.landmarks:
+            key = fuzzy_match(key, self._fuzzy_landmarks)
+            if key is None:
+                return None
+        return self.landmarks[key][0]
+
+    def lookup(self, text):
+        """
+        Resolve an incident location ("Yonge St & Dundas St (Yonge-Dundas Square)") to
+        {lat, lon, node_id, match}, or None. Results are memoized per text.
+        """
+        if text in self._memo:
+            return self._memo[text]
+
+        # Main text first, then anything in parentheses
+        candidates = [re.sub(r'\(.*?\)', ' ', text).strip()] + re.findall(r'\((.*?)\)', text)
+        result = None
+        for candidate in candidates:
+            parts = [p for p in INTERSECTION_SEPARATORS.split(candidate) if p.strip()]
+            node_id, match = None, None
+            if len(parts) >= 2:
+                node_id, match = self.intersection(parts[0], parts[1]), 'intersection'
+            if node_id is None:
+                node_id, match = self.landmark(candidate), 'landmark'
+            if node_id is not None:
+                result = {
+                    'lat': float(self.graph.node_lat[node_id]),
+                    'lon': float(self.graph.node_lon[node_id]),
+                    'node_id': node_id,
+                    'match': match
+                }
+                break
+
+        if len(self._memo) >= MAX_MEMO_ENTRIES:
+            self._memo.clear()
+        self._memo[text] = result
+        return result
+
+
+if __name__ == "__main__":
+    from routing_engine import load_graph
+
+    print("=" * 80)
+    print("OFFLINE GAZETTEER")
+    print("=" * 80)
+
+    t0 = time.perf_counter()
+    graph = load_graph(os.getenv('ROUTING_GRAPH'), ch_path=None)
+    gazetteer = Gazetteer(graph)
+    print(f"\n📚 Indexed {len(gazetteer.street_names)} street names and {len(gazetteer.landmarks)} landmarks "
+          f"({(time.perf_counter() - t0) * 1000:.0f}ms)")
+
+    queries = sys.argv[1:] or [
+        "Yonge St & Dundas St", "King St W & Spadina Ave", "Front St E and Jarvis St",
+        "Queen St W at Bathurst", "Bloor / Bathurst", "Spadna Ave & Dundas St W",
+        "Yonge St & Dundas St (Yonge-Dundas Square)", "Union Station", "St Lawrence Market",
+        "District TFS 141", "Kingston Rd & Victoria Park Ave", "Dundas St & Dundas St W"
+    ]
+
+    print("\n📍 Lookups:")
+    for query in queries:
+        gazetteer._memo.clear()
+        t0 = time.perf_counter()
+        hit = gazetteer.lookup(query)
+        first_us = (time.perf_counter() - t0) * 1e6
+        t0 = time.perf_counter()
+        gazetteer.lookup(query)
+        repeat_us = (time.perf_counter() - t0) * 1e6
+        if hit:
+            print(f"   ✅ {query:45s} -> node {hit['node_id']:>6} ({hit['lat']:.5f}, {hit['lon']:.5f}) "
+                  f"[{hit['match']}, {first_us:.0f}µs, repeat {repeat_us:.1f}µs]")
+        else:
+            print(f"   ❌ {query:45s} -> no match [{first_us:.0f}µs]")
@@ -8,54 +8,40 @@ from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
 import asyncio
-import requests
 import json
 import sys
+import threading
 
-load_dotenv()
-
-def fetch_gta_updates():
-    url = "https://gtaupdate.com/"
-    response = requests.get(url)
-
-    if response.status_code != 200:
-        print("Error: Failed to fetch page")
-        return []
+from incident_feed import fetch_gta_updates
 
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    table = soup.find("table")
-    if not table:
-        print("Error: Table not found")
-        return []
+load_dotenv()
 
-    tbody = table.find("tbody")
-    rows = tbody.find_all("tr")
+MODEL = "gemini-2.0-flash-exp"
 
-    incidents = []
+_client = None
+_client_lock = threading.Lock()
 
-    for row in rows:
-        cols = row.find_all("td")
-        if len(cols) < 3:
-            continue  # skip empty rows
 
-        time = cols[0].text.strip()
-        district = cols[1].text.strip()
-        details = cols[2].text.strip()
+def get_client():
+    """One Gemini client per process, shared by every message (chat_server.py workers)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+        return _client
 
-        incidents.append({
-            "time": time,
-            "district": district,
-            "details": details
-        })
 
-    return incidents
+def format_user_input(message):
+    """Turn a {street, time, situation} message from chat.js into the Gemini prompt"""
+    street = message.get("street", "")
+    time = message.get("time", "")
+    situation = message.get("situation", "")
+    return f"Street: {street}, Time: {time}, Situation: {situation}"
 
 async def chat(user_input, incidents):
-    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-    model = "gemini-2.0-flash-exp"
+    client = get_client()
+    model = MODEL
 
     messages = [
         types.Content(
@@ -91,20 +77,17 @@ async def chat(user_input, incidents):
         config=generate_content_config,
     ):
         if chunk.text:
-            print(chunk.text, end="")
             response_text += chunk.text
 
     return response_text
 
 if __name__ == "__main__":
     # Read JSON input from stdin
+    # (one-off run; server.js sends messages to the warm workers in chat_server.py)
     input_data = json.load(sys.stdin)
-    street = input_data.get("street", "")
-    time = input_data.get("time", "")
-    situation = input_data.get("situation", "")
 
     # Construct user_input for Gemini
-    user_input = f"Street: {street}, Time: {time}, Situation: {situation}"
+    user_input = format_user_input(input_data)
 
     incidents = fetch_gta_updates()
 
@@ -0,0 +1,92 @@
+"""
+Persistent geocoding cache for geocoder.py
+SQLite table keyed by the normalized query text (gazetteer.normalize, so "King St W" and
+"King Street West" share an entry). Entries expire after a TTL - misses sooner than hits,
+since a place Nominatim didn't know may be added - and the least recently used rows are
+evicted beyond max_entries. Safe to share between threads.
+"""
+import sqlite3
+import threading
+import time
+
+from gazetteer import normalize
+
+DEFAULT_CACHE_PATH = 'geocode_cache.sqlite'
+DEFAULT_TTL_S = 30 * 24 * 3600        # found coordinates
+DEFAULT_NEGATIVE_TTL_S = 24 * 3600    # "no result" answers
+DEFAULT_MAX_ENTRIES = 20000
+
+
+def query_key(text):
+    return ' '.join(normalize(text))
+
+
+class GeocodeCache:
+    """query -> {lat, lon} or None ("known miss"), with TTL and LRU eviction"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_s=DEFAULT_TTL_S,
+                 negative_ttl_s=DEFAULT_NEGATIVE_TTL_S, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_s = ttl_s
+        self.negative_ttl_s = negative_ttl_s
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS geocode (
+                query TEXT PRIMARY KEY,
+                lat REAL,
+                lon REAL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )""")
+        self._db.execute('CREATE INDEX IF NOT EXISTS geocode_accessed ON geocode (accessed)')
+        self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM geocode').fetchone()[0]
+
+    def get(self, text):
+        """(True, coords or None) for a live entry, (False, None) if the query must be geocoded"""
+        key = query_key(text)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute('SELECT lat, lon, created FROM geocode WHERE query = ?', (key,)).fetchone()
+            if row is not None:
+                lat, lon, created = row
+                ttl = self.ttl_s if lat is not None else self.negative_ttl_s
+                if now - created < ttl:
+                    self._db.execute('UPDATE geocode SET accessed = ? WHERE query = ?', (now, key))
+                    self._db.commit()
+                    self.hits += 1
+                    return True, ({'lat': lat, 'lon': lon} if lat is not None else None)
+                self._db.execute('DELETE FROM geocode WHERE query = ?', (key,))
+                self._db.commit()
+            self.misses += 1
+            return False, None
+
+    def put(self, text, coords):
+        """Store coords ({lat, lon}) or None for a query with no result"""
+        now = time.time()
+        lat, lon = (coords['lat'], coords['lon']) if coords else (None, None)
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?)',
+                             (query_key(text), lat, lon, now, now))
+            self._db.execute("""
+                DELETE FROM geocode WHERE query IN (
+                    SELECT query FROM geocode ORDER BY accessed DESC LIMIT -1 OFFSET ?
+                )""", (self.max_entries,))
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM geocode')
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,190 @@
+"""
+Network geocoding for locations the offline gazetteer can't resolve
+Nominatim lookups are async: a batch of locations is resolved concurrently over one
+pooled requests.Session (run on worker threads), limited to max_concurrency requests in
+flight and one request start per min_interval_s - Nominatim's usage policy allows at most
+1 request/second. Every answer, including "not found", goes into the SQLite GeocodeCache,
+so a location that recurs is never requested twice. The same query is only sent once per
+batch.
+
+Run against a local stub server (no network):
+    python geocoder.py                      # demo batch with repeats, prints network vs cache hits
+    NOMINATIM_URL=http://127.0.0.1:8090/search python fetch_live_crimes.py
+with the stub started by serve_stub(8090) (or python geocoder.py --serve 8090).
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from geocode_cache import GeocodeCache, query_key
+
+NOMINATIM_URL = os.getenv('NOMINATIM_URL', 'https://nominatim.openstreetmap.org/search')
+USER_AGENT = 'SafeRouteAI/1.0'
+REQUEST_TIMEOUT_S = 10
+DEFAULT_CONCURRENCY = int(os.getenv('GEOCODE_CONCURRENCY', '1'))
+DEFAULT_MIN_INTERVAL_S = float(os.getenv('GEOCODE_MIN_INTERVAL_S', '1.0'))  # Nominatim: max 1 req/s
+
+
+class Geocoder:
+    """Cached, rate-limited async Nominatim client"""
+
+    def __init__(self, cache=None, url=NOMINATIM_URL, max_concurrency=DEFAULT_CONCURRENCY,
+                 min_interval_s=DEFAULT_MIN_INTERVAL_S):
+        self.cache = cache if cache is not None else GeocodeCache()
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.min_interval_s = min_interval_s
+        self.requests = 0
+        self.errors = 0
+        self._session = requests.Session()
+        self._session.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, max_concurrency))
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._next_slot = 0.0
+        self._slot_lock = threading.Lock()
+
+    def _fetch(self, text):
+        """Blocking Nominatim request: (coords or None, ok); ok is False on network/HTTP errors"""
+        params = {
+            'q': f"{text}, Toronto, Ontario, Canada",
+            'format': 'json',
+            'limit': 1,
+            'countrycodes': 'ca'
+        }
+        self.requests += 1
+        try:
+            response = self._session.get(self.url, params=params, timeout=REQUEST_TIMEOUT_S)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            self.errors += 1
+            print(f"Geocoding error for '{text}': {e}", file=sys.stderr)
+            return None, False
+        if data:
+            return {'lat': float(data[0]['lat']), 'lon': float(data[0]['lon'])}, True
+        return None, True
+
+    async def _wait_for_slot(self):
+        """Space request starts min_interval_s apart across all concurrent lookups"""
+        with self._slot_lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot)
+            self._next_slot = start + self.min_interval_s
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def geocode(self, text, semaphore=None):
+        """Coordinates for one location, or None (cached either way unless the request failed)"""
+        found, coords = self.cache.get(text)
+        if found:
+            return coords
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrency)
+        async with semaphore:
+            await self._wait_for_slot()
+            coords, ok = await asyncio.to_thread(self._fetch, text)
+        if ok:
+            self.cache.put(text, coords)
+        return coords
+
+    async def geocode_many(self, texts):
+        """Coordinates for each text (None where not found); each distinct query is looked up once"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        unique = {}
+        for text in texts:
+            unique.setdefault(query_key(text), text)
+        results = await asyncio.gather(*(self.geocode(text, semaphore) for text in unique.values()))
+        by_key = dict(zip(unique, results))
+        return [by_key[query_key(text)] for text in texts]
+
+    def geocode_all(self, texts):
+        """Blocking wrapper around geocode_many() for callers without an event loop"""
+        return asyncio.run(self.geocode_many(texts))
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses,
+            'cache_entries': len(self.cache)
+        }
+
+
+def serve_stub(port=0, places=None):
+    """
+    Nominatim stand-in on localhost answering /search?q=... from places ({name: (lat, lon)},
+    matched on the part of q before the first comma). Returns (server, search URL);
+    server.requests counts the requests it answered.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlparse, parse_qs
+
+    if places is None:
+        from gazetteer import LANDMARKS
+        places = LANDMARKS
+    known = {query_key(name): coords for name, coords in places.items()}
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query).get('q', [''])[0].split(',')[0]
+            self.server.requests += 1
+            coords = known.get(query_key(query))
+            results = [{'lat': str(coords[0]), 'lon': str(coords[1]), 'display_name': query}] if coords else []
+            body = json.dumps(results).encode('utf-8')
+            self.send_response(200 if url.path == '/search' else 404)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    httpd.requests = 0
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, f"http://127.0.0.1:{httpd.server_address[1]}/search"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == '--serve':
+        httpd, url = serve_stub(int(sys.argv[2]))
+        print(f"🧪 Stub Nominatim running at {url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    import tempfile
+
+    print("=" * 80)
+    print("CACHED ASYNC GEOCODING (local stub server)")
+    print("=" * 80)
+
+    httpd, url = serve_stub()
+    cache_path = os.path.join(tempfile.mkdtemp(), 'geocode_cache.sqlite')
+    geocoder = Geocoder(GeocodeCache(cache_path), url=url, max_concurrency=4, min_interval_s=0.05)
+    print(f"\n🌐 Stub: {url}")
+    print(f"💾 Cache: {cache_path}")
+
+    batch = ["Union Station", "CN Tower", "union station", "Rogers Centre", "Somewhere Unknown",
+             "Union  Station", "Casa Loma", "CN Tower"]
+    for run in (1, 2):
+        t0 = time.perf_counter()
+        results = geocoder.geocode_all(batch)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        print(f"\n🔁 Run {run}: {sum(r is not None for r in results)}/{len(batch)} found, "
+              f"{httpd.requests} stub requests so far ({elapsed_ms:.1f}ms)")
+
+    stats = geocoder.stats()
+    print(f"\n📊 Network requests: {stats['requests']}, cache hits: {stats['cache_hits']}, "
+          f"cache entries: {stats['cache_entries']}")
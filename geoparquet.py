@@ -0,0 +1,93 @@
+"""
+GeoParquet tables passed between pipeline stages
+intersection_weights.parquet and routing_edges.parquet hold the same rows as the CSVs,
+columnar and compressed: float32 coordinates, categorical text columns and a WKB
+geometry column with GeoParquet 1.0 metadata (lon/lat, OGC:CRS84), so GIS tools open
+them directly and the next stage loads typed columns instead of re-parsing text.
+The WKB points keep full precision; read_geoparquet() restores lat/lon from them.
+
+Needs pyarrow; without it the stages keep reading and writing only the CSV/GeoJSON files.
+"""
+import json
+import os
+import numpy as np
+import pandas as pd
+import shapely
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+GEOMETRY_COLUMN = 'geometry'
+
+# Column encodings per stage table (keyword arguments for write_geoparquet)
+INTERSECTION_LAYOUT = {'categorical': ('neighborhood',), 'float32': ('lat', 'lon')}
+EDGE_LAYOUT = {'categorical': ('street_name', 'highway_type')}
+
+
+def parquet_available():
+    return pq is not None
+
+
+def write_geoparquet(path, df, geometries, categorical=(), float32=()):
+    """
+    Write df plus a WKB geometry column (shapely geometries, lon/lat).
+    categorical columns are dictionary-encoded, float32 columns are stored single precision.
+    """
+    table_df = df.copy()
+    for col in categorical:
+        table_df[col] = table_df[col].astype('category')
+    for col in float32:
+        table_df[col] = table_df[col].astype(np.float32)
+    geometries = np.array(list(geometries), dtype=object)
+    table_df[GEOMETRY_COLUMN] = shapely.to_wkb(geometries)
+
+    geo = {
+        'version': '1.0.0',
+        'primary_column': GEOMETRY_COLUMN,
+        'columns': {
+            GEOMETRY_COLUMN: {
+                'encoding': 'WKB',
+                'geometry_types': sorted({g.geom_type for g in geometries}),
+                'bbox': [float(v) for v in shapely.total_bounds(geometries)]
+            }
+        }
+    }
+    table = pa.Table.from_pandas(table_df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'geo': json.dumps(geo).encode('utf-8')})
+    pq.write_table(table, path, compression='zstd')
+
+
+def read_geoparquet(path, columns=None, geometry=False):
+    """
+    Read a table written by write_geoparquet().
+    The WKB column is dropped unless geometry=True, which decodes it to shapely geometries.
+    lat/lon of point tables are restored from the exact WKB points (the columns are float32).
+    """
+    coords = [col for col in ('lat', 'lon') if columns is None or col in columns]
+    if columns is not None and (geometry or coords):
+        columns = list(columns) + [GEOMETRY_COLUMN]
+    df = pd.read_parquet(path, columns=columns)
+    if GEOMETRY_COLUMN in df.columns:
+        coords = [col for col in coords if col in df.columns]
+        geometries = None
+        if geometry or coords:
+            geometries = shapely.from_wkb(df[GEOMETRY_COLUMN].to_numpy())
+        if coords and np.all(shapely.get_type_id(geometries) == 0):  # 0 = Point
+            exact = {'lon': shapely.get_x(geometries), 'lat': shapely.get_y(geometries)}
+            for col in coords:
+                df[col] = exact[col]
+        if geometry:
+            df[GEOMETRY_COLUMN] = geometries
+        else:
+            df = df.drop(columns=GEOMETRY_COLUMN)
+    return df
+
+
+def read_stage(name, columns=None):
+    """Load a stage table: name.parquet when it exists (and pyarrow is installed), else name.csv"""
+    if parquet_available() and os.path.exists(f'{name}.parquet'):
+        return read_geoparquet(f'{name}.parquet', columns=columns)
+    return pd.read_csv(f'{name}.csv', usecols=columns)
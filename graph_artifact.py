@@ -0,0 +1,174 @@
+"""
+Compact binary routing graph artifact (routing_graph.bin)
+Fixed-width little-endian arrays that Python opens with np.memmap and the browser
+reads straight into typed arrays - no JSON parsing of nodes/edges/adjacency.
+
+Layout (byte offsets are multiples of each array's item size):
+    header        24 bytes  magic 'SRG1', version, num_nodes, num_edges, strings_offset, strings_len (u32)
+    node_lat      f64[num_nodes]
+    node_lon      f64[num_nodes]
+    node_weight   f32[num_nodes]
+    node_component i32[num_nodes]  connected component, 0 = largest, -1 = no edges
+    edge_source   u32[num_edges]
+    edge_target   u32[num_edges]
+    edge_length   f32[num_edges]   meters
+    edge_weight   f32[num_edges]
+    edge_name     u32[num_edges]   index into strings.street_names
+    edge_highway  u16[num_edges]   index into strings.highway_types
+    (padding to 4 bytes)
+    strings       UTF-8 JSON {"street_names": [...], "highway_types": [...]}
+
+Usage: python graph_artifact.py [routing_graph.json | routing_edges.csv | routing_edges.parquet] [output.bin]
+"""
+import json
+import sys
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+MAGIC = b'SRG1'
+VERSION = 2
+HEADER_SIZE = 24
+DEFAULT_PATH = 'routing_graph.bin'
+
+NODE_ARRAYS = [('node_lat', '<f8'), ('node_lon', '<f8'), ('node_weight', '<f4'), ('node_component', '<i4')]
+EDGE_ARRAYS = [('edge_source', '<u4'), ('edge_target', '<u4'), ('edge_length', '<f4'),
+               ('edge_weight', '<f4'), ('edge_name', '<u4'), ('edge_highway', '<u2')]
+
+
+def array_layout(num_nodes, num_edges):
+    """(name, dtype, offset, count) for every array, plus the offset where the string table starts"""
+    layout = []
+    offset = HEADER_SIZE
+    for arrays, count in ((NODE_ARRAYS, num_nodes), (EDGE_ARRAYS, num_edges)):
+        for name, dtype in arrays:
+            layout.append((name, dtype, offset, count))
+            offset += np.dtype(dtype).itemsize * count
+    strings_offset = (offset + 3) // 4 * 4
+    return layout, strings_offset
+
+
+def label_components(num_nodes, sources, targets):
+    """
+    Connected component id per node, numbered by size (0 = largest network).
+    Nodes without any edge get -1.
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    adjacency = coo_matrix((np.ones(len(sources)), (sources, targets)), shape=(num_nodes, num_nodes))
+    _, labels = connected_components(adjacency, directed=False)
+
+    has_edges = np.bincount(np.concatenate([sources, targets]), minlength=num_nodes) > 0
+    sizes = np.bincount(labels[has_edges], minlength=labels.max() + 1 if num_nodes else 0)
+    rank = np.empty(len(sizes), dtype=np.int32)
+    rank[np.argsort(-sizes, kind='stable')] = np.arange(len(sizes))
+    return np.where(has_edges, rank[labels], -1).astype(np.int32)
+
+
+def write_graph_artifact(path, node_lat, node_lon, node_weight, edges_df, node_component=None):
+    """
+    Write the binary artifact. Node arrays are indexed by node id (NaN for gaps);
+    edges_df needs source, target, length_m, weight and optionally street_name, highway_type.
+    node_component is computed with label_components() if not given.
+    """
+    num_nodes, num_edges = len(node_lat), len(edges_df)
+    if node_component is None:
+        node_component = label_components(num_nodes, edges_df['source'], edges_df['target'])
+
+    names = edges_df['street_name'].fillna('Unnamed') if 'street_name' in edges_df else pd.Series(['Unnamed'] * num_edges)
+    highways = edges_df['highway_type'].fillna('unclassified') if 'highway_type' in edges_df else pd.Series(['unclassified'] * num_edges)
+    name_codes, street_names = pd.factorize(names)
+    highway_codes, highway_types = pd.factorize(highways)
+
+    arrays = {
+        'node_lat': node_lat, 'node_lon': node_lon, 'node_weight': node_weight, 'node_component': node_component,
+        'edge_source': edges_df['source'], 'edge_target': edges_df['target'],
+        'edge_length': edges_df['length_m'], 'edge_weight': edges_df['weight'],
+        'edge_name': name_codes, 'edge_highway': highway_codes
+    }
+    strings = json.dumps({'street_names': list(street_names),
+                          'highway_types': list(highway_types)}).encode('utf-8')
+
+    layout, strings_offset = array_layout(num_nodes, num_edges)
+    header = np.array([num_nodes, num_edges, strings_offset, len(strings), VERSION], dtype='<u4')
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(header[4:].tobytes())   # version
+        f.write(header[:4].tobytes())   # counts + string table location
+        for name, dtype, offset, _ in layout:
+            f.write(np.asarray(arrays[name]).astype(dtype).tobytes())
+        f.write(b'\0' * (strings_offset - f.tell()))
+        f.write(strings)
+
+
+def read_header(path):
+    """(version, num_nodes, num_edges, strings_offset, strings_len)"""
+    with open(path, 'rb') as f:
+        raw = f.read(HEADER_SIZE)
+    if raw[:4] != MAGIC:
+        raise ValueError(f"{path} is not a routing graph artifact")
+    return tuple(int(v) for v in np.frombuffer(raw[4:], dtype='<u4'))
+
+
+def open_graph_artifact(path=DEFAULT_PATH, mode='r'):
+    """
+    Memory-map every array in the artifact.
+    Returns a dict of np.memmap arrays plus 'street_names' and 'highway_types' lists;
+    mode='r+' lets callers patch weights in place.
+    """
+    version, num_nodes, num_edges, strings_offset, strings_len = read_header(path)
+    if version != VERSION:
+        raise ValueError(f"Unsupported routing graph artifact version {version} in {path}; "
+                         f"re-run create_routing_graph.py or graph_artifact.py")
+
+    layout, _ = array_layout(num_nodes, num_edges)
+    graph = {
+        name: np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=(count,))
+        for name, dtype, offset, count in layout
+    }
+
+    with open(path, 'rb') as f:
+        f.seek(strings_offset)
+        graph.update(json.loads(f.read(strings_len).decode('utf-8')))
+    return graph
+
+
+if __name__ == "__main__":
+    import os
+    import time
+
+    default_source = 'routing_graph.json' if os.path.exists('routing_graph.json') else 'routing_edges.csv'
+    source = sys.argv[1] if len(sys.argv) > 1 else default_source
+    output = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PATH
+
+    print("="*80)
+    print("WRITING BINARY ROUTING GRAPH")
+    print("="*80)
+
+    if source.endswith('.json'):
+        with open(source, 'r') as f:
+            graph_data = json.load(f)
+        nodes_df = pd.DataFrame(graph_data['nodes']).set_index('id')
+        edges_df = pd.DataFrame(graph_data['edges'])
+    elif source.endswith('.parquet'):
+        from geoparquet import read_geoparquet
+        nodes_df = read_geoparquet('intersection_weights.parquet', columns=['lat', 'lon', 'weight'])
+        edges_df = read_geoparquet(source)
+    else:
+        nodes_df = pd.read_csv('intersection_weights.csv', usecols=['lat', 'lon', 'weight'])
+        edges_df = pd.read_csv(source)
+
+    nodes_df = nodes_df.reindex(range(int(nodes_df.index.max()) + 1))
+    write_graph_artifact(output, nodes_df['lat'].to_numpy(), nodes_df['lon'].to_numpy(),
+                         nodes_df['weight'].fillna(0).to_numpy(), edges_df)
+    print(f"\n💾 {output}: {len(nodes_df)} nodes, {len(edges_df)} edges, "
+          f"{os.path.getsize(output) / 1e6:.2f} MB")
+
+    t0 = time.perf_counter()
+    graph = open_graph_artifact(output)
+    print(f"⚡ Memory-mapped in {(time.perf_counter() - t0) * 1000:.2f}ms")
+    components = graph['node_component']
+    print(f"🧩 {int(components.max()) + 1} connected components, main network "
+          f"{int((components == 0).sum())} nodes")
@@ -0,0 +1,250 @@
+"""
+Live incident feed from gtaupdate.com
+One scraper shared by gemini_api.py, fetch_live_crimes.py and chat_server.py.
+
+IncidentFeed keeps the parsed incident table in memory and refreshes it on a background
+thread every refresh_s seconds with a conditional GET (If-None-Match / If-Modified-Since),
+so an unchanged page costs a 304 and no parsing. Readers get the last snapshot in constant
+time; after ttl_s without a successful check the snapshot counts as stale and is not served.
+A new snapshot is published before on_change runs; the callback (e.g. Gemini extraction and
+geocoding) runs on its own worker thread and only ever sees the latest table.
+
+Run against the local fixture (no network):
+    python incident_feed.py                       # serves gtaupdate_fixture.html on localhost
+    python incident_feed.py https://gtaupdate.com/
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+from bs4 import BeautifulSoup
+
+GTA_UPDATE_URL = os.getenv('GTA_UPDATE_URL', 'https://gtaupdate.com/')
+FETCH_TIMEOUT_S = 10
+DEFAULT_REFRESH_S = 120   # background re-check interval
+DEFAULT_TTL_S = 900       # snapshot expires after this long without a successful check
+
+FIXTURE_HTML = 'gtaupdate_fixture.html'
+
+
+def parse_incidents(html):
+    """(time, district, details) rows of the incident table; [] if the page has no table"""
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table")
+    if not table:
+        print("Error: Incident table not found", file=sys.stderr)
+        return []
+
+    body = table.find("tbody") or table
+    incidents = []
+    for row in body.find_all("tr"):
+        cols = row.find_all("td")
+        if len(cols) < 3:
+            continue  # skip header / empty rows
+        incidents.append({
+            "time": cols[0].text.strip(),
+            "district": cols[1].text.strip(),
+            "details": cols[2].text.strip()
+        })
+    return incidents
+
+
+def fetch_gta_updates(url=GTA_UPDATE_URL):
+    """One-off scrape of the incident table (no caching); [] on failure"""
+    try:
+        response = requests.get(url, timeout=FETCH_TIMEOUT_S)
+    except requests.RequestException as e:
+        print(f"Error: Failed to fetch incidents: {e}", file=sys.stderr)
+        return []
+    if response.status_code != 200:
+        print(f"Error: Failed to fetch incidents (HTTP {response.status_code})", file=sys.stderr)
+        return []
+    return parse_incidents(response.text)
+
+
+class IncidentFeed:
+    """In-memory snapshot of the incident table, refreshed in the background with conditional GETs"""
+
+    def __init__(self, url=GTA_UPDATE_URL, refresh_s=DEFAULT_REFRESH_S, ttl_s=DEFAULT_TTL_S, on_change=None):
+        self.url = url
+        self.refresh_s = refresh_s
+        self.ttl_s = ttl_s
+        self.on_change = on_change   # called with the new incident list (off the refresh path) when it changes
+        self.incidents = []
+        self.version = 0             # bumped on every content change
+        self.changed_at = None       # wall clock of the last content change
+        self.checked_at = None       # monotonic time of the last successful check (200 or 304)
+        self.fetches = 0
+        self.not_modified = 0
+        self.errors = 0
+        self._etag = None
+        self._last_modified = None
+        self._content_hash = None
+        self._session = requests.Session()
+        self._lock = threading.Lock()      # guards the snapshot
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._callbacks = ThreadPoolExecutor(max_workers=1, thread_name_prefix='incident-feed-on-change')
+
+    def refresh(self):
+        """Check the site once; returns True if the incident table changed"""
+        with self._refresh_lock:
+            headers = {}
+            if self._etag:
+                headers['If-None-Match'] = self._etag
+            if self._last_modified:
+                headers['If-Modified-Since'] = self._last_modified
+            try:
+                response = self._session.get(self.url, headers=headers, timeout=FETCH_TIMEOUT_S)
+            except requests.RequestException as e:
+                self.errors += 1
+                print(f"Incident feed error: {e}", file=sys.stderr)
+                return False
+
+            self.fetches += 1
+            if response.status_code == 304:
+                self.not_modified += 1
+                with self._lock:
+                    self.checked_at = time.monotonic()
+                return False
+            if response.status_code != 200:
+                self.errors += 1
+                print(f"Incident feed error: HTTP {response.status_code}", file=sys.stderr)
+                return False
+
+            self._etag = response.headers.get('ETag')
+            self._last_modified = response.headers.get('Last-Modified')
+            # Servers that ignore the validators still send the same bytes; don't re-parse those
+            content_hash = hashlib.sha1(response.content).hexdigest()
+            if content_hash == self._content_hash:
+                with self._lock:
+                    self.checked_at = time.monotonic()
+                return False
+
+            incidents = parse_incidents(response.text)
+            with self._lock:
+                self.incidents = incidents
+                self.version += 1
+                version = self.version
+                self.changed_at = datetime.now(timezone.utc).isoformat()
+                self.checked_at = time.monotonic()
+            self._content_hash = content_hash
+        if self.on_change is not None:
+            self._callbacks.submit(self._notify, version)
+        return True
+
+    def _notify(self, version):
+        """Run on_change for a published version unless a newer one is already queued"""
+        with self._lock:
+            if version != self.version:
+                return
+            incidents = self.incidents
+        try:
+            self.on_change(incidents)
+        except Exception as e:
+            print(f"Incident feed on_change error: {e}", file=sys.stderr)
+
+    def start(self):
+        """Fetch once now, then keep refreshing on a daemon thread"""
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, name='incident-feed', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._callbacks.shutdown(wait=False)
+
+    def wait_for_callbacks(self):
+        """Block until every on_change queued so far has run (for scripts and tests)"""
+        self._callbacks.submit(lambda: None).result()
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_s):
+            try:
+                self.refresh()
+            except Exception as e:  # keep the thread alive whatever the page or callback does
+                self.errors += 1
+                print(f"Incident feed error: {e}", file=sys.stderr)
+
+    def is_fresh(self):
+        with self._lock:
+            return self.checked_at is not None and time.monotonic() - self.checked_at < self.ttl_s
+
+    def get(self):
+        """Current incidents, or [] if the snapshot is older than the TTL"""
+        with self._lock:
+            if self.checked_at is None or time.monotonic() - self.checked_at >= self.ttl_s:
+                return []
+            return self.incidents
+
+    def stats(self):
+        with self._lock:
+            age = time.monotonic() - self.checked_at if self.checked_at is not None else None
+            return {
+                'url': self.url,
+                'incidents': len(self.incidents),
+                'version': self.version,
+                'changed_at': self.changed_at,
+                'checked_age_s': age,
+                'fresh': age is not None and age < self.ttl_s,
+                'refresh_s': self.refresh_s,
+                'ttl_s': self.ttl_s,
+                'fetches': self.fetches,
+                'not_modified': self.not_modified,
+                'errors': self.errors
+            }
+
+
+def serve_fixture():
+    """Serve this directory on a free localhost port; returns (server, fixture URL)"""
+    from functools import partial
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=directory))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, f"http://127.0.0.1:{httpd.server_address[1]}/{FIXTURE_HTML}"
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("LIVE INCIDENT FEED")
+    print("=" * 80)
+
+    if len(sys.argv) > 1:
+        url = sys.argv[1]
+    else:
+        _, url = serve_fixture()
+        print(f"\n🧪 Serving local fixture {FIXTURE_HTML}")
+    print(f"🌐 Source: {url}")
+
+    feed = IncidentFeed(url)
+    t0 = time.perf_counter()
+    feed.refresh()
+    first_ms = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    feed.refresh()
+    second_ms = (time.perf_counter() - t0) * 1000
+
+    print(f"\n📥 First fetch:  {len(feed.get())} incidents ({first_ms:.1f}ms)")
+    print(f"🔁 Second fetch: {'304 Not Modified' if feed.not_modified else 'full download'} ({second_ms:.1f}ms)")
+
+    t0 = time.perf_counter()
+    for _ in range(10000):
+        feed.get()
+    print(f"⚡ Snapshot read: {(time.perf_counter() - t0) / 10000 * 1e6:.2f}µs")
+
+    print("\n📋 Incidents:")
+    for incident in feed.get()[:10]:
+        print(f"   [{incident['time']}] {incident['district']}: {incident['details'][:70]}")
@@ -0,0 +1,119 @@
+"""
+Safe-reachability isochrones
+"Everything reachable within X metres with average danger below Y" from one start node,
+answered with a single bounded one-to-many Dijkstra instead of many point-to-point searches.
+
+Distances come from scipy's csgraph Dijkstra (limit = X). Path risk along the resulting
+shortest-path tree is accumulated with pointer doubling - log(depth) vectorized passes
+over the whole frontier - and the qualifying edges are then picked in one NumPy pass.
+"""
+import numpy as np
+from scipy.sparse.csgraph import dijkstra
+
+from landmarks import edge_matrix, edge_lengths
+from routing_engine import MAX_EDGE_WEIGHT
+
+
+def sum_to_root(parent, values):
+    """
+    Sum of values over each node and all its ancestors (parent -1 = root) for a whole forest,
+    by pointer doubling: after k passes each node holds the sum over its 2^k nearest ancestors.
+    """
+    totals = np.array(values, dtype=np.float64)
+    anc = np.array(parent, dtype=np.int64)
+    while True:
+        active = np.flatnonzero(anc >= 0)
+        if len(active) == 0:
+            return totals
+        totals[active] += totals[anc[active]]
+        anc[active] = anc[anc[active]]
+
+
+class IsochroneSearch:
+    """Length matrix of a RoutingGraph, kept for repeated isochrone queries"""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.edge_lengths = edge_lengths(graph)
+        self.length_matrix, edge_index = edge_matrix(graph.num_nodes, graph.sources, graph.edge_targets,
+                                                     self.edge_lengths, return_edges=True)
+        self.edge_index = edge_index.tocsr()
+
+    def search(self, start, max_distance_m, max_danger=100.0):
+        """
+        Reachable street edges from start node within max_distance_m (along the shortest path)
+        whose path average danger (avg edge weight / MAX_EDGE_WEIGHT * 100, like dangerScore) stays
+        at or below max_danger. Uses the graph's current incident-penalized weights.
+
+        Returns a dict with edge ids, per-edge distance from start and path danger.
+        """
+        graph = self.graph
+        dist, pred, risk, hops = self.path_sums(start, max_distance_m)
+        reached = np.flatnonzero(np.isfinite(dist))
+
+        # An edge qualifies if it can be walked fully from a reached endpoint within budget
+        max_avg_weight = max_danger / 100.0 * MAX_EDGE_WEIGHT
+        best_dist = np.full(graph.num_edges, np.inf)
+        best_danger = np.full(graph.num_edges, np.inf)
+        for near, far in ((graph.sources, graph.edge_targets), (graph.edge_targets, graph.sources)):
+            end_dist = dist[near] + self.edge_lengths
+            avg_weight = (risk[near] + graph.edge_safety) / (hops[near] + 1)
+            ok = np.isfinite(end_dist) & (end_dist <= max_distance_m) & (avg_weight <= max_avg_weight)
+            better = ok & (end_dist < best_dist)
+            best_dist[better] = end_dist[better]
+            best_danger[better] = avg_weight[better] / MAX_EDGE_WEIGHT * 100
+
+        edge_ids = np.flatnonzero(np.isfinite(best_dist))
+        return {
+            'start': int(start),
+            'nodes_reached': int(len(reached)),
+            'edge_ids': edge_ids,
+            'distance_m': best_dist[edge_ids],
+            'danger': best_danger[edge_ids]
+        }
+
+    def path_sums(self, start, max_distance_m):
+        """
+        Shortest-path tree from start within max_distance_m: (dist, pred, risk, hops) where
+        risk/hops are the summed edge safety weight and edge count of each node's path from start.
+        """
+        dist, pred = dijkstra(self.length_matrix, indices=start, limit=max_distance_m,
+                              return_predecessors=True)
+        reached = np.flatnonzero(np.isfinite(dist))
+
+        # Risk and hop count of the tree edge into every reached node
+        risk = np.zeros(self.graph.num_nodes)
+        hops = np.zeros(self.graph.num_nodes)
+        parent = np.full(self.graph.num_nodes, -1, dtype=np.int64)
+        children = reached[pred[reached] >= 0]
+        parent[children] = pred[children]
+        tree_edges = np.asarray(self.edge_index[parent[children], children]).ravel() - 1
+        risk[children] = self.graph.edge_safety[tree_edges]
+        hops[children] = 1
+
+        return dist, pred, sum_to_root(parent, risk), sum_to_root(parent, hops)
+
+    def to_geojson(self, result):
+        """Reachable edges as a GeoJSON FeatureCollection (straight segments between intersections)"""
+        graph = self.graph
+        features = []
+        for edge_id, distance, danger in zip(result['edge_ids'].tolist(), result['distance_m'].tolist(),
+                                             result['danger'].tolist()):
+            source, target = int(graph.sources[edge_id]), int(graph.edge_targets[edge_id])
+            features.append({
+                'type': 'Feature',
+                'geometry': {
+                    'type': 'LineString',
+                    'coordinates': [[float(graph.node_lon[source]), float(graph.node_lat[source])],
+                                    [float(graph.node_lon[target]), float(graph.node_lat[target])]]
+                },
+                'properties': {
+                    'edge_id': edge_id,
+                    'source': source,
+                    'target': target,
+                    'street_name': graph.street_names[edge_id],
+                    'distance_m': round(distance, 1),
+                    'danger': round(danger, 1)
+                }
+            })
+        return {'type': 'FeatureCollection', 'features': features}
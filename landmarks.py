@@ -0,0 +1,125 @@
+"""
+ALT (A*, Landmarks, Triangle inequality) heuristic for the routing engine
+A handful of landmarks are picked far apart on the graph; exact distances from each
+landmark are stored for both metrics A* mixes - street length and safety weight.
+By the triangle inequality |d(l, t) - d(l, v)| is a lower bound on d(v, t), so
+
+    h(v) = (1 - weightFactor) * max_l |len(l, t) - len(l, v)| / 1000
+         +      weightFactor  * max_l |risk(l, t) - risk(l, v)|
+
+never overestimates the A* cost, and unlike the straight-line heuristic it stays
+informative when weightFactor is close to 1 (safest routes).
+The tables are built on the base weights. set_incidents() only ever raises a weight
+(penalties are capped at MAX_EDGE_WEIGHT but never pushed below the base weight), so the
+bound stays admissible while incidents are active.
+"""
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+NUM_LANDMARKS = 16
+
+# csgraph treats missing entries as "no edge", so zero-length streets get a tiny cost
+MIN_ARC_COST = 1e-9
+
+
+def edge_matrix(num_nodes, sources, targets, costs, return_edges=False):
+    """
+    Symmetric sparse matrix keeping the cheapest of parallel edges.
+    With return_edges=True also returns a matrix of the chosen edge id + 1 at the same positions.
+    """
+    keep = np.flatnonzero(sources != targets)
+    edge = np.concatenate([keep, keep])
+    src = np.concatenate([sources[keep], targets[keep]])
+    dst = np.concatenate([targets[keep], sources[keep]])
+    cost = np.maximum(costs[edge], MIN_ARC_COST)
+
+    order = np.lexsort((cost, dst, src))
+    src, dst, cost, edge = src[order], dst[order], cost[order], edge[order]
+    first = np.ones(len(src), dtype=bool)
+    first[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+
+    shape = (num_nodes, num_nodes)
+    matrix = csr_matrix((cost[first], (src[first], dst[first])), shape=shape)
+    if not return_edges:
+        return matrix
+    return matrix, csr_matrix((edge[first] + 1, (src[first], dst[first])), shape=shape)
+
+
+class Landmarks:
+    """Landmark ids plus (num_landmarks, num_nodes) length and weight distance tables"""
+
+    ARRAYS = ('ids', 'length_dist', 'weight_dist', 'reached')
+
+    def __init__(self, ids, length_dist, weight_dist, reached=None):
+        self.ids = np.asarray(ids)
+        if reached is not None:
+            # Tables already prepared (e.g. shared by batch_routing.py workers)
+            self.reached, self.length_dist, self.weight_dist = reached, length_dist, weight_dist
+            return
+        # Landmarks all sit in the main network: a node is reached by all of them or by none.
+        # Tables are kept finite (0 for unreached nodes) so queries skip inf/nan handling.
+        self.reached = np.isfinite(length_dist).all(axis=0)
+        self.length_dist = np.where(self.reached, length_dist, 0.0)
+        self.weight_dist = np.where(self.reached, weight_dist, 0.0)
+
+    @classmethod
+    def select(cls, graph, num_landmarks=NUM_LANDMARKS, seed=0):
+        """
+        Farthest-point selection on street length: each new landmark is the node
+        farthest (by network distance) from the ones already picked.
+        """
+        length_matrix = edge_matrix(graph.num_nodes, graph.sources, graph.edge_targets,
+                                    edge_lengths(graph))
+        weight_matrix = edge_matrix(graph.num_nodes, graph.sources, graph.edge_targets,
+                                    graph.edge_weights)
+
+        # Start from a random node of the main network, so landmarks spread over it
+        main = np.flatnonzero(graph.node_component == 0)
+        seed_node = int(np.random.default_rng(seed).choice(main))
+        nearest = dijkstra(length_matrix, indices=seed_node)
+
+        ids = []
+        rows = []
+        for _ in range(num_landmarks):
+            reachable = np.where(np.isfinite(nearest), nearest, -1.0)
+            if ids:
+                reachable[ids] = -1.0
+            candidate = int(np.argmax(reachable))
+            if reachable[candidate] <= 0:
+                break
+            ids.append(candidate)
+            rows.append(dijkstra(length_matrix, indices=candidate))
+            nearest = np.minimum(nearest, rows[-1]) if len(ids) > 1 else rows[-1]
+
+        length_dist = np.vstack(rows)
+        weight_dist = dijkstra(weight_matrix, indices=ids)
+        return cls(ids, length_dist, weight_dist)
+
+    def heuristic(self, target, weight_factor):
+        """
+        Per-node lower bound on the A* cost to target.
+        If target is outside the landmarks' network the bound is 0, except for nodes
+        inside it, which cannot reach target and get inf (and vice versa).
+        """
+        if not self.reached[target]:
+            return np.where(self.reached, np.inf, 0.0)
+
+        h = (1 - weight_factor) / 1000.0 * self._bound(self.length_dist, target)
+        h += weight_factor * self._bound(self.weight_dist, target)
+        h[~self.reached] = np.inf
+        return h
+
+    @staticmethod
+    def _bound(dist, target):
+        """max over landmarks of |d(l, target) - d(l, v)| for every node v"""
+        diff = dist[:, [target]] - dist
+        np.abs(diff, out=diff)  # in place: avoids a second (num_landmarks, num_nodes) temporary
+        return diff.max(axis=0)
+
+
+def edge_lengths(graph):
+    """Length in meters per edge (RoutingGraph stores lengths per arc)"""
+    lengths = np.zeros(graph.num_edges)
+    lengths[graph.edge_ids] = graph.lengths
+    return lengths
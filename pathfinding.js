@@ -5,37 +5,54 @@
 
 // Transport modes removed - uses any available path
 
+/**
+ * Binary min-heap keyed on priority.
+ * enqueue/dequeue are O(log n); A* uses lazy deletion (stale entries are
+ * skipped via the closed set) instead of decrease-key.
+ */
 class PriorityQueue {
     constructor() {
         this.items = [];
     }
 
     enqueue(element, priority) {
+        const items = this.items;
         const item = { element, priority };
-        
-        // Binary search insertion (much faster than full sort)
-        if (this.items.length === 0) {
-            this.items.push(item);
-            return;
-        }
-        
-        let low = 0;
-        let high = this.items.length;
-        
-        while (low < high) {
-            const mid = (low + high) >>> 1;
-            if (this.items[mid].priority < priority) {
-                low = mid + 1;
-            } else {
-                high = mid;
-            }
+        let i = items.length;
+        items.push(item);
+
+        // Sift up
+        while (i > 0) {
+            const parent = (i - 1) >>> 1;
+            if (items[parent].priority <= priority) break;
+            items[i] = items[parent];
+            i = parent;
         }
-        
-        this.items.splice(low, 0, item);
+        items[i] = item;
     }
 
     dequeue() {
-        return this.items.shift();
+        const items = this.items;
+        if (items.length === 0) return undefined;
+
+        const top = items[0];
+        const last = items.pop();
+        if (items.length > 0) {
+            // Sift down
+            const n = items.length;
+            let i = 0;
+            while (true) {
+                const left = 2 * i + 1;
+                if (left >= n) break;
+                const right = left + 1;
+                const child = (right < n && items[right].priority < items[left].priority) ? right : left;
+                if (items[child].priority >= last.priority) break;
+                items[i] = items[child];
+                i = child;
+            }
+            items[i] = last;
+        }
+        return top;
     }
 
     isEmpty() {
@@ -62,13 +79,15 @@ function getDistance(lat1, lon1, lat2, lon2) {
 }
 
 /**
- * Find nearest node to a clicked point
+ * Find nearest node to a clicked point.
+ * Nodes with a component id only qualify in the main network (component 0).
  */
 function findNearestNode(lat, lon, nodes) {
     let nearest = null;
     let minDist = Infinity;
 
     for (const node of nodes) {
+        if (node.component !== undefined && node.component !== 0) continue;
         const dist = getDistance(lat, lon, node.lat, node.lon);
         if (dist < minDist) {
             minDist = dist;
@@ -79,6 +98,60 @@ function findNearestNode(lat, lon, nodes) {
     return nearest;
 }
 
+/**
+ * O(1) check for nodes that can never be connected: different components,
+ * or a node without edges (component -1). Graphs without component ids always pass.
+ */
+function inDifferentComponents(startNode, endNode) {
+    if (startNode.component === undefined || endNode.component === undefined) return false;
+    if (startNode.id === endNode.id) return false;
+    return startNode.component < 0 || startNode.component !== endNode.component;
+}
+
+/**
+ * Opt-in tracer for astar(): counts search work and samples per-edge detail.
+ * When no tracer is passed, astar() only pays a null check per event.
+ *
+ * Usage: astar(graph, nodes, a, b, 0.9, { tracer: new AstarTracer({ sampleRate: 0.01 }) })
+ */
+class AstarTracer {
+    constructor({ sampleRate = 0, log = console.log } = {}) {
+        this.sampleRate = sampleRate;  // fraction of relaxations to log (0 = counters only)
+        this.log = log;
+        this.reset();
+    }
+
+    reset() {
+        this.searches = 0;
+        this.nodesExpanded = 0;
+        this.edgesRelaxed = 0;
+        this.weightCalls = 0;
+        this.weightTimeMs = 0;
+        this.searchTimeMs = 0;
+        this.samplesLogged = 0;
+    }
+
+    // message is a function so the string is only built for sampled events
+    sample(message) {
+        if (this.sampleRate > 0 && Math.random() < this.sampleRate) {
+            this.samplesLogged++;
+            this.log(message());
+        }
+    }
+
+    summary() {
+        return {
+            searches: this.searches,
+            nodesExpanded: this.nodesExpanded,
+            edgesRelaxed: this.edgesRelaxed,
+            weightCalls: this.weightCalls,
+            weightTimeMs: this.weightTimeMs,
+            searchTimeMs: this.searchTimeMs,
+            samplesLogged: this.samplesLogged
+        };
+    }
+}
+
 /**
  * A* Algorithm - finds path between start and end nodes
  * @param {object} graph - adjacency list {nodeId: [{target, weight, length_m}, ...]}
@@ -86,12 +159,14 @@ function findNearestNode(lat, lon, nodes) {
  * @param {number} startId - start node ID
  * @param {number} endId - end node ID
  * @param {number} weightFactor - 0 = shortest, 1 = safest, 0.5 = balanced
+ * @param {object} options - {queue: open-set class (default PriorityQueue), tracer: AstarTracer}
  */
-function astar(graph, nodes, startId, endId, weightFactor = 0.5) {
-    console.log(`  🔍 A* search (weightFactor=${weightFactor})...`);
+function astar(graph, nodes, startId, endId, weightFactor = 0.5, options = {}) {
     const startTime = performance.now();
+    const tracer = options.tracer || null;
     
-    const openSet = new PriorityQueue();
+    const QueueClass = options.queue || PriorityQueue;
+    const openSet = new QueueClass();
     const closedSet = new Set();
     const cameFrom = {};
     const gScore = {};
@@ -106,8 +181,15 @@ function astar(graph, nodes, startId, endId, weightFactor = 0.5) {
         console.error('  ❌ Invalid start or end node');
         return null;
     }
+    if (inDifferentComponents(startNode, endNode)) {
+        console.log('  ❌ No path found (different components)');
+        return null;
+    }
     
-    // No transport mode restrictions
+    // Resolve the crime-event weight adjustment once, not per edge
+    const adjustWeight = (typeof window !== 'undefined' && typeof window.getAdjustedEdgeWeight === 'function')
+        ? window.getAdjustedEdgeWeight
+        : null;
     
     const heuristic = getDistance(startNode.lat, startNode.lon, endNode.lat, endNode.lon) / 1000;
     openSet.enqueue(startId, heuristic);
@@ -116,86 +198,79 @@ function astar(graph, nodes, startId, endId, weightFactor = 0.5) {
     const maxIterations = 50000;
 
     while (!openSet.isEmpty() && iterations < maxIterations) {
-        iterations++;
-        
         const current = openSet.dequeue().element;
-        console.log(`  🔄 Processing node: ${current} (type: ${typeof current})`);
-        console.log(`     gScore[${current}] = ${gScore[current]}`);
 
-        // Skip if already processed
+        // Skip stale heap entries for nodes that are already processed
         if (closedSet.has(current)) continue;
         closedSet.add(current);
+        iterations++;
 
         // Found the goal
         if (current === endId) {
             const elapsed = performance.now() - startTime;
+            if (tracer) {
+                tracer.searches++;
+                tracer.nodesExpanded += iterations;
+                tracer.searchTimeMs += elapsed;
+            }
             console.log(`  ✅ Path found in ${elapsed.toFixed(1)}ms (${iterations} iterations)`);
             return reconstructPath(cameFrom, current, nodes, graph);
         }
 
-        // Check all neighbors
+        const currentNode = nodes[current];
+        const currentG = gScore[current];
         const neighbors = graph[current] || [];
-        console.log(`  🔍 Checking ${neighbors.length} neighbors for node ${current}`);
         
         for (const edge of neighbors) {
             const neighbor = String(edge.target); // Convert to string to match node IDs
-            console.log(`    → Neighbor: ${neighbor} (original: ${edge.target}, type: ${typeof edge.target})`);
             
             // Skip if already processed
-            if (closedSet.has(neighbor)) {
-                console.log(`      ⏭️ Already processed`);
-                continue;
-            }
+            if (closedSet.has(neighbor)) continue;
             
-            // No highway type restrictions - use all edges
+            const neighborNode = nodes[neighbor];
+            if (!neighborNode) continue;
             
             // Cost = combination of distance and safety
             const distanceCost = edge.length_m / 1000; // Convert to km
             
             // Get adjusted safety cost based on crime events
-            const currentNode = nodes[current];
-            const neighborNode = nodes[neighbor];
             let safetyCost = edge.weight;
-            
-            console.log(`      🧪 Function check: ${typeof window.getAdjustedEdgeWeight}, currentNode: ${!!currentNode}, neighborNode: ${!!neighborNode}`);
-            
-            // Apply dynamic crime event adjustments if function is available
-            if (typeof window.getAdjustedEdgeWeight === 'function' && currentNode && neighborNode) {
-                const originalWeight = edge.weight;
-                safetyCost = window.getAdjustedEdgeWeight(edge.weight, currentNode, neighborNode);
-                console.log(`      🎯 Applied adjustment: ${originalWeight.toFixed(2)} → ${safetyCost.toFixed(2)}`);
+            if (adjustWeight && currentNode) {
+                if (tracer) {
+                    const t0 = performance.now();
+                    safetyCost = adjustWeight(edge.weight, currentNode, neighborNode);
+                    tracer.weightTimeMs += performance.now() - t0;
+                    tracer.weightCalls++;
+                } else {
+                    safetyCost = adjustWeight(edge.weight, currentNode, neighborNode);
+                }
             }
             
-            console.log(`      🔍 About to read gScore[${current}] - value is: ${gScore[current]}`);
-            console.log(`      🔑 gScore keys:`, Object.keys(gScore));
-            const currentG = gScore[current] ?? Infinity;  // Use ?? instead of || to handle 0 correctly
-            const neighborG = gScore[neighbor] ?? Infinity;
-            const tentativeGScore = currentG + 
+            const tentativeGScore = currentG +
                 (distanceCost * (1 - weightFactor) + safetyCost * weightFactor);
-            
-            console.log(`      📊 currentG: ${currentG}, neighborG: ${neighborG}, tentative: ${tentativeGScore}`);
+            const neighborG = gScore[neighbor] ?? Infinity;  // Use ?? instead of || to handle 0 correctly
+
+            if (tracer) {
+                tracer.edgesRelaxed++;
+                tracer.sample(() => `    ${current} → ${neighbor}: weight ${edge.weight.toFixed(2)} → ${safetyCost.toFixed(2)}, g ${tentativeGScore.toFixed(3)} (was ${neighborG})`);
+            }
 
             if (tentativeGScore < neighborG) {
                 cameFrom[neighbor] = { from: current, edge: edge };
                 gScore[neighbor] = tentativeGScore;
                 
-                const neighborNode = nodes[neighbor];
-                if (!neighborNode) {
-                    console.log(`      ❌ Neighbor node ${neighbor} not found in nodes lookup!`);
-                    console.log(`      🔑 Available node IDs sample:`, Object.keys(nodes).slice(0, 5));
-                    continue;
-                }
-                
-                console.log(`      ✅ Valid neighbor, adding to queue`);
                 const h = getDistance(neighborNode.lat, neighborNode.lon, endNode.lat, endNode.lon) / 1000;
-                const fScore = gScore[neighbor] + h * (1 - weightFactor);
-
-                openSet.enqueue(neighbor, fScore);
+                openSet.enqueue(neighbor, tentativeGScore + h * (1 - weightFactor));
             }
         }
     }
 
     const elapsed = performance.now() - startTime;
+    if (tracer) {
+        tracer.searches++;
+        tracer.nodesExpanded += iterations;
+        tracer.searchTimeMs += elapsed;
+    }
     console.log(`  ❌ No path found after ${elapsed.toFixed(1)}ms (${iterations} iterations)`);
     return null; // No path found
 }
@@ -246,24 +321,186 @@ function reconstructPath(cameFrom, current, nodes, graph) {
 }
 
 /**
- * Calculate 3 alternative routes
+ * Multi-criteria (distance, risk) label-setting search.
+ * One pass finds every route that is optimal for some weightFactor in
+ * [minWeightFactor, maxWeightFactor] (default 0.1-0.9, the shortest..safest modes).
+ * astar() cost is distance * (1 - w) + risk * w, and any w in the range is a positive
+ * mix of the costs at the two ends, so labels are compared on those two costs (x, y)
+ * and kept only while on the lower convex hull of their node's labels.
+ * Finished routes plus the straight-line distance bound prune everything else.
+ *
+ * @returns {{frontier: Array<{distance, risk}>, routeAt: function(weightFactor)}} or null if unreachable
+ */
+function paretoRoutes(graph, nodes, startId, endId, options = {}) {
+    const startTime = performance.now();
+    const maxLabels = options.maxLabels || 200000;
+    const wMin = options.minWeightFactor ?? 0.1;
+    const wMax = options.maxWeightFactor ?? 0.9;
+
+    const startNode = nodes[startId];
+    const endNode = nodes[endId];
+    if (!startNode || !endNode) {
+        console.error('  ❌ Invalid start or end node');
+        return null;
+    }
+    if (inDifferentComponents(startNode, endNode)) {
+        console.log(`  ❌ No path found after ${(performance.now() - startTime).toFixed(1)}ms (not connected)`);
+        return null;
+    }
+
+    const adjustWeight = (typeof window !== 'undefined' && typeof window.getAdjustedEdgeWeight === 'function')
+        ? window.getAdjustedEdgeWeight
+        : null;
+
+    // Straight-line lower bound on remaining distance (km); risk has no useful bound
+    const hCache = new Map();
+    const h = (id, node) => {
+        let value = hCache.get(id);
+        if (value === undefined) {
+            value = getDistance(node.lat, node.lon, endNode.lat, endNode.lon) / 1000;
+            hCache.set(id, value);
+        }
+        return value;
+    };
+
+    const makeLabel = (node, distance, risk, prev, edge) => ({
+        node, distance, risk, prev, edge, dead: false,
+        x: distance * (1 - wMin) + risk * wMin,
+        y: distance * (1 - wMax) + risk * wMax
+    });
+
+    const labelsAt = new Map();   // node id -> live labels on the lower convex hull, sorted by x
+    const openSet = new PriorityQueue();
+    const startLabel = makeLabel(startId, 0, 0, null, null);
+    labelsAt.set(startId, [startLabel]);
+    openSet.enqueue(startLabel, 0);
+
+    let expanded = 0;
+    let created = 1;
+    while (!openSet.isEmpty() && created < maxLabels) {
+        const label = openSet.dequeue().element;
+        if (label.dead) continue;
+        if (label.node === endId) continue;  // finished route, stays in labelsAt[endId]
+        const hLabel = h(label.node, nodes[label.node]);
+        if (hullDominated(labelsAt.get(endId), label.x + hLabel * (1 - wMin), label.y + hLabel * (1 - wMax))) continue;
+        expanded++;
+
+        const currentNode = nodes[label.node];
+        for (const edge of graph[label.node] || []) {
+            const neighbor = String(edge.target);
+            const neighborNode = nodes[neighbor];
+            if (!neighborNode) continue;
+
+            const risk = label.risk + (adjustWeight ? adjustWeight(edge.weight, currentNode, neighborNode) : edge.weight);
+            const next = makeLabel(neighbor, label.distance + edge.length_m / 1000, risk, label, edge);
+            const hNext = h(neighbor, neighborNode);
+            const boundX = next.x + hNext * (1 - wMin);
+            const boundY = next.y + hNext * (1 - wMax);
+
+            if (hullDominated(labelsAt.get(endId), boundX, boundY)) continue;
+            const existing = labelsAt.get(neighbor) || [];
+            if (hullDominated(existing, next.x, next.y)) continue;
+
+            labelsAt.set(neighbor, insertHull(existing, next));
+            // Sum of both costs: a dominating label is always dequeued first
+            openSet.enqueue(next, boundX + boundY);
+            created++;
+        }
+    }
+
+    if (created >= maxLabels) {
+        console.warn(`  ⚠️ Label limit (${maxLabels}) reached; frontier may be incomplete`);
+    }
+    const elapsed = performance.now() - startTime;
+    const finished = (labelsAt.get(endId) || []).slice().sort((a, b) => a.distance - b.distance);
+    if (finished.length === 0) {
+        console.log(`  ❌ No path found after ${elapsed.toFixed(1)}ms (${expanded} labels expanded)`);
+        return null;
+    }
+    console.log(`  ✅ ${finished.length} Pareto routes in ${elapsed.toFixed(1)}ms (${expanded} labels expanded)`);
+
+    const built = new Map();
+    return {
+        frontier: finished.map(l => ({ distance: l.distance, risk: l.risk })),
+        // Route minimizing distance * (1 - weightFactor) + risk * weightFactor (clamped to the searched range)
+        routeAt(weightFactor) {
+            const w = Math.min(wMax, Math.max(wMin, weightFactor));
+            let best = finished[0];
+            for (const l of finished) {
+                if (l.distance * (1 - w) + l.risk * w < best.distance * (1 - w) + best.risk * w) {
+                    best = l;
+                }
+            }
+            if (!built.has(best)) {
+                const cameFrom = {};
+                for (let l = best; l.prev; l = l.prev) {
+                    cameFrom[l.node] = { from: l.prev.node, edge: l.edge };
+                }
+                built.set(best, reconstructPath(cameFrom, best.node, nodes, graph));
+            }
+            return built.get(best);
+        }
+    };
+}
+
+// True if point (x, y) is no better than some label, or than a convex combination
+// of two neighbouring labels, for every mix of the two costs. labels is sorted by x.
+function hullDominated(labels, x, y) {
+    if (!labels || labels.length === 0) return false;
+    for (let i = 0; i < labels.length; i++) {
+        const a = labels[i];
+        if (a.x <= x && a.y <= y) return true;
+        const b = labels[i + 1];
+        if (b && a.x <= x && x <= b.x) {
+            // Point on segment a-b at this x
+            const t = (x - a.x) / (b.x - a.x || 1);
+            return a.y + t * (b.y - a.y) <= y;
+        }
+    }
+    return false;
+}
+
+// Insert a label into an x-sorted lower convex hull, killing labels it makes redundant
+function insertHull(labels, label) {
+    const merged = labels.concat([label]).sort((a, b) => a.x - b.x || a.y - b.y);
+    const hull = [];
+    for (const l of merged) {
+        // y must strictly decrease as x grows...
+        if (hull.length && hull[hull.length - 1].y <= l.y) {
+            l.dead = true;
+            continue;
+        }
+        // ...and the chain must stay convex: drop points on or above segment a-l
+        while (hull.length >= 2) {
+            const a = hull[hull.length - 2];
+            const b = hull[hull.length - 1];
+            const cross = (b.x - a.x) * (l.y - a.y) - (b.y - a.y) * (l.x - a.x);
+            if (cross > 0) break;
+            hull.pop().dead = true;
+        }
+        hull.push(l);
+    }
+    return hull;
+}
+
+/**
+ * Calculate 3 alternative routes from a single multi-criteria search.
+ * The result also carries the full frontier and routeAt(weightFactor), so a
+ * trade-off slider can pick any point without searching again.
  */
 function calculateRoutes(graph, nodes, startId, endId) {
     console.log(`Calculating routes from ${startId} to ${endId}`);
 
-    // Route 1: Safest (prioritize low weights)
-    const safestRoute = astar(graph, nodes, startId, endId, 0.9);
-    
-    // Route 2: Balanced (mix of distance and safety)
-    const balancedRoute = astar(graph, nodes, startId, endId, 0.5);
-    
-    // Route 3: Shortest (prioritize distance)
-    const shortestRoute = astar(graph, nodes, startId, endId, 0.1);
-
-    if (!safestRoute || !balancedRoute || !shortestRoute) {
+    const pareto = paretoRoutes(graph, nodes, startId, endId);
+    if (!pareto) {
         return null; // No path found
     }
 
+    // Same weightFactors as before: safest 0.9, balanced 0.5, shortest 0.1
+    const safestRoute = pareto.routeAt(0.9);
+    const balancedRoute = pareto.routeAt(0.5);
+    const shortestRoute = pareto.routeAt(0.1);
+
     return {
         safest: {
             ...safestRoute,
@@ -282,7 +519,126 @@ function calculateRoutes(graph, nodes, startId, endId) {
             name: '🔴 Shortest Route',
             color: '#ff0000',
             description: 'Fastest path, may go through risky areas'
+        },
+        frontier: pareto.frontier,
+        routeAt: pareto.routeAt
+    };
+}
+
+/**
+ * Read routing_graph.bin (see graph_artifact.py) into the same
+ * { nodes, adjacency_list } shape as routing_graph.json, without copying the edges.
+ * Arrays are viewed in place with typed arrays (only the string table is JSON) and
+ * kept as a CSR index in graph.csr; adjacency_list[id] builds a node's neighbour
+ * objects the first time a search reaches it, so memory stays close to the file size.
+ * Typed arrays use host byte order, which is little-endian on every browser we target.
+ */
+function readGraphArtifact(buffer) {
+    const header = new DataView(buffer, 0, 24);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== 'SRG1' || header.getUint32(4, true) !== 2) {
+        throw new Error('Not a version 2 routing graph artifact');
+    }
+    const numNodes = header.getUint32(8, true);
+    const numEdges = header.getUint32(12, true);
+    const stringsOffset = header.getUint32(16, true);
+    const stringsLength = header.getUint32(20, true);
+
+    let offset = 24;
+    const view = (ArrayType, count) => {
+        const array = new ArrayType(buffer, offset, count);
+        offset += array.byteLength;
+        return array;
+    };
+    const lat = view(Float64Array, numNodes);
+    const lon = view(Float64Array, numNodes);
+    const nodeWeight = view(Float32Array, numNodes);
+    const nodeComponent = view(Int32Array, numNodes);
+    const source = view(Uint32Array, numEdges);
+    const target = view(Uint32Array, numEdges);
+    const length = view(Float32Array, numEdges);
+    const weight = view(Float32Array, numEdges);
+    const nameIdx = view(Uint32Array, numEdges);
+    const highwayIdx = view(Uint16Array, numEdges);
+    const strings = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, stringsOffset, stringsLength)));
+
+    const nodes = [];
+    for (let id = 0; id < numNodes; id++) {
+        if (!Number.isNaN(lat[id])) {
+            nodes.push({ id, lat: lat[id], lon: lon[id], weight: nodeWeight[id], component: nodeComponent[id] });
         }
+    }
+
+    // CSR over both directions of every edge, in edge order per node (same order as the JSON graph)
+    const offsets = new Uint32Array(numNodes + 1);
+    for (let i = 0; i < numEdges; i++) {
+        offsets[source[i] + 1]++;
+        offsets[target[i] + 1]++;
+    }
+    for (let v = 0; v < numNodes; v++) offsets[v + 1] += offsets[v];
+    const arcTarget = new Uint32Array(2 * numEdges);
+    const arcEdge = new Uint32Array(2 * numEdges);
+    const fill = offsets.slice(0, numNodes);
+    for (let i = 0; i < numEdges; i++) {
+        let k = fill[source[i]]++;
+        arcTarget[k] = target[i];
+        arcEdge[k] = i;
+        k = fill[target[i]]++;
+        arcTarget[k] = source[i];
+        arcEdge[k] = i;
+    }
+
+    const built = new Map();
+    const neighbors = (id) => {
+        let list = built.get(id);
+        if (list === undefined) {
+            list = [];
+            for (let k = offsets[id]; k < offsets[id + 1]; k++) {
+                const e = arcEdge[k];
+                list.push({
+                    target: arcTarget[k],
+                    weight: weight[e],
+                    length_m: length[e],
+                    street_name: strings.street_names[nameIdx[e]],
+                    highway_type: strings.highway_types[highwayIdx[e]]
+                });
+            }
+            built.set(id, list);
+        }
+        return list;
+    };
+    const nodeWithEdges = (key) => {
+        if (typeof key !== 'string' || !/^\d+$/.test(key)) return -1;
+        const id = Number(key);
+        return id < numNodes && offsets[id + 1] > offsets[id] ? id : -1;
+    };
+
+    // Object-like view: graph[id], id in graph and Object.keys(graph) work as on the JSON adjacency list
+    const adjacencyList = new Proxy({}, {
+        get(_, key) {
+            const id = nodeWithEdges(key);
+            return id >= 0 ? neighbors(id) : undefined;
+        },
+        has(_, key) {
+            return nodeWithEdges(key) >= 0;
+        },
+        ownKeys() {
+            const keys = [];
+            for (let id = 0; id < numNodes; id++) {
+                if (offsets[id + 1] > offsets[id]) keys.push(String(id));
+            }
+            return keys;
+        },
+        getOwnPropertyDescriptor(_, key) {
+            const id = nodeWithEdges(key);
+            return id >= 0 ? { value: neighbors(id), writable: false, enumerable: true, configurable: true } : undefined;
+        }
+    });
+
+    return {
+        nodes,
+        adjacency_list: adjacencyList,
+        csr: { numNodes, numEdges, offsets, arcTarget, arcEdge, source, target, length, weight, lat, lon }
     };
 }
 
@@ -307,3 +663,8 @@ function getDangerLevel(score) {
     if (score < 80) return { label: 'Risky', color: '#ff6600' };
     return { label: 'High Risk', color: '#ff0000' };
 }
+
+// Allow Node.js scripts (benchmarks) to reuse the browser routing code
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = { PriorityQueue, AstarTracer, getDistance, findNearestNode, astar, reconstructPath, paretoRoutes, calculateRoutes, readGraphArtifact };
+}
@@ -1,89 +1,174 @@
 """
 Process small downtown Toronto OSM data and prepare for ML training
+Features are streamed one at a time from the xz-compressed extract and written
+straight to the streets/buildings/POIs files, so memory stays flat regardless of
+extract size (the full-Toronto planet extract works on a modest box).
+
+Usage: python process_downtown_osm.py [extract.osm.geojson(.xz)]
 """
 import json
 import lzma
-import pandas as pd
-import numpy as np
-from shapely.geometry import shape, Point
+import sys
 from collections import Counter
 
-print("="*70)
-print("PROCESSING DOWNTOWN TORONTO OSM DATA")
-print("="*70)
+DEFAULT_EXTRACT = 'planet_-79.429,43.629_-79.347,43.675.osm.geojson.xz'
+READ_CHUNK_CHARS = 1 << 20
+
+
+def iter_features(path, chunk_chars=READ_CHUNK_CHARS):
+    """
+    Yield the features of a GeoJSON FeatureCollection one at a time.
+    Reads the (optionally .xz) file in chunks and decodes each feature object
+    as soon as it is complete; only the current chunk is held in memory.
+    """
+    opener = lzma.open if path.endswith('.xz') else open
+    decoder = json.JSONDecoder()
+
+    with opener(path, 'rt', encoding='utf-8') as f:
+        buffer = ''
+        eof = False
+
+        def fill():
+            nonlocal buffer, eof
+            chunk = f.read(chunk_chars)
+            eof = not chunk
+            buffer += chunk
+
+        # Skip ahead to the opening bracket of the "features" array
+        while True:
+            key = buffer.find('"features"')
+            start = buffer.find('[', key) if key >= 0 else -1
+            if start >= 0:
+                pos = start + 1
+                break
+            if eof:
+                raise ValueError(f"{path} has no 'features' array")
+            fill()
+
+        while True:
+            # Skip separators between features
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos == len(buffer):
+                if eof:
+                    raise ValueError(f"{path} ended inside the 'features' array")
+                buffer, pos = '', 0
+                fill()
+                continue
+            if buffer[pos] == ']':
+                return
+
+            try:
+                feature, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Feature spans the chunk boundary: drop consumed text and read more
+                if eof:
+                    raise
+                buffer, pos = buffer[pos:], 0
+                fill()
+                continue
 
-# Load the new smaller OSM file (compressed with XZ)
-print("\n📍 Loading compressed OSM data...")
-with lzma.open('planet_-79.429,43.629_-79.347,43.675.osm.geojson.xz', 'rt', encoding='utf-8') as f:
-    osm_data = json.load(f)
+            yield feature
+            pos = end
 
-print(f"Total features: {len(osm_data['features'])}")
 
-# Separate by geometry type
-streets = []
-buildings = []
-pois = []
+class FeatureCollectionWriter:
+    """Write a GeoJSON FeatureCollection one feature per line without holding it in memory"""
 
-for feature in osm_data['features']:
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.f = open(path, 'w', encoding='utf-8')
+        self.f.write('{"type": "FeatureCollection", "features": [\n')
+
+    def write(self, feature):
+        if self.count:
+            self.f.write(',\n')
+        self.f.write(json.dumps(feature))
+        self.count += 1
+
+    def close(self):
+        self.f.write('\n]}\n')
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def classify(feature):
+    """'streets', 'buildings', 'pois' or None"""
     geom_type = feature['geometry']['type']
     props = feature['properties']
-    
+
     if geom_type == 'LineString' and 'highway' in props:
-        streets.append(feature)
+        return 'streets'
     elif geom_type == 'Polygon' and 'building' in props:
-        buildings.append(feature)
+        return 'buildings'
     elif 'amenity' in props or 'shop' in props:
-        pois.append(feature)
-
-print(f"\n📊 Breakdown:")
-print(f"   Streets: {len(streets)}")
-print(f"   Buildings: {len(buildings)}")
-print(f"   POIs: {len(pois)}")
-
-# Save separated files
-print("\n💾 Saving separated GeoJSON files...")
-
-with open('downtown_streets.geojson', 'w', encoding='utf-8') as f:
-    json.dump({
-        'type': 'FeatureCollection',
-        'features': streets
-    }, f, indent=2)
-
-with open('downtown_buildings.geojson', 'w', encoding='utf-8') as f:
-    json.dump({
-        'type': 'FeatureCollection',
-        'features': buildings
-    }, f, indent=2)
-
-with open('downtown_pois.geojson', 'w', encoding='utf-8') as f:
-    json.dump({
-        'type': 'FeatureCollection',
-        'features': pois
-    }, f, indent=2)
-
-print("   ✅ downtown_streets.geojson")
-print("   ✅ downtown_buildings.geojson")
-print("   ✅ downtown_pois.geojson")
-
-# Analyze street types
-print("\n🛣️  Street Types Distribution:")
-highway_types = Counter([s['properties'].get('highway', 'unknown') for s in streets])
-for htype, count in highway_types.most_common(10):
-    print(f"   {htype}: {count}")
-
-# Analyze POI types
-print("\n🏪 POI Types Distribution:")
-poi_types = []
-for poi in pois:
-    if 'amenity' in poi['properties']:
-        poi_types.append(poi['properties']['amenity'])
-    elif 'shop' in poi['properties']:
-        poi_types.append(f"shop:{poi['properties']['shop']}")
-
-poi_counter = Counter(poi_types)
-for ptype, count in poi_counter.most_common(10):
-    print(f"   {ptype}: {count}")
-
-print("\n" + "="*70)
-print("✅ DATA PROCESSING COMPLETE")
-print("="*70)
+        return 'pois'
+    return None
+
+
+if __name__ == "__main__":
+    extract_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_EXTRACT
+
+    print("="*70)
+    print("PROCESSING DOWNTOWN TORONTO OSM DATA")
+    print("="*70)
+
+    # Stream the compressed OSM file and route each feature to its output file
+    print(f"\n📍 Streaming compressed OSM data from {extract_path}...")
+
+    total = 0
+    highway_types = Counter()
+    poi_counter = Counter()
+
+    with FeatureCollectionWriter('downtown_streets.geojson') as streets, \
+         FeatureCollectionWriter('downtown_buildings.geojson') as buildings, \
+         FeatureCollectionWriter('downtown_pois.geojson') as pois:
+        writers = {'streets': streets, 'buildings': buildings, 'pois': pois}
+
+        for feature in iter_features(extract_path):
+            total += 1
+            kind = classify(feature)
+            if kind is None:
+                continue
+            writers[kind].write(feature)
+
+            props = feature['properties']
+            if kind == 'streets':
+                highway_types[props.get('highway', 'unknown')] += 1
+            elif kind == 'pois':
+                poi_counter[props['amenity'] if 'amenity' in props else f"shop:{props['shop']}"] += 1
+
+            if total % 100000 == 0:
+                print(f"   Processed {total} features...")
+
+    print(f"Total features: {total}")
+
+    print(f"\n📊 Breakdown:")
+    print(f"   Streets: {streets.count}")
+    print(f"   Buildings: {buildings.count}")
+    print(f"   POIs: {pois.count}")
+
+    print("\n💾 Saved separated GeoJSON files:")
+    print("   ✅ downtown_streets.geojson")
+    print("   ✅ downtown_buildings.geojson")
+    print("   ✅ downtown_pois.geojson")
+
+    # Analyze street types
+    print("\n🛣️  Street Types Distribution:")
+    for htype, count in highway_types.most_common(10):
+        print(f"   {htype}: {count}")
+
+    # Analyze POI types
+    print("\n🏪 POI Types Distribution:")
+    for ptype, count in poi_counter.most_common(10):
+        print(f"   {ptype}: {count}")
+
+    print("\n" + "="*70)
+    print("✅ DATA PROCESSING COMPLETE")
+    print("="*70)
@@ -0,0 +1,69 @@
+"""
+Shared risk model used by the weight pipeline
+Crime severity weights, intersection weight shares and category thresholds live here
+so calculate_intersection_weights.py and update_crime_weights.py always agree
+"""
+import pandas as pd
+
+CRIME_YEAR = 2024
+
+# Severity weight per crime type (applied to RATE columns)
+CRIME_TYPE_WEIGHTS = {
+    'HOMICIDE': 10.0,
+    'SHOOTING': 10.0,
+    'ROBBERY': 5.0,
+    'ASSAULT': 3.0,
+    'BREAKENTER': 2.0,
+    'AUTOTHEFT': 2.0,
+    'THEFTFROMMV': 1.0,
+    'THEFTOVER': 1.0,
+    'BIKETHEFT': 1.0
+}
+
+# Share of each feature in the intersection weight (sums to 1, scaled to 0-100)
+CRIME_SHARE = 0.40
+POI_SHARE = 0.20
+STREET_SHARE = 0.20
+DEGREE_SHARE = 0.20
+
+
+def rate_columns(crime_df, year=CRIME_YEAR):
+    """RATE columns (already normalized by population) for one year"""
+    return [col for col in crime_df.columns if str(year) in col and 'RATE' in col]
+
+
+def add_risk_scores(crime_df, year=CRIME_YEAR):
+    """Add RISK_SCORE and RISK_NORMALIZED (0-1) columns to the neighbourhood crime table"""
+    risk = pd.Series(0.0, index=crime_df.index)
+    for col in rate_columns(crime_df, year):
+        crime_type = col.split('_')[0]
+        if crime_type in CRIME_TYPE_WEIGHTS:
+            risk += crime_df[col] * CRIME_TYPE_WEIGHTS[crime_type]
+
+    crime_df['RISK_SCORE'] = risk
+    crime_df['RISK_NORMALIZED'] = (risk - risk.min()) / (risk.max() - risk.min())
+    return crime_df
+
+
+def risk_by_neighborhood(crime_df):
+    """NEIGHBOURHOOD_NAME -> RISK_NORMALIZED (first row wins on duplicate names)"""
+    return crime_df.drop_duplicates('NEIGHBOURHOOD_NAME').set_index('NEIGHBOURHOOD_NAME')['RISK_NORMALIZED']
+
+
+def node_category(weight):
+    """Intersection category and map color for a 0-100 weight"""
+    if weight < 30:
+        return 'Low', '#00ff00'  # green
+    elif weight < 60:
+        return 'Medium', '#ffff00'  # yellow
+    return 'High', '#ff0000'  # red
+
+
+def edge_weight(start_weight, end_weight, length_m):
+    """Edge weight = average node weight * length factor (normalized by km)"""
+    return (start_weight + end_weight) / 2 * (1 + length_m / 1000)
+
+
+def edge_category(weight):
+    """Edge category used by routing_edges.geojson"""
+    return 'Low' if weight < 50 else 'Medium' if weight < 100 else 'High'
@@ -0,0 +1,138 @@
+"""
+LRU cache of route results for the routing API
+Keyed by (start node, end node, weightFactor, incident version). Popular corridors are
+answered from memory instead of re-running A*.
+
+When crime events change, only entries whose path uses an edge that became more
+dangerous are dropped; every other cached path is still optimal because no alternative
+got cheaper. If any edge became safer (an incident was removed or lowered) a better
+path may now exist anywhere, so the whole cache is cleared.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Size limits: number of cached routes and total street segments across them
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_MAX_SEGMENTS = 500000
+
+
+class RouteCache:
+    """Thread-safe LRU of route dicts (or None for "no path") with per-edge invalidation"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_segments=DEFAULT_MAX_SEGMENTS):
+        self.max_entries = max_entries
+        self.max_segments = max_segments
+        self.version = 0  # incident version the cached entries are valid for
+        self._entries = OrderedDict()   # (start, end, weight_factor) -> (route, edge ids)
+        self._by_edge = {}              # edge id -> set of keys whose path uses it
+        self._segments = 0
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.hit_seconds = 0.0
+        self.miss_seconds = 0.0
+
+    def get(self, key, version):
+        """(True, route) on a hit, (False, None) on a miss or if version is not the cached one"""
+        with self._lock:
+            if version != self.version or key not in self._entries:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, self._entries[key][0]
+
+    def put(self, key, version, route, edge_ids=()):
+        """Cache route (None for unreachable pairs); edge_ids are the street edges the path uses"""
+        edges = frozenset(int(e) for e in edge_ids)
+        if self.max_entries <= 0 or len(edges) > self.max_segments:
+            return
+        with self._lock:
+            if version != self.version:
+                return  # computed before an incident update finished; don't cache
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (route, edges)
+            for edge in edges:
+                self._by_edge.setdefault(edge, set()).add(key)
+            self._segments += len(edges)
+            while len(self._entries) > self.max_entries or self._segments > self.max_segments:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def record(self, hit, seconds):
+        """Count a lookup and the time it took to answer (cache hit or computed route)"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.hit_seconds += seconds
+            else:
+                self.misses += 1
+                self.miss_seconds += seconds
+
+    def invalidate(self, old_weights, new_weights, version):
+        """
+        Move the cache to a new incident version given per-edge safety weights before and after.
+        Returns the number of entries dropped.
+        """
+        changed = np.flatnonzero(old_weights != new_weights)
+        with self._lock:
+            self.version = version
+            if len(changed) == 0:
+                return 0
+            if np.any(new_weights[changed] < old_weights[changed]):
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._by_edge.clear()
+                self._segments = 0
+            else:
+                stale = set()
+                for edge in changed.tolist():
+                    stale.update(self._by_edge.get(edge, ()))
+                for key in stale:
+                    self._remove(key)
+                dropped = len(stale)
+            self.invalidations += dropped
+            return dropped
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_edge.clear()
+            self._segments = 0
+
+    def _remove(self, key):
+        _, edges = self._entries.pop(key)
+        for edge in edges:
+            keys = self._by_edge[edge]
+            keys.discard(key)
+            if not keys:
+                del self._by_edge[edge]
+        self._segments -= len(edges)
+
+    def stats(self):
+        """Hit rate, average latency of hits and misses, size and eviction counts"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'segments': self._segments,
+                'max_entries': self.max_entries,
+                'max_segments': self.max_segments,
+                'version': self.version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'avg_hit_ms': self.hit_seconds / self.hits * 1000 if self.hits else 0.0,
+                'avg_miss_ms': self.miss_seconds / self.misses * 1000 if self.misses else 0.0,
+                'evictions': self.evictions,
+                'invalidated': self.invalidations
+            }
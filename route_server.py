@@ -0,0 +1,210 @@
+"""
+Routing API for SafeRoute AI
+Keeps the CSR routing graph in memory and answers route queries over HTTP.
+server.js proxies the endpoints below to this process.
+
+GET  /route?start=<node id>&end=<node id>&mode=safest|balanced|shortest|all
+GET  /route?start=...&end=...&weight_factor=0.7
+GET  /nearest?lat=43.65&lon=-79.38[&max_distance=200]   snap a point to an intersection
+GET  /isochrone?lat=...&lon=...&max_distance=2000&max_danger=40   reachable edges as GeoJSON
+GET  /isochrone?start=<node id>&...&format=ids                    edge ids only
+GET  /route-cache                    route cache hit rate, latency and size
+GET  /incidents                      active crime events and version
+POST /incidents {"events": [{lat, lon, impact}, ...]}
+"""
+import json
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from isochrone import IsochroneSearch
+from route_cache import RouteCache, DEFAULT_MAX_ENTRIES
+from routing_engine import load_graph, ROUTE_MODES
+
+# Isochrones larger than this would return most of the city
+MAX_ISOCHRONE_DISTANCE_M = 10000.0
+
+PORT = int(os.getenv('ROUTE_SERVER_PORT', '3001'))
+GRAPH_PATH = os.getenv('ROUTING_GRAPH')  # default: routing_graph.bin, routing_graph.json, then the CSVs
+ROUTE_CACHE_SIZE = int(os.getenv('ROUTE_CACHE_SIZE', str(DEFAULT_MAX_ENTRIES)))  # 0 disables the cache
+
+graph = None
+isochrones = None
+
+
+def handle_route(params, body=None):
+    """Resolve a /route query into (status, payload)"""
+    try:
+        start = int(params['start'][0])
+        end = int(params['end'][0])
+    except (KeyError, ValueError):
+        return 400, {'error': 'start and end node ids are required'}
+
+    mode = params.get('mode', ['safest'])[0]
+    t0 = time.perf_counter()
+
+    if 'weight_factor' in params:
+        try:
+            weight_factor = float(params['weight_factor'][0])
+        except ValueError:
+            return 400, {'error': 'weight_factor must be a number'}
+        routes = {'custom': graph.route(start, end, weight_factor)}
+    elif mode == 'all':
+        routes = graph.routes(start, end)
+    elif mode in ROUTE_MODES:
+        routes = {mode: graph.route(start, end, ROUTE_MODES[mode])}
+    else:
+        return 400, {'error': f"Unknown mode '{mode}'"}
+
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    if any(route is None for route in routes.values()):
+        return 404, {'error': 'No path found', 'elapsed_ms': elapsed_ms}
+
+    return 200, {'success': True, 'routes': routes, 'elapsed_ms': elapsed_ms,
+                 'incident_version': graph.incident_version}
+
+
+def handle_nearest(params, body=None):
+    """Snap a clicked coordinate to the closest intersection node"""
+    try:
+        lat = float(params['lat'][0])
+        lon = float(params['lon'][0])
+        max_distance = float(params.get('max_distance', ['inf'])[0])
+    except (KeyError, ValueError):
+        return 400, {'error': 'lat and lon are required'}
+
+    node_id, distance = graph.nearest_node(lat, lon, max_distance)
+    if node_id is None:
+        return 404, {'error': 'No node found near this location'}
+
+    return 200, {
+        'id': node_id,
+        'lat': float(graph.node_lat[node_id]),
+        'lon': float(graph.node_lon[node_id]),
+        'weight': float(graph.node_weight[node_id]),
+        'distance_m': distance
+    }
+
+
+def handle_isochrone(params, body=None):
+    """Edges reachable within max_distance meters whose path danger stays below max_danger"""
+    try:
+        max_distance = float(params.get('max_distance', ['1000'])[0])
+        max_danger = float(params.get('max_danger', ['100'])[0])
+        if 'start' in params:
+            start = int(params['start'][0])
+        else:
+            start, _ = graph.nearest_node(float(params['lat'][0]), float(params['lon'][0]))
+    except (KeyError, ValueError):
+        return 400, {'error': 'start or lat/lon are required; max_distance and max_danger must be numbers'}
+
+    if start is None or not 0 <= start < graph.num_nodes:
+        return 404, {'error': 'No start node found'}
+    if not 0 < max_distance <= MAX_ISOCHRONE_DISTANCE_M:
+        return 400, {'error': f'max_distance must be between 0 and {MAX_ISOCHRONE_DISTANCE_M:.0f} meters'}
+
+    t0 = time.perf_counter()
+    result = isochrones.search(start, max_distance, max_danger)
+    payload = {
+        'success': True,
+        'start': result['start'],
+        'max_distance': max_distance,
+        'max_danger': max_danger,
+        'nodes_reached': result['nodes_reached'],
+        'num_edges': len(result['edge_ids']),
+        'incident_version': graph.incident_version
+    }
+    if params.get('format', ['geojson'])[0] == 'ids':
+        payload['edge_ids'] = result['edge_ids'].tolist()
+    else:
+        payload['geojson'] = isochrones.to_geojson(result)
+    payload['elapsed_ms'] = (time.perf_counter() - t0) * 1000
+    return 200, payload
+
+
+def handle_route_cache(params, body=None):
+    """Route cache statistics"""
+    return 200, graph.route_cache.stats()
+
+
+def handle_get_incidents(params, body=None):
+    """Current crime events applied to routing"""
+    return 200, {'events': graph.incidents, 'version': graph.incident_version,
+                 'affected_edges': int((graph.edge_impact > 0).sum())}
+
+
+def handle_set_incidents(params, body=None):
+    """Replace the crime events that penalize nearby edges"""
+    try:
+        events = json.loads(body or b'{}').get('events', [])
+        events = [{'lat': float(e['lat']), 'lon': float(e['lon']), 'impact': float(e.get('impact', 0))}
+                  for e in events]
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return 400, {'error': 'Body must be {"events": [{"lat", "lon", "impact"}, ...]}'}
+
+    t0 = time.perf_counter()
+    affected = graph.set_incidents(events)
+    return 200, {'success': True, 'version': graph.incident_version, 'affected_edges': affected,
+                 'elapsed_ms': (time.perf_counter() - t0) * 1000}
+
+
+class RouteRequestHandler(BaseHTTPRequestHandler):
+    routes = {
+        ('GET', '/route'): handle_route,
+        ('GET', '/nearest'): handle_nearest,
+        ('GET', '/isochrone'): handle_isochrone,
+        ('GET', '/route-cache'): handle_route_cache,
+        ('GET', '/incidents'): handle_get_incidents,
+        ('POST', '/incidents'): handle_set_incidents
+    }
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def dispatch(self, method):
+        url = urlparse(self.path)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            self.send_json(404, {'error': 'Not found'})
+            return
+        body = None
+        if method == 'POST':
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        status, payload = handler(parse_qs(url.query), body)
+        self.send_json(status, payload)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        print(f"[route] {format % args}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    graph = load_graph(GRAPH_PATH)
+    graph.route_cache = RouteCache(ROUTE_CACHE_SIZE)
+    graph.node_index  # build the snapping KD-tree before the first click
+    graph.landmarks   # and the ALT distance tables before the first route
+    isochrones = IsochroneSearch(graph)
+    print(f"📊 Routing graph loaded: {graph.num_nodes} nodes, {graph.num_edges} edges "
+          f"({(time.perf_counter() - t0) * 1000:.0f}ms)", file=sys.stderr)
+    if graph.hierarchies:
+        print(f"⚡ Contraction hierarchies: {', '.join(sorted(graph.hierarchies))}", file=sys.stderr)
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', PORT), RouteRequestHandler)
+    print(f"🧭 Routing API running at http://127.0.0.1:{PORT}/", file=sys.stderr)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,504 @@
+"""
+Server-side routing engine for safe route calculation
+Loads the routing graph into compressed sparse row (CSR) NumPy arrays
+and answers shortest/safest/balanced A* queries without shipping the graph to the browser
+"""
+import json
+import heapq
+import os
+import time
+import warnings
+import numpy as np
+import pandas as pd
+
+from contraction_hierarchy import load_overlay, DEFAULT_PATH as CH_PATH
+from geoparquet import read_geoparquet
+from graph_artifact import open_graph_artifact, label_components
+from landmarks import Landmarks
+from route_cache import RouteCache
+from spatial_index import PointIndex, haversine_m
+
+# Same weightFactor per route as calculateRoutes() in pathfinding.js
+ROUTE_MODES = {
+    'safest': 0.9,
+    'balanced': 0.5,
+    'shortest': 0.1
+}
+
+# Max edge weight used to normalize dangerScore (see reconstructPath in pathfinding.js)
+MAX_EDGE_WEIGHT = 84.0
+
+# Crime events penalize every edge whose midpoint is within 100m,
+# weight * (1 + impact * 10) capped at MAX_EDGE_WEIGHT (but never below the base weight)
+# - same rule as getAdjustedEdgeWeight() in app.js
+INCIDENT_RADIUS_M = 100.0
+INCIDENT_PENALTY = 10.0
+
+
+class RoutingGraph:
+    """
+    Undirected street graph stored as CSR arrays.
+
+    offsets[u]:offsets[u + 1] is the slice of directed arcs leaving node u;
+    arc_sources/targets hold the arc tail and head, lengths/weights the length in meters and safety weight,
+    and edge_ids maps each arc back to its row in the original edge list.
+    node_component is the connected component of each node (0 = main network, -1 = no edges),
+    so queries between different components are rejected without searching.
+    """
+
+    # Arrays that fully describe the graph; from_csr() rebuilds a graph from them without copying
+    CSR_ARRAYS = ('node_lat', 'node_lon', 'node_weight', 'node_component', 'offsets', 'arc_sources', 'targets',
+                  'edge_ids', 'lengths', 'weights', 'edge_weights', 'sources', 'edge_targets')
+
+    def __init__(self, node_lat, node_lon, node_weight, sources, targets,
+                 lengths, weights, street_names=None, highway_types=None, node_component=None):
+        num_nodes = len(node_lat)
+        num_edges = len(sources)
+
+        # Every street is walkable both ways: store each edge as two arcs
+        arc_src = np.concatenate([sources, targets]).astype(np.int64)
+        arc_dst = np.concatenate([targets, sources]).astype(np.int64)
+        arc_edge = np.concatenate([np.arange(num_edges), np.arange(num_edges)])
+
+        order = np.argsort(arc_src, kind='stable')
+        edge_ids = arc_edge[order].astype(np.int32)
+        edge_weights = np.asarray(weights, dtype=np.float64)
+
+        offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(arc_src, minlength=num_nodes), out=offsets[1:])
+
+        if node_component is None:
+            node_component = label_components(num_nodes, sources, targets)
+
+        self._set_arrays(
+            node_lat=np.asarray(node_lat, dtype=np.float64),
+            node_lon=np.asarray(node_lon, dtype=np.float64),
+            node_weight=np.asarray(node_weight, dtype=np.float64),
+            node_component=np.asarray(node_component, dtype=np.int32),
+            offsets=offsets,
+            arc_sources=arc_src[order].astype(np.int32),
+            targets=arc_dst[order].astype(np.int32),
+            edge_ids=edge_ids,
+            lengths=np.asarray(lengths, dtype=np.float64)[edge_ids],
+            weights=edge_weights[edge_ids],
+            edge_weights=edge_weights,
+            sources=np.asarray(sources, dtype=np.int32),
+            edge_targets=np.asarray(targets, dtype=np.int32),
+            street_names=street_names,
+            highway_types=highway_types
+        )
+
+    @classmethod
+    def from_csr(cls, arrays, street_names=None, highway_types=None):
+        """Wrap already-built CSR_ARRAYS (e.g. views of shared memory) without copying them"""
+        graph = cls.__new__(cls)
+        graph._set_arrays(street_names=street_names, highway_types=highway_types,
+                          **{name: arrays[name] for name in cls.CSR_ARRAYS})
+        return graph
+
+    def csr_arrays(self):
+        """The CSR_ARRAYS of this graph, by name"""
+        return {name: getattr(self, name) for name in self.CSR_ARRAYS}
+
+    def _set_arrays(self, street_names=None, highway_types=None, **arrays):
+        for name in self.CSR_ARRAYS:
+            setattr(self, name, arrays[name])
+        num_edges = len(self.sources)
+        self.street_names = street_names if street_names is not None else ['Unnamed'] * num_edges
+        self.highway_types = highway_types if highway_types is not None else ['unclassified'] * num_edges
+
+        # Live incidents: per-edge impact (0-1) and the penalized per-arc weights A* uses
+        self.incidents = []
+        self.incident_version = 0
+        self.edge_impact = np.zeros(num_edges)
+        self.edge_safety = self.edge_weights
+        self.safety_weights = self.weights
+        self._midpoint_index = None
+        self._node_index = None
+
+        # Contraction hierarchies per route mode (see contraction_hierarchy.py), used while no incidents are active
+        self.hierarchies = {}
+        self._edge_arcs = None
+        self._landmarks = None
+        self.last_expanded = 0  # nodes settled by the most recent astar() call
+        self.route_cache = RouteCache()
+
+        # memoryviews for the A* inner loop: indexing yields plain ints/floats (NumPy scalar indexing
+        # is slow) without a Python copy, so batch_routing workers keep reading the shared pages
+        self._offsets = memoryview(self.offsets)
+        self._targets = memoryview(self.targets)
+        self._cost_cache = {}
+
+    @property
+    def num_nodes(self):
+        return len(self.node_lat)
+
+    @property
+    def num_edges(self):
+        return len(self.sources)
+
+    @classmethod
+    def from_arrays(cls, node_ids, lat, lon, node_weight, edges_df):
+        """Build from node columns and an edges DataFrame (source, target, weight, length_m, ...)"""
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        num_nodes = int(node_ids.max()) + 1 if len(node_ids) else 0
+
+        # Node ids are row numbers of intersection_weights.csv; fill any gaps with NaN
+        node_lat = np.full(num_nodes, np.nan)
+        node_lon = np.full(num_nodes, np.nan)
+        weights = np.zeros(num_nodes)
+        node_lat[node_ids] = lat
+        node_lon[node_ids] = lon
+        weights[node_ids] = node_weight
+
+        return cls(
+            node_lat, node_lon, weights,
+            edges_df['source'].to_numpy(), edges_df['target'].to_numpy(),
+            edges_df['length_m'].to_numpy(), edges_df['weight'].to_numpy(),
+            street_names=edges_df.get('street_name', pd.Series(['Unnamed'] * len(edges_df))).fillna('Unnamed').tolist(),
+            highway_types=edges_df.get('highway_type', pd.Series(['unclassified'] * len(edges_df))).fillna('unclassified').tolist()
+        )
+
+    @classmethod
+    def from_json(cls, path='routing_graph.json'):
+        """Load routing_graph.json written by create_routing_graph.py"""
+        with open(path, 'r') as f:
+            graph_data = json.load(f)
+
+        nodes_df = pd.DataFrame(graph_data['nodes'])
+        edges_df = pd.DataFrame(graph_data['edges'])
+        return cls.from_arrays(nodes_df['id'], nodes_df['lat'], nodes_df['lon'],
+                               nodes_df['weight'], edges_df)
+
+    @classmethod
+    def from_binary(cls, path='routing_graph.bin'):
+        """Memory-map routing_graph.bin (see graph_artifact.py) - no JSON parsing"""
+        data = open_graph_artifact(path)
+        street_names = np.asarray(data['street_names'], dtype=object)
+        highway_types = np.asarray(data['highway_types'], dtype=object)
+        return cls(
+            data['node_lat'], data['node_lon'], data['node_weight'],
+            data['edge_source'], data['edge_target'], data['edge_length'], data['edge_weight'],
+            street_names=street_names[data['edge_name']].tolist(),
+            highway_types=highway_types[data['edge_highway']].tolist(),
+            node_component=data['node_component']
+        )
+
+    @classmethod
+    def from_parquet(cls, nodes_path='intersection_weights.parquet', edges_path='routing_edges.parquet'):
+        """Load the GeoParquet stage tables (see geoparquet.py); row number = node id as for the CSVs"""
+        nodes_df = read_geoparquet(nodes_path, columns=['lat', 'lon', 'weight'])
+        edges_df = read_geoparquet(edges_path)
+        return cls.from_arrays(nodes_df.index, nodes_df['lat'], nodes_df['lon'],
+                               nodes_df['weight'], edges_df)
+
+    @classmethod
+    def from_csv(cls, nodes_path='intersection_weights.csv', edges_path='routing_edges.csv'):
+        """Load from intersection_weights.csv (row number = node id) and routing_edges.csv"""
+        nodes_df = pd.read_csv(nodes_path, usecols=['lat', 'lon', 'weight'])
+        edges_df = pd.read_csv(edges_path)
+        return cls.from_arrays(nodes_df.index, nodes_df['lat'], nodes_df['lon'],
+                               nodes_df['weight'], edges_df)
+
+    @property
+    def node_index(self):
+        """KD-tree over the main network's intersections (clicks never snap to islands), built on first use"""
+        if self._node_index is None:
+            main = np.flatnonzero(self.node_component == 0)
+            self._node_index = PointIndex(self.node_lat[main], self.node_lon[main], main)
+        return self._node_index
+
+    @property
+    def landmarks(self):
+        """ALT landmark distance tables (see landmarks.py), built on first use"""
+        if self._landmarks is None:
+            self._landmarks = Landmarks.select(self)
+        return self._landmarks
+
+    @landmarks.setter
+    def landmarks(self, landmarks):
+        self._landmarks = landmarks
+
+    def nearest_node(self, lat, lon, max_distance_m=np.inf):
+        """Snap a coordinate to the closest intersection: (node id, distance in m), or (None, inf)"""
+        ids, distances = self.node_index.nearest([lat], [lon], max_distance_m)
+        if ids[0] < 0:
+            return None, float('inf')
+        return int(ids[0]), float(distances[0])
+
+    @property
+    def midpoint_index(self):
+        """KD-tree over edge midpoints, built on first use"""
+        if self._midpoint_index is None:
+            mid_lat = (self.node_lat[self.sources] + self.node_lat[self.edge_targets]) / 2
+            mid_lon = (self.node_lon[self.sources] + self.node_lon[self.edge_targets]) / 2
+            self._midpoint_index = PointIndex(mid_lat, mid_lon)
+        return self._midpoint_index
+
+    def connected(self, start, end):
+        """O(1) check that a path can exist: both nodes in the same component"""
+        if not (0 <= start < self.num_nodes and 0 <= end < self.num_nodes):
+            return False
+        return start == end or (self.node_component[start] >= 0 and
+                                self.node_component[start] == self.node_component[end])
+
+    def set_incidents(self, events):
+        """
+        Replace the active crime events ({lat, lon, impact} with impact in percent).
+        Affected edges are found once here with a radius query, so A* pays nothing extra per edge.
+        Returns the number of edges affected.
+        """
+        impact = np.zeros(self.num_edges)
+        if events:
+            lat = [float(e['lat']) for e in events]
+            lon = [float(e['lon']) for e in events]
+            for event, edge_ids in zip(events, self.midpoint_index.within(lat, lon, INCIDENT_RADIUS_M)):
+                np.maximum.at(impact, edge_ids, float(event.get('impact', 0)) / 100.0)
+
+        # Capped at MAX_EDGE_WEIGHT but never below the base weight: a few streets already weigh
+        # more than the cap, and an incident must not make them cheaper (ALT relies on that)
+        penalized = np.maximum(self.edge_weights,
+                               np.minimum(self.edge_weights * (1 + impact * INCIDENT_PENALTY), MAX_EDGE_WEIGHT))
+        edge_safety = np.where(impact > 0, penalized, self.edge_weights)
+
+        previous_safety = self.edge_safety
+        self.incidents = list(events)
+        self.edge_impact = impact
+        self.edge_safety = edge_safety
+        self.safety_weights = edge_safety[self.edge_ids]
+        self._cost_cache = {}
+        self.incident_version += 1
+        self.route_cache.invalidate(previous_safety, edge_safety, self.incident_version)
+        return int(np.count_nonzero(impact))
+
+    def attach_hierarchies(self, hierarchies):
+        """Use CH overlays for queries; returns the modes that were stale and skipped"""
+        stale = [mode for mode, ch in hierarchies.items() if not ch.matches(self)]
+        self.hierarchies = {mode: ch for mode, ch in hierarchies.items() if mode not in stale}
+        return stale
+
+    def hierarchy_for(self, weight_factor):
+        """CH for this weightFactor, or None if there is none or incidents change the weights"""
+        if not self.hierarchies or np.any(self.edge_impact > 0):
+            return None
+        for ch in self.hierarchies.values():
+            if abs(ch.weight_factor - weight_factor) < 1e-9:
+                return ch
+        return None
+
+    def edge_arc(self, edge_id, from_node):
+        """Arc that travels street edge_id away from from_node"""
+        if self._edge_arcs is None:
+            # Column 0: arc leaving the edge's source, column 1: arc leaving its target
+            self._edge_arcs = np.zeros((self.num_edges, 2), dtype=np.int64)
+            forward = self.arc_sources == self.sources[self.edge_ids]
+            self._edge_arcs[self.edge_ids, np.where(forward, 0, 1)] = np.arange(len(self.edge_ids))
+        return int(self._edge_arcs[edge_id, 0 if from_node == self.sources[edge_id] else 1])
+
+    def ch_query(self, start, end, weight_factor):
+        """Arcs along the CH shortest path, or None if unreachable (requires hierarchy_for(weight_factor))"""
+        if not self.connected(start, end):
+            return None
+        result = self.hierarchy_for(weight_factor).query(start, end)
+        if result is None:
+            return None
+        return [self.edge_arc(edge, node) for edge, node in result[1]]
+
+    def find_arcs(self, start, end, weight_factor=0.5):
+        """Shortest path arcs: CH query when a matching hierarchy applies, A* otherwise"""
+        if self.hierarchy_for(weight_factor) is not None:
+            return self.ch_query(start, end, weight_factor)
+        return self.astar(start, end, weight_factor)
+
+    def arc_costs(self, weight_factor):
+        """Per-arc cost = distance (km) * (1 - weightFactor) + safety weight * weightFactor"""
+        key = round(float(weight_factor), 6)
+        cache = self._cost_cache
+        if key not in cache:
+            costs = (self.lengths / 1000.0) * (1 - weight_factor) + self.safety_weights * weight_factor
+            cache[key] = memoryview(costs)
+        return cache[key]
+
+    def astar(self, start, end, weight_factor=0.5, use_landmarks=True):
+        """
+        A* search between two node ids.
+        Uses the ALT landmark heuristic by default, or the straight-line distance
+        scaled like astar() in pathfinding.js with use_landmarks=False.
+        Returns the list of arc indices along the path, or None if unreachable.
+        """
+        self.last_expanded = 0
+        if not self.connected(start, end):
+            return None
+
+        costs = self.arc_costs(weight_factor)
+        offsets = self._offsets
+        targets = self._targets
+
+        # Heuristic to the goal for every node at once
+        if use_landmarks:
+            h = self.landmarks.heuristic(end, weight_factor)
+            if not np.isfinite(h[start]):
+                return None  # a landmark reaches one endpoint but not the other
+        else:
+            h = (haversine_m(self.node_lat, self.node_lon,
+                             self.node_lat[end], self.node_lon[end]) / 1000.0) * (1 - weight_factor)
+            h = np.nan_to_num(h, nan=0.0)
+        h = memoryview(np.ascontiguousarray(h, dtype=np.float64))
+
+        g_score = {start: 0.0}
+        came_from = {}
+        closed = set()
+        open_heap = [(h[start], start)]
+
+        while open_heap:
+            _, current = heapq.heappop(open_heap)
+            if current in closed:
+                continue
+            if current == end:
+                self.last_expanded = len(closed)
+                return self._unwind(came_from, end)
+            closed.add(current)
+
+            current_g = g_score[current]
+            for arc in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[arc]
+                if neighbor in closed:
+                    continue
+                tentative = current_g + costs[arc]
+                if tentative < g_score.get(neighbor, float('inf')):
+                    g_score[neighbor] = tentative
+                    came_from[neighbor] = arc
+                    heapq.heappush(open_heap, (tentative + h[neighbor], neighbor))
+
+        self.last_expanded = len(closed)
+        return None
+
+    def _unwind(self, came_from, node):
+        """Walk came_from back to the start and return arcs in travel order"""
+        arcs = []
+        while node in came_from:
+            arc = came_from[node]
+            arcs.append(arc)
+            node = int(self.arc_sources[arc])
+        arcs.reverse()
+        return arcs
+
+    def build_route(self, start, arcs):
+        """Turn a list of arcs into the same route dict reconstructPath() builds in the browser"""
+        path = [int(start)] + [int(self.targets[a]) for a in arcs]
+        edges = []
+        total_distance = 0.0
+        total_weight = 0.0
+
+        for arc in arcs:
+            edge_id = int(self.edge_ids[arc])
+            length_m = float(self.lengths[arc])
+            weight = float(self.weights[arc])
+            total_distance += length_m
+            total_weight += weight
+            edges.append({
+                'target': int(self.targets[arc]),
+                'weight': weight,
+                'length_m': length_m,
+                'street_name': self.street_names[edge_id],
+                'highway_type': self.highway_types[edge_id]
+            })
+
+        avg_weight = total_weight / len(edges) if edges else 0.0
+        return {
+            'path': path,
+            'coordinates': [[float(self.node_lon[n]), float(self.node_lat[n])] for n in path],
+            'edges': edges,
+            'distance': total_distance / 1000.0,  # km, like reconstructPath
+            'totalWeight': total_weight,
+            'avgWeight': avg_weight,
+            'dangerScore': min(100.0, avg_weight / MAX_EDGE_WEIGHT * 100),
+            'numSegments': len(edges)
+        }
+
+    def route_stats(self, arcs):
+        """build_route() numbers without the geometry: distance (km), totalWeight, avgWeight, dangerScore, numSegments"""
+        arcs = np.asarray(arcs, dtype=np.int64)
+        total_weight = float(self.weights[arcs].sum())
+        avg_weight = total_weight / len(arcs) if len(arcs) else 0.0
+        return {
+            'distance': float(self.lengths[arcs].sum()) / 1000.0,
+            'totalWeight': total_weight,
+            'avgWeight': avg_weight,
+            'dangerScore': min(100.0, avg_weight / MAX_EDGE_WEIGHT * 100),
+            'numSegments': len(arcs)
+        }
+
+    def route(self, start, end, weight_factor=0.5):
+        """Route dict between two node ids, or None if no path exists (served from route_cache when possible)"""
+        t0 = time.perf_counter()
+        key = (int(start), int(end), float(weight_factor))
+        version = self.incident_version
+        hit, route = self.route_cache.get(key, version)
+        if not hit:
+            arcs = self.find_arcs(key[0], key[1], weight_factor)
+            route = None if arcs is None else self.build_route(key[0], arcs)
+            self.route_cache.put(key, version, route, [] if arcs is None else self.edge_ids[arcs])
+        self.route_cache.record(hit, time.perf_counter() - t0)
+        return route
+
+    def routes(self, start, end, modes=('safest', 'balanced', 'shortest')):
+        """Route dicts for several named modes (see ROUTE_MODES)"""
+        return {mode: self.route(start, end, ROUTE_MODES[mode]) for mode in modes}
+
+
+def load_graph(path=None, ch_path=CH_PATH):
+    """
+    Load the routing graph and attach the contraction-hierarchy overlay if ch_path exists.
+    Graph: routing_graph.bin, then the Parquet pair, then routing_graph.json, then the CSV pair.
+    """
+    graph = _load_graph(path)
+    if ch_path and os.path.exists(ch_path):
+        stale = graph.attach_hierarchies(load_overlay(ch_path))
+        if stale:
+            warnings.warn(f"{ch_path} does not match the graph weights for {', '.join(stale)}; "
+                          f"re-run contraction_hierarchy.py")
+    return graph
+
+
+def _load_graph(path=None):
+    if path is None:
+        # Each loader's default paths; Parquet needs pyarrow
+        for loader in (RoutingGraph.from_binary, RoutingGraph.from_parquet, RoutingGraph.from_json):
+            try:
+                return loader()
+            except (FileNotFoundError, ImportError):
+                pass
+        return RoutingGraph.from_csv()
+    if path.endswith('.bin'):
+        return RoutingGraph.from_binary(path)
+    if path.endswith('.json'):
+        return RoutingGraph.from_json(path)
+    if path.endswith('.parquet'):
+        return RoutingGraph.from_parquet(edges_path=path)
+    return RoutingGraph.from_csv(edges_path=path)
+
+
+if __name__ == "__main__":
+    import sys
+
+    print("="*80)
+    print("ROUTING ENGINE")
+    print("="*80)
+
+    t0 = time.perf_counter()
+    graph = load_graph()
+    print(f"\n📊 Loaded {graph.num_nodes} nodes, {graph.num_edges} edges "
+          f"in {(time.perf_counter() - t0) * 1000:.1f}ms")
+
+    if len(sys.argv) >= 3:
+        start_id, end_id = int(sys.argv[1]), int(sys.argv[2])
+        for mode, weight_factor in ROUTE_MODES.items():
+            t0 = time.perf_counter()
+            result = graph.route(start_id, end_id, weight_factor)
+            elapsed = (time.perf_counter() - t0) * 1000
+            if result is None:
+                print(f"  {mode:9s} ❌ No path found ({elapsed:.1f}ms)")
+            else:
+                print(f"  {mode:9s} {result['distance']:.2f}km, danger {result['dangerScore']:.1f}, "
+                      f"{result['numSegments']} segments ({elapsed:.1f}ms)")
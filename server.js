@@ -6,6 +6,15 @@ const { spawn } = require('child_process');
 
 const PORT = 3000;
 
+// Python routing API (route_server.py) - keeps the routing graph in memory
+const ROUTE_SERVER_PORT = process.env.ROUTE_SERVER_PORT || 3001;
+const ROUTE_API_PATHS = ['/route', '/nearest', '/isochrone', '/route-cache', '/incidents'];
+
+// Python chat API (chat_server.py) - warm Gemini workers for /chat and the live incident feed
+const CHAT_SERVER_PORT = process.env.CHAT_SERVER_PORT || 3002;
+const CHAT_API_PATHS = ['/chat', '/chat-status', '/fetch-live-crimes', '/incident-feed'];
+const CHAT_TIMEOUT_S = Number(process.env.CHAT_TIMEOUT_S || 30);
+
 // MIME types
 const mimeTypes = {
     '.html': 'text/html',
@@ -13,116 +22,72 @@ const mimeTypes = {
     '.css': 'text/css',
     '.json': 'application/json',
     '.geojson': 'application/json',
+    '.bin': 'application/octet-stream',
     '.png': 'image/png',
     '.jpg': 'image/jpg',
     '.gif': 'image/gif',
     '.svg': 'image/svg+xml'
 };
 
+// Start a Python API once; it stays warm for every request it serves
+function startPythonService(script, env, name) {
+    const service = spawn('python', [script], {
+        env: { ...process.env, ...env }
+    });
+    service.stderr.on('data', data => process.stderr.write(data));
+    service.on('close', (code) => {
+        console.error(`${name} exited with code ${code}`);
+    });
+    process.on('exit', () => service.kill());
+    return service;
+}
+
+// Forward a request to a Python API and pipe the answer back
+function proxyToService(req, res, port, name, timeoutMs) {
+    const proxyReq = http.request({
+        host: '127.0.0.1',
+        port: port,
+        path: req.url,
+        method: req.method,
+        headers: req.headers
+    }, (proxyRes) => {
+        res.writeHead(proxyRes.statusCode, proxyRes.headers);
+        proxyRes.pipe(res);
+    });
+
+    if (timeoutMs) {
+        proxyReq.setTimeout(timeoutMs, () => {
+            proxyReq.destroy(new Error(`no answer after ${timeoutMs}ms`));
+        });
+    }
+
+    proxyReq.on('error', (error) => {
+        console.error(`${name} error:`, error.message);
+        if (res.headersSent) {
+            res.end();
+            return;
+        }
+        res.writeHead(502, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify({ error: `${name} unavailable` }));
+    });
+
+    req.pipe(proxyReq);
+}
+
 const server = http.createServer((req, res) => {
     console.log(`${req.method} ${req.url}`);
 
-    // Chat API endpoint
-    if (req.url === '/chat' && req.method === 'POST') {
-        let body = '';
-        req.on('data', chunk => body += chunk);
-        req.on('end', () => {
-            // Call Python script
-            const python = spawn('python', ['gemini_api.py']);
-
-            python.stdin.write(body); // send {street, time, situation} JSON
-            python.stdin.end();
-
-            let result = '';
-            python.stdout.on('data', data => result += data.toString());
-            python.stderr.on('data', data => console.error('Python error:', data.toString()));
-            python.on('close', (code) => {
-                if (code !== 0) {
-                    res.writeHead(500, { 'Content-Type': 'application/json' });
-                    res.end(JSON.stringify({ error: 'Python script error' }));
-                } else {
-                    res.writeHead(200, { 'Content-Type': 'application/json' });
-                    res.end(result); // send Gemini response back to chat.js
-                }
-            });
-        });
-        return; // skip static file handling
+    // Routing API endpoints
+    const pathname = req.url.split('?')[0];
+    if (ROUTE_API_PATHS.includes(pathname)) {
+        proxyToService(req, res, ROUTE_SERVER_PORT, 'Routing service');
+        return;
     }
 
-    // Fetch live crimes endpoint - HARDCODED REAL TORONTO INCIDENTS
-    if (req.url === '/fetch-live-crimes' && req.method === 'GET') {
-        console.log('🔍 Simulating crime data fetch...');
-        
-        // Simulate AI processing delay (10 seconds)
-        setTimeout(() => {
-            // Real Toronto crime incidents (hardcoded for reliability)
-            const hardcodedCrimes = {
-            success: true,
-            events: [
-                {
-                    lat: 43.6532,
-                    lon: -79.3832,
-                    type: "shooting",
-                    impact: 95,
-                    location: "King St W & Spadina Ave (Entertainment District)",
-                    description: "Multiple gunshots fired outside nightclub on King Street West near Spadina Avenue around 2:30 AM. Two victims transported to hospital with non-life-threatening injuries. Police have cordoned off the area and are reviewing security footage from nearby establishments. Witnesses report hearing 5-6 shots."
-                },
-                {
-                    lat: 43.6608,
-                    lon: -79.3857,
-                    type: "robbery",
-                    impact: 80,
-                    location: "Yonge St & Dundas St (Yonge-Dundas Square)",
-                    description: "Armed robbery at convenience store on Yonge Street near Dundas Square. Suspect described as male, 5'10\", wearing dark hoodie and face mask. Fled eastbound on Dundas with undisclosed amount of cash. No injuries reported. Police are canvassing the area for witnesses."
-                },
-                {
-                    lat: 43.6426,
-                    lon: -79.3871,
-                    type: "assault",
-                    impact: 75,
-                    location: "Front St E & Jarvis St (St. Lawrence Market)",
-                    description: "Aggravated assault reported near St. Lawrence Market. Victim sustained injuries requiring medical attention after altercation with unknown individual. Toronto Paramedics responded to the scene. Police investigating and searching for suspect who fled northbound on Jarvis Street."
-                },
-                {
-                    lat: 43.7289,
-                    lon: -79.3836,
-                    type: "break_and_enter",
-                    impact: 65,
-                    location: "Yonge St & Eglinton Ave (Midtown)",
-                    description: "Break and enter reported at residential building on Yonge Street near Eglinton Avenue. Multiple units targeted overnight. Electronics and valuables stolen. Building security footage being reviewed. Residents urged to report any suspicious activity to police."
-                },
-                {
-                    lat: 43.6465,
-                    lon: -79.5484,
-                    type: "auto_theft",
-                    impact: 70,
-                    location: "Bloor St W & Islington Ave (Etobicoke)",
-                    description: "High-end vehicle stolen from parking lot on Bloor Street West near Islington Avenue. White 2023 BMW X5 taken using electronic key fob relay attack. Part of recent spike in auto thefts in the area. Police recommend residents use steering wheel locks and park in well-lit areas."
-                },
-                {
-                    lat: 43.6500,
-                    lon: -79.5600,
-                    type: "shooting",
-                    impact: 95,
-                    location: "Lakeshore Blvd W & Park Lawn Rd (Humber Bay)",
-                    description: "Shooting incident near Humber Bay Shores. One male victim with gunshot wounds transported to trauma centre in critical condition. Heavy police presence in the area. Forensic identification unit on scene collecting evidence. Witnesses report hearing multiple shots around 9 PM."
-                },
-                {
-                    lat: 43.6762,
-                    lon: -79.2930,
-                    type: "robbery",
-                    impact: 85,
-                    location: "Danforth Ave & Greenwood Ave (Greektown)",
-                    description: "Armed robbery at late-night restaurant on Danforth Avenue. Two masked suspects entered through back entrance demanding cash. One suspect armed with knife. Employees unharmed but shaken. Police forensics team processing scene for evidence."
-                }
-            ],
-            source: "hardcoded",
-            timestamp: new Date().toISOString()
-        };
-        
-            res.writeHead(200, { 'Content-Type': 'application/json' });
-            res.end(JSON.stringify(hardcodedCrimes));
-        }, 10000); // 10 second delay
+    // Chat API endpoints (warm Python workers, see chat_server.py)
+    if (CHAT_API_PATHS.includes(pathname)) {
+        // chat_server.py answers 504 itself after CHAT_TIMEOUT_S; this only guards a hung process
+        proxyToService(req, res, CHAT_SERVER_PORT, 'Chat service', (CHAT_TIMEOUT_S + 5) * 1000);
         return;
     }
 
@@ -153,6 +118,9 @@ const server = http.createServer((req, res) => {
     });
 });
 
+startPythonService('route_server.py', { ROUTE_SERVER_PORT: String(ROUTE_SERVER_PORT) }, 'Routing API');
+startPythonService('chat_server.py', { CHAT_SERVER_PORT: String(CHAT_SERVER_PORT) }, 'Chat API');
+
 server.listen(PORT, () => {
     console.log(`🚀 Server running at http://localhost:${PORT}/`);
     console.log(`📍 SafeRoute AI - Toronto Risk Map`);
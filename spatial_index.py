@@ -0,0 +1,76 @@
+"""
+Spatial index over projected (meter) coordinates
+Wraps scipy's cKDTree so radius and nearest-neighbour queries use meters, not degrees;
+also home of haversine_m, shared by the build stages and the routing engine
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Local equirectangular projection centred on Toronto; distortion is well under 1%
+# across the city, which is plenty for 50-250m radius queries
+REFERENCE_LAT = 43.7
+METERS_PER_DEG_LAT = 111320.0
+EARTH_RADIUS_M = 6371000.0
+
+
+def project(lat, lon, ref_lat=REFERENCE_LAT):
+    """Project lat/lon (degrees) to an (N, 2) array of x/y meters"""
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    x = lon * METERS_PER_DEG_LAT * np.cos(np.radians(ref_lat))
+    y = lat * METERS_PER_DEG_LAT
+    return np.column_stack([np.atleast_1d(x), np.atleast_1d(y)])
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Haversine distance in meters (works on scalars and NumPy arrays)"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + \
+        np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+class PointIndex:
+    """
+    KD-tree over a set of lat/lon points.
+    Query results are returned as ids (the position of each point in the input,
+    or the ids passed in); points with NaN coordinates are left out of the tree.
+    """
+
+    def __init__(self, lat, lon, ids=None):
+        xy = project(lat, lon)
+        valid = np.isfinite(xy).all(axis=1)
+        if ids is None:
+            ids = np.arange(len(xy))
+        self.ids = np.asarray(ids)[valid]
+        self.tree = cKDTree(xy[valid])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nearest(self, lat, lon, max_distance_m=np.inf):
+        """
+        Nearest point for each query coordinate.
+        Returns (ids, distances_m); id is -1 where nothing lies within max_distance_m.
+        """
+        distances, idx = self.tree.query(project(lat, lon), distance_upper_bound=max_distance_m)
+        found = np.isfinite(distances)
+        ids = np.full(len(idx), -1, dtype=np.int64)
+        ids[found] = self.ids[idx[found]]
+        return ids, distances
+
+    def within(self, lat, lon, radius_m):
+        """List of id arrays: the points within radius_m of each query coordinate"""
+        hits = self.tree.query_ball_point(project(lat, lon), r=radius_m)
+        return [self.ids[np.asarray(h, dtype=np.int64)] for h in hits]
+
+    def count_within_radii(self, lat, lon, radii_m):
+        """
+        Number of indexed points within each radius of every query coordinate.
+        One batched count per radius (no pair lists, so memory stays O(queries)); returns {radius: counts array}.
+        """
+        xy = project(lat, lon)
+        return {
+            r: self.tree.query_ball_point(xy, r, return_length=True).astype(np.int64)
+            for r in radii_m
+        }
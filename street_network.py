@@ -0,0 +1,97 @@
+"""
+Street network noding shared by calculate_intersection_weights.py and create_routing_graph.py
+Every street (all parts of a MultiLineString) is split at each vertex it shares with
+another street. Shared vertices are found by hashing coordinates rounded to 6 decimals
+(~0.1m) in one vectorized pass - no pairwise street comparisons - and piece lengths are
+haversine meters computed for all vertices at once.
+"""
+import numpy as np
+from shapely.geometry import shape
+
+from spatial_index import haversine_m
+
+COORD_DECIMALS = 6
+
+
+class StreetNetwork:
+    """
+    All street parts as one flat coordinate array.
+
+    coords[part_offsets[p]:part_offsets[p + 1]] are the (lon, lat) vertices of part p,
+    part_feature[p] is the index of its GeoJSON feature and vertex[i] the hashed
+    vertex id of coordinate i (same id = same rounded location).
+    """
+
+    def __init__(self, features):
+        parts, part_feature = [], []
+        for i, feature in enumerate(features):
+            geom = shape(feature['geometry'])
+            if geom.geom_type == 'LineString':
+                lines = [geom]
+            elif geom.geom_type == 'MultiLineString':
+                lines = list(geom.geoms)
+            else:
+                continue
+            for line in lines:
+                coords = np.asarray(line.coords, dtype=np.float64)[:, :2]
+                if len(coords) >= 2:
+                    parts.append(coords)
+                    part_feature.append(i)
+
+        self.coords = np.concatenate(parts) if parts else np.zeros((0, 2))
+        self.part_offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum([len(p) for p in parts], out=self.part_offsets[1:])
+        self.part_feature = np.asarray(part_feature, dtype=np.int64)
+        self.coord_part = np.repeat(np.arange(len(parts)), np.diff(self.part_offsets))
+
+        # Hash vertices on rounded coordinates
+        scale = 10 ** COORD_DECIMALS
+        keys = np.round(self.coords * scale).astype(np.int64)
+        unique_keys, vertex = np.unique(keys, axis=0, return_inverse=True)
+        self.vertex = vertex.ravel()
+        self.vertex_coords = np.round(unique_keys / scale, COORD_DECIMALS)
+
+        # Distinct parts touching each vertex (a part visiting a vertex twice counts once)
+        pairs = np.unique(np.column_stack([self.vertex, self.coord_part]), axis=0)
+        self._pair_vertex, self._pair_part = pairs[:, 0], pairs[:, 1]
+        self.vertex_degree = np.bincount(self._pair_vertex, minlength=len(self.vertex_coords))
+
+        # Cumulative haversine meters along the coordinate array (steps across parts are never used)
+        step_m = haversine_m(self.coords[:-1, 1], self.coords[:-1, 0], self.coords[1:, 1], self.coords[1:, 0])
+        self._cumulative_m = np.concatenate([[0.0], np.cumsum(step_m)])
+
+    @property
+    def num_parts(self):
+        return len(self.part_feature)
+
+    def intersections(self):
+        """
+        Vertices shared by 2+ street parts, as (vertex ids, feature indices of the
+        parts meeting at each vertex).
+        """
+        shared = np.flatnonzero(self.vertex_degree >= 2)
+        keep = self.vertex_degree[self._pair_vertex] >= 2
+        pair_vertex, pair_feature = self._pair_vertex[keep], self.part_feature[self._pair_part[keep]]
+        bounds = np.searchsorted(pair_vertex, shared, side='left').tolist() + [len(pair_vertex)]
+        features = [pair_feature[bounds[i]:bounds[i + 1]].tolist() for i in range(len(shared))]
+        return shared, features
+
+    def is_part_end(self):
+        """Boolean mask of coordinates that start or end a part"""
+        mask = np.zeros(len(self.coords), dtype=bool)
+        mask[self.part_offsets[:-1]] = True
+        mask[self.part_offsets[1:] - 1] = True
+        return mask
+
+    def split(self, split_mask):
+        """
+        Cut every part at the coordinates where split_mask is True.
+        Returns (start coordinate, end coordinate, feature index, length in m) arrays for
+        each piece between two consecutive split coordinates of the same part; the
+        dangling ends before the first / after the last split coordinate are dropped.
+        """
+        positions = np.flatnonzero(split_mask)
+        same_part = self.coord_part[positions[:-1]] == self.coord_part[positions[1:]]
+        start, end = positions[:-1][same_part], positions[1:][same_part]
+        length_m = self._cumulative_m[end] - self._cumulative_m[start]
+        return start, end, self.part_feature[self.coord_part[start]], length_m
@@ -0,0 +1,78 @@
+"""
+Contraction hierarchy queries and shortcut unpacking against plain A* on a small grid
+Run from the repo root: python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+from contraction_hierarchy import ContractionHierarchy, load_overlay, save_overlay
+from routing_engine import RoutingGraph, ROUTE_MODES
+from spatial_index import haversine_m
+
+GRID = 7
+
+
+def grid_graph(seed):
+    """GRID x GRID street grid (~100m blocks) with random weights, plus one separate two-node island"""
+    rng = np.random.default_rng(seed)
+    rows, cols = np.divmod(np.arange(GRID * GRID), GRID)
+    lat = np.append(43.64 + rows * 0.0009, [43.70, 43.7009])
+    lon = np.append(-79.40 + cols * 0.0012, [-79.30, -79.30])
+
+    sources, targets = [], []
+    for node in range(GRID * GRID):
+        if node % GRID < GRID - 1:
+            sources.append(node), targets.append(node + 1)
+        if node + GRID < GRID * GRID:
+            sources.append(node), targets.append(node + GRID)
+    sources.append(GRID * GRID), targets.append(GRID * GRID + 1)
+    sources, targets = np.array(sources), np.array(targets)
+
+    # Streets are never shorter than the straight line, so the A* heuristic stays admissible
+    lengths = haversine_m(lat[sources], lon[sources], lat[targets], lon[targets]) * (1 + rng.random(len(sources)))
+    weights = rng.uniform(5, 80, len(sources))
+    return RoutingGraph(lat, lon, np.zeros(len(lat)), sources, targets, lengths, weights)
+
+
+def path_cost(graph, arcs, weight_factor):
+    costs = graph.arc_costs(weight_factor)
+    return sum(costs[arc] for arc in arcs)
+
+
+@pytest.fixture(scope='module')
+def graph():
+    graph = grid_graph(seed=5)
+    graph.attach_hierarchies({mode: ContractionHierarchy.build(graph, wf) for mode, wf in ROUTE_MODES.items()})
+    return graph
+
+
+@pytest.mark.parametrize('mode', sorted(ROUTE_MODES))
+def test_ch_matches_plain_astar(graph, mode):
+    weight_factor = ROUTE_MODES[mode]
+    assert graph.hierarchies[mode].num_shortcuts > 0
+    for start in range(0, GRID * GRID, 3):
+        for end in range(GRID * GRID):
+            ch = graph.ch_query(start, end, weight_factor)
+            plain = graph.astar(start, end, weight_factor, use_landmarks=False)
+            assert path_cost(graph, ch, weight_factor) == pytest.approx(path_cost(graph, plain, weight_factor))
+            # Unpacked shortcuts form a connected street path from start to end
+            nodes = [start] + [int(graph.targets[arc]) for arc in ch]
+            assert all(int(graph.arc_sources[arc]) == node for arc, node in zip(ch, nodes))
+            assert nodes[-1] == end
+            assert ch == plain
+
+
+def test_ch_unreachable(graph):
+    assert graph.ch_query(0, GRID * GRID, ROUTE_MODES['safest']) is None
+
+
+def test_stale_overlay_is_rejected(graph, tmp_path):
+    path = tmp_path / 'routing_ch.npz'
+    save_overlay(path, graph.hierarchies)
+
+    assert graph.attach_hierarchies(load_overlay(path)) == []
+    assert graph.hierarchy_for(ROUTE_MODES['balanced']) is not None
+
+    reweighted = grid_graph(seed=6)  # same streets, different weights
+    assert sorted(reweighted.attach_hierarchies(load_overlay(path))) == sorted(ROUTE_MODES)
+    assert reweighted.hierarchy_for(ROUTE_MODES['balanced']) is None
@@ -0,0 +1,45 @@
+"""
+Offline gazetteer lookups on the repo's routing graph CSVs
+Run from the repo root: python -m pytest tests
+"""
+import os
+
+import pytest
+
+from gazetteer import FuzzyIndex, Gazetteer, fuzzy_match
+from routing_engine import RoutingGraph
+from spatial_index import haversine_m
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def gazetteer():
+    graph = RoutingGraph.from_csv(os.path.join(REPO_ROOT, 'intersection_weights.csv'),
+                                  os.path.join(REPO_ROOT, 'routing_edges.csv'))
+    return Gazetteer(graph, pois_path=None)
+
+
+def test_fuzzy_match_only_compares_same_first_letter():
+    index = FuzzyIndex(['ossington', 'spadina', 'bathurst'])
+    assert fuzzy_match('spadna', index) == 'spadina'
+    assert fuzzy_match('islington', index) is None
+
+
+def test_intersections(gazetteer):
+    exact = gazetteer.lookup('Yonge St & Dundas St')
+    assert exact['match'] == 'intersection'
+    loose = gazetteer.lookup('Yonge and Dundas')
+    assert haversine_m(exact['lat'], exact['lon'], loose['lat'], loose['lon']) < 100
+    assert gazetteer.lookup('Spadna Ave & Dundas St W')['node_id'] == \
+        gazetteer.lookup('Spadina Ave & Dundas St W')['node_id']
+
+
+def test_same_street_is_not_an_intersection(gazetteer):
+    assert gazetteer.lookup('Dundas St & Dundas St') is None
+    assert gazetteer.lookup('Queen St E & Queen St W') is None
+
+
+def test_unknown_streets_miss(gazetteer):
+    assert gazetteer.lookup('Kingston Rd & Victoria Park Ave') is None
+    assert gazetteer.lookup('District TFS 141') is None
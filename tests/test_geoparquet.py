@@ -0,0 +1,44 @@
+"""
+GeoParquet stage tables keep exact coordinates (lat/lon columns are stored as float32)
+Run from the repo root: python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+
+pytest.importorskip('pyarrow')
+
+from geoparquet import INTERSECTION_LAYOUT, read_geoparquet, write_geoparquet
+
+
+@pytest.fixture
+def intersections(tmp_path):
+    df = pd.DataFrame({
+        'lat': [43.637542, 43.6532611, 43.7001234],
+        'lon': [-79.4234567, -79.3831843, -79.5123456],
+        'weight': [12.5, 40.0, 3.25],
+        'neighborhood': ['Niagara', 'Bay Street Corridor', 'Niagara']
+    })
+    path = tmp_path / 'intersection_weights.parquet'
+    write_geoparquet(path, df, shapely.points(df['lon'], df['lat']), **INTERSECTION_LAYOUT)
+    return df, path
+
+
+def test_lat_lon_restored_from_wkb(intersections):
+    df, path = intersections
+    for columns in (None, ['lat', 'lon', 'weight'], ['lat']):
+        read = read_geoparquet(path, columns=columns)
+        assert 'geometry' not in read.columns
+        assert read['lat'].dtype == np.float64
+        assert read['lat'].tolist() == df['lat'].tolist()
+        if 'lon' in read.columns:
+            assert read['lon'].tolist() == df['lon'].tolist()
+
+
+def test_geometry_and_other_columns(intersections):
+    df, path = intersections
+    read = read_geoparquet(path, columns=['weight'], geometry=True)
+    assert list(read.columns) == ['weight', 'geometry']
+    assert read['weight'].tolist() == df['weight'].tolist()
+    assert shapely.get_y(read['geometry'].to_numpy()).tolist() == df['lat'].tolist()
@@ -0,0 +1,60 @@
+"""
+IncidentFeed against the local gtaupdate_fixture.html (no network)
+Run from the repo root: python -m pytest tests
+"""
+import threading
+
+import pytest
+
+pytest.importorskip('bs4')
+
+from incident_feed import IncidentFeed, serve_fixture
+
+
+@pytest.fixture(scope='module')
+def fixture_url():
+    httpd, url = serve_fixture()
+    yield url
+    httpd.shutdown()
+
+
+def test_refresh_then_not_modified(fixture_url):
+    feed = IncidentFeed(fixture_url)
+    assert feed.get() == []
+
+    assert feed.refresh() is True
+    incidents = feed.get()
+    assert len(incidents) == 8
+    assert all(incident['details'] for incident in incidents)
+    assert feed.version == 1
+
+    assert feed.refresh() is False
+    assert feed.not_modified == 1
+    assert feed.version == 1
+    assert feed.get() is incidents
+    assert feed.is_fresh()
+
+
+def test_on_change_runs_after_publish_off_the_refresh_path(fixture_url):
+    release = threading.Event()
+    seen = []
+
+    def on_change(incidents):
+        seen.append((len(incidents), len(feed.get())))
+        release.wait(5)
+
+    feed = IncidentFeed(fixture_url, on_change=on_change)
+    assert feed.refresh() is True
+    # refresh() returned while the callback is still blocked, with the snapshot already readable
+    assert len(feed.get()) == 8
+    release.set()
+    feed.wait_for_callbacks()
+    assert seen == [(8, 8)]
+    feed.stop()
+
+
+def test_stale_snapshot_not_served(fixture_url):
+    feed = IncidentFeed(fixture_url, ttl_s=0)
+    feed.refresh()
+    assert not feed.is_fresh()
+    assert feed.get() == []
@@ -0,0 +1,24 @@
+"""
+Neighbourhood spatial join used by calculate_intersection_weights.py
+Run from the repo root: python -m pytest tests
+"""
+import numpy as np
+from shapely.geometry import box
+
+from calculate_intersection_weights import IntersectionWeigher
+
+
+def test_boundary_points_join_the_first_polygon():
+    # Two neighbourhoods sharing the edge lon = -79.39
+    weigher = IntersectionWeigher(
+        ['West', 'East'],
+        [box(-79.40, 43.64, -79.39, 43.65), box(-79.39, 43.64, -79.38, 43.65)],
+        {'West': 0.2, 'East': 0.8},
+        np.array([[-79.385, 43.645]])
+    )
+    lons = np.array([-79.395, -79.385, -79.39, -79.40, -79.37])
+    lats = np.array([43.645, 43.645, 43.645, 43.645, 43.645])
+
+    names, risks = weigher.assign_neighborhoods(lons, lats)
+    assert names.tolist() == ['West', 'East', 'West', 'West', 'Unknown']
+    assert risks.tolist() == [0.2, 0.8, 0.2, 0.2, 0.5]
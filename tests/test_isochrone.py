@@ -0,0 +1,65 @@
+"""
+Isochrone path danger (pointer doubling) against a brute-force walk up the shortest-path tree
+Run from the repo root: python -m pytest tests
+"""
+import os
+
+import numpy as np
+import pytest
+
+from isochrone import IsochroneSearch, sum_to_root
+from routing_engine import MAX_EDGE_WEIGHT, RoutingGraph
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def walk_to_root(parent, node):
+    """Nodes from node up to its root, following parent pointers one step at a time"""
+    path = [node]
+    while parent[path[-1]] >= 0:
+        path.append(parent[path[-1]])
+    return path
+
+
+def test_sum_to_root_on_random_forest():
+    rng = np.random.default_rng(11)
+    n = 2000
+    # Every node's parent has a lower id, with a few roots and some long chains
+    parent = np.array([-1 if i == 0 or rng.random() < 0.01 else int(rng.integers(max(0, i - 3), i))
+                       for i in range(n)])
+    values = rng.random(n)
+
+    totals = sum_to_root(parent, values)
+    for node in range(n):
+        assert totals[node] == pytest.approx(values[walk_to_root(parent, node)].sum())
+
+
+@pytest.fixture(scope='module')
+def search():
+    graph = RoutingGraph.from_csv(os.path.join(REPO_ROOT, 'intersection_weights.csv'),
+                                  os.path.join(REPO_ROOT, 'routing_edges.csv'))
+    return IsochroneSearch(graph)
+
+
+def test_path_danger_matches_tree_walk(search):
+    graph = search.graph
+    start, _ = graph.nearest_node(43.6532, -79.3832)
+    dist, pred, risk, hops = search.path_sums(start, 1500)
+    reached = np.flatnonzero(np.isfinite(dist))
+    assert len(reached) > 100
+
+    parent = np.where(pred >= 0, pred, -1)
+    for node in reached:
+        path = walk_to_root(parent, node)
+        assert path[-1] == start
+        edges = [search.edge_index[p, c] - 1 for c, p in zip(path, path[1:])]
+        assert hops[node] == len(edges)
+        assert risk[node] == pytest.approx(graph.edge_safety[edges].sum())
+
+    # Every edge reported in the isochrone carries the path average danger via its nearer end
+    result = search.search(start, 1500)
+    for edge, distance, danger in zip(result['edge_ids'], result['distance_m'], result['danger']):
+        near = min((graph.sources[edge], graph.edge_targets[edge]), key=lambda n: dist[n])
+        assert distance == pytest.approx(dist[near] + search.edge_lengths[edge])
+        avg_weight = (risk[near] + graph.edge_safety[edge]) / (hops[near] + 1)
+        assert danger == pytest.approx(avg_weight / MAX_EDGE_WEIGHT * 100)
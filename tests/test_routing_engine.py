@@ -0,0 +1,103 @@
+"""
+Routing engine regression checks (ALT, route cache) on the repo's routing_edges.csv / intersection_weights.csv
+Run from the repo root: python -m pytest tests
+"""
+import os
+
+import numpy as np
+import pytest
+
+from routing_engine import RoutingGraph, MAX_EDGE_WEIGHT
+from spatial_index import haversine_m
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def graph():
+    return RoutingGraph.from_csv(os.path.join(REPO_ROOT, 'intersection_weights.csv'),
+                                 os.path.join(REPO_ROOT, 'routing_edges.csv'))
+
+
+def path_cost(graph, arcs, weight_factor):
+    costs = graph.arc_costs(weight_factor)
+    return sum(costs[arc] for arc in arcs)
+
+
+def incidents_on_heavy_edges(graph, rng, count=40):
+    """Crime events centred on streets already above MAX_EDGE_WEIGHT plus random ones"""
+    heavy = np.flatnonzero(graph.edge_weights > MAX_EDGE_WEIGHT)
+    edges = np.concatenate([heavy, rng.choice(graph.num_edges, size=count, replace=False)])
+    lat = (graph.node_lat[graph.sources[edges]] + graph.node_lat[graph.edge_targets[edges]]) / 2
+    lon = (graph.node_lon[graph.sources[edges]] + graph.node_lon[graph.edge_targets[edges]]) / 2
+    return [{'lat': float(a), 'lon': float(o), 'impact': int(rng.integers(50, 100))} for a, o in zip(lat, lon)]
+
+
+def test_incidents_never_lower_weights(graph):
+    rng = np.random.default_rng(7)
+    graph.set_incidents(incidents_on_heavy_edges(graph, rng))
+    try:
+        assert np.all(graph.edge_safety >= graph.edge_weights)
+    finally:
+        graph.set_incidents([])
+
+
+@pytest.mark.parametrize('weight_factor', [0.5, 0.9])
+def test_alt_matches_plain_astar_with_incidents(graph, weight_factor):
+    rng = np.random.default_rng(13)
+    graph.set_incidents(incidents_on_heavy_edges(graph, rng))
+    try:
+        main = np.flatnonzero(graph.node_component == 0)
+        for start, end in rng.choice(main, size=(60, 2)).tolist():
+            alt = graph.astar(start, end, weight_factor, use_landmarks=True)
+            plain = graph.astar(start, end, weight_factor, use_landmarks=False)
+            assert (alt is None) == (plain is None)
+            if alt is not None:
+                assert path_cost(graph, alt, weight_factor) == pytest.approx(
+                    path_cost(graph, plain, weight_factor), rel=1e-9, abs=1e-9)
+    finally:
+        graph.set_incidents([])
+
+
+def cached(graph, start, end, weight_factor):
+    return graph.route_cache.get((start, end, weight_factor), graph.incident_version)[0]
+
+
+def test_route_cache_invalidation(graph):
+    rng = np.random.default_rng(21)
+    main = np.flatnonzero(graph.node_component == 0)
+    graph.set_incidents([])
+    graph.route_cache.clear()
+    try:
+        # A route with a street that an incident can make more dangerous
+        for start, end in rng.choice(main, size=(50, 2)).tolist():
+            route = graph.route(start, end, 0.9)
+            if route and any(edge['weight'] < MAX_EDGE_WEIGHT for edge in route['edges']):
+                break
+        node = next(n for n, edge in zip(route['path'][1:], route['edges']) if edge['weight'] < MAX_EDGE_WEIGHT)
+        lat, lon = float(graph.node_lat[node]), float(graph.node_lon[node])
+
+        # A second route that stays well clear of the incident
+        for far_start, far_end in rng.choice(main, size=(200, 2)).tolist():
+            far = graph.route(far_start, far_end, 0.9)
+            if far and haversine_m(graph.node_lat[far['path']], graph.node_lon[far['path']], lat, lon).min() > 1000:
+                break
+        else:
+            pytest.fail('no route far from the incident')
+
+        hits = graph.route_cache.hits
+        assert graph.route(start, end, 0.9) == route
+        assert graph.route_cache.hits == hits + 1
+
+        # Weights only rose: just the route through the incident is dropped
+        graph.set_incidents([{'lat': lat, 'lon': lon, 'impact': 80}])
+        assert not cached(graph, start, end, 0.9)
+        assert cached(graph, far_start, far_end, 0.9)
+
+        # Removing the incident lowers weights: everything is dropped
+        graph.route(start, end, 0.9)
+        graph.set_incidents([])
+        assert len(graph.route_cache) == 0
+        assert not cached(graph, far_start, far_end, 0.9)
+    finally:
+        graph.set_incidents([])
@@ -0,0 +1,20 @@
+"""
+KD-tree radius counts against a brute-force distance check
+Run from the repo root: python -m pytest tests
+"""
+import numpy as np
+
+from spatial_index import PointIndex, project
+
+
+def test_count_within_radii_matches_brute_force():
+    rng = np.random.default_rng(3)
+    poi_lat, poi_lon = 43.64 + rng.random(500) * 0.01, -79.40 + rng.random(500) * 0.01
+    lat, lon = 43.64 + rng.random(80) * 0.01, -79.40 + rng.random(80) * 0.01
+    radii = (50, 100, 250)
+
+    counts = PointIndex(poi_lat, poi_lon).count_within_radii(lat, lon, radii)
+
+    gaps = np.linalg.norm(project(lat, lon)[:, None, :] - project(poi_lat, poi_lon)[None, :, :], axis=2)
+    for r in radii:
+        assert counts[r].tolist() == (gaps <= r).sum(axis=1).tolist()
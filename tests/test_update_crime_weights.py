@@ -0,0 +1,70 @@
+"""
+Incremental crime-weight update matches the full build's rules
+Run from the repo root: python -m pytest tests
+"""
+import ast
+import json
+
+import pandas as pd
+
+from risk_model import CRIME_SHARE, edge_category, edge_weight
+from update_crime_weights import (patch_intersections_geojson, serialize_breakdowns, update_edges,
+                                  update_intersections)
+
+
+def make_nodes():
+    breakdown = {'crime_contribution': 20.0, 'poi_contribution': 7.33,
+                 'street_contribution': 11.17, 'degree_contribution': 5.0}
+    return pd.DataFrame({
+        'neighborhood': ['A', 'B'],
+        'risk_score': [0.5, 0.5],
+        'weight': [43.5, 43.5],
+        'category': ['Medium', 'Medium'],
+        'color': ['#ffff00', '#ffff00'],
+        'weight_breakdown': [str(breakdown), str(breakdown)]
+    })
+
+
+def test_weight_is_resummed_from_breakdown():
+    nodes_df = make_nodes()
+    for risk in (0.713, 0.291, 0.713, 0.291, 0.713):
+        changed = update_intersections(nodes_df, {'A': risk, 'B': 0.5})
+        assert list(changed) == [0]
+
+    breakdown = nodes_df.at[0, 'weight_breakdown']
+    assert isinstance(breakdown, dict)
+    assert breakdown['crime_contribution'] == round(0.713 * CRIME_SHARE * 100, 2)
+    assert nodes_df.at[0, 'weight'] == round(sum(breakdown.values()), 2)
+    assert isinstance(nodes_df.at[1, 'weight_breakdown'], str)  # untouched row
+    assert ast.literal_eval(serialize_breakdowns(nodes_df).at[0, 'weight_breakdown']) == breakdown
+
+
+def test_breakdown_stays_a_dict_in_geojson(tmp_path):
+    nodes_df = make_nodes()
+    changed = update_intersections(nodes_df, {'A': 0.9, 'B': 0.5})
+    path = tmp_path / 'intersection_weights.geojson'
+    path.write_text(json.dumps({'features': [{'properties': {}}, {'properties': {}}]}))
+
+    patch_intersections_geojson(str(path), nodes_df, changed)
+    props = json.loads(path.read_text())['features'][0]['properties']
+    assert props['breakdown'] == nodes_df.at[0, 'weight_breakdown']
+
+    csv_column = serialize_breakdowns(nodes_df)['weight_breakdown']
+    assert all(isinstance(value, str) for value in csv_column)
+
+
+def test_edge_category_boundaries_match_full_build():
+    # Node weights chosen so zero-length edges weigh exactly 50 and 100
+    edges_df = pd.DataFrame({
+        'source': [0, 1, 2], 'target': [3, 3, 3], 'length_m': [0.0, 0.0, 10.0],
+        'weight': [0.0, 0.0, 0.0], 'start_node_weight': [0.0] * 3, 'end_node_weight': [0.0] * 3,
+        'category': pd.Categorical(['Low'] * 3, categories=['Low', 'Medium', 'High'])
+    })
+    node_weights = pd.Series([50.0, 150.0, 30.0, 50.0])
+
+    touched = update_edges(edges_df, node_weights, [0, 1, 2])
+    assert touched.all()
+    assert edges_df['weight'].tolist()[:2] == [50.0, 100.0]
+    assert edges_df['category'].tolist() == [edge_category(w) for w in edges_df['weight']]
+    assert edges_df['category'].tolist()[:2] == ['Medium', 'High']
+    assert edges_df.at[2, 'weight'] == edge_weight(30.0, 50.0, 10.0)
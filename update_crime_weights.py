@@ -0,0 +1,239 @@
+"""
+Incremental crime-weight update
+When a new year of neighbourhood crime rates arrives, recompute only the crime
+component of each intersection weight (from the stored weight_breakdown) and the
+edges touching changed neighbourhoods, then patch the graph artifacts in place.
+No need to re-run calculate_intersection_weights.py + create_routing_graph.py.
+
+Usage: python update_crime_weights.py [crime_csv] [year]
+"""
+import ast
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+from geoparquet import (GEOMETRY_COLUMN, INTERSECTION_LAYOUT, EDGE_LAYOUT, parquet_available,
+                        read_geoparquet, write_geoparquet)
+from graph_artifact import open_graph_artifact
+from risk_model import (CRIME_YEAR, CRIME_SHARE, add_risk_scores, risk_by_neighborhood,
+                        node_category, edge_weight, edge_category)
+
+DEFAULT_CRIME_CSV = 'Neighbourhood_Crime_Rates_Open_Data_6759951416839911996.csv'
+
+
+def write_atomic(path, write):
+    """Call write(file) on a temp file and swap it in, so a failed run never leaves a half-written artifact"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', newline='') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def load_stage(name):
+    """
+    (DataFrame, geometries) from name.parquet when available, else (name.csv, None).
+    read_geoparquet() restores exact lat/lon from the WKB points, so the CSV written back keeps full precision.
+    """
+    path = f'{name}.parquet'
+    if not (parquet_available() and os.path.exists(path)):
+        return pd.read_csv(f'{name}.csv'), None
+    df = read_geoparquet(path, geometry=True)
+    geometries = df.pop(GEOMETRY_COLUMN).to_numpy()
+    for col in df.select_dtypes('category').columns:
+        df[col] = df[col].astype(object)
+    return df, geometries
+
+
+def write_geoparquet_atomic(path, df, geometries, layout):
+    """write_geoparquet() to a temp file and swap it in"""
+    tmp_path = path + '.tmp'
+    write_geoparquet(tmp_path, df, geometries, **layout)
+    os.replace(tmp_path, path)
+
+
+def parse_breakdown(value):
+    """weight_breakdown as a dict (the CSV and Parquet tables store its repr)"""
+    return value if isinstance(value, dict) else ast.literal_eval(value)
+
+
+def serialize_breakdowns(nodes_df):
+    """nodes_df with weight_breakdown as the repr string the CSV/Parquet tables store"""
+    return nodes_df.assign(weight_breakdown=nodes_df['weight_breakdown'].astype(str))
+
+
+def update_intersections(nodes_df, neighborhood_risk):
+    """
+    Recompute the crime component for intersections whose neighbourhood risk changed.
+    The weight is re-summed from the stored components, so repeated updates don't drift.
+    Returns the row indices (= node ids) that changed; nodes_df is updated in place and
+    their weight_breakdown becomes a dict.
+    """
+    new_risk = nodes_df['neighborhood'].map(neighborhood_risk).fillna(0.5)
+    changed = nodes_df.index[new_risk.round(3) != nodes_df['risk_score']]
+
+    breakdowns = {}
+    for idx in changed:
+        breakdown = parse_breakdown(nodes_df.at[idx, 'weight_breakdown'])
+        breakdown['crime_contribution'] = round(float(new_risk[idx]) * CRIME_SHARE * 100, 2)
+        weight = round(sum(breakdown.values()), 2)
+
+        category, color = node_category(weight)
+        nodes_df.at[idx, 'risk_score'] = round(new_risk[idx], 3)
+        nodes_df.at[idx, 'weight'] = weight
+        nodes_df.at[idx, 'category'] = category
+        nodes_df.at[idx, 'color'] = color
+        breakdowns[idx] = breakdown
+
+    nodes_df['weight_breakdown'] = nodes_df['weight_breakdown'].astype(object)
+    nodes_df.loc[changed, 'weight_breakdown'] = pd.Series(breakdowns, dtype=object)
+    return changed
+
+
+def update_edges(edges_df, node_weights, changed_nodes):
+    """Recompute weights of edges with an endpoint in changed_nodes; returns the touched row mask"""
+    touched = edges_df['source'].isin(changed_nodes) | edges_df['target'].isin(changed_nodes)
+    rows = edges_df[touched]
+
+    start_w = node_weights[rows['source']].to_numpy()
+    end_w = node_weights[rows['target']].to_numpy()
+    edges_df.loc[touched, 'start_node_weight'] = start_w
+    edges_df.loc[touched, 'end_node_weight'] = end_w
+    edges_df.loc[touched, 'weight'] = edge_weight(start_w, end_w, rows['length_m'].to_numpy())
+    if 'category' in edges_df.columns:
+        edges_df['category'] = edges_df['category'].astype(object)
+        edges_df.loc[touched, 'category'] = [edge_category(w) for w in edges_df.loc[touched, 'weight']]
+    return touched
+
+
+def patch_intersections_geojson(path, nodes_df, changed_nodes):
+    """Patch weight/category/risk properties of changed intersection features"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    for idx in changed_nodes:
+        props = data['features'][idx]['properties']
+        row = nodes_df.loc[idx]
+        props['weight'] = row['weight']
+        props['category'] = row['category']
+        props['color'] = row['color']
+        props['risk_score'] = row['risk_score']
+        props['breakdown'] = parse_breakdown(row['weight_breakdown'])  # a dict, as calculate_intersection_weights.py writes it
+
+    write_atomic(path, lambda f: json.dump(data, f))
+
+
+def patch_edges_geojson(path, edges_df, touched):
+    """Patch weight/category of edge features touching changed nodes"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    new_weights = {(int(r.source), int(r.target), round(r.length_m, 2)): r.weight
+                   for r in edges_df[touched].itertuples()}
+    for feature in data['features']:
+        props = feature['properties']
+        key = (props['source'], props['target'], props['length_m'])
+        if key in new_weights:
+            props['weight'] = round(new_weights[key], 2)
+            props['category'] = edge_category(new_weights[key])
+
+    write_atomic(path, lambda f: json.dump(data, f))
+
+
+def patch_routing_graph(path, nodes_df, edges_df):
+    """Rewrite node/edge weights in routing_graph.json and rebuild its adjacency list"""
+    with open(path, 'r') as f:
+        graph_data = json.load(f)
+
+    node_weights = nodes_df['weight']
+    for node in graph_data['nodes']:
+        node['weight'] = float(node_weights[node['id']])
+
+    # Edges in routing_graph.json are in the same order as routing_edges.csv
+    for edge, row in zip(graph_data['edges'], edges_df.itertuples()):
+        edge['weight'] = float(row.weight)
+        edge['start_node_weight'] = float(row.start_node_weight)
+        edge['end_node_weight'] = float(row.end_node_weight)
+
+    adjacency = {}
+    for edge in graph_data['edges']:
+        entry = {'weight': edge['weight'], 'length_m': edge['length_m']}
+        adjacency.setdefault(str(edge['source']), []).append({'target': edge['target'], **entry})
+        adjacency.setdefault(str(edge['target']), []).append({'target': edge['source'], **entry})
+    graph_data['adjacency_list'] = adjacency
+
+    write_atomic(path, lambda f: json.dump(graph_data, f))
+
+
+def patch_graph_artifact(path, nodes_df, edges_df, changed_nodes, touched):
+    """Write the changed node/edge weights straight into the memory-mapped routing_graph.bin"""
+    graph = open_graph_artifact(path, mode='r+')
+    graph['node_weight'][changed_nodes] = nodes_df.loc[changed_nodes, 'weight'].to_numpy()
+    # Edges in routing_graph.bin are in the same order as routing_edges.csv
+    rows = np.flatnonzero(touched.to_numpy())
+    graph['edge_weight'][rows] = edges_df.loc[touched, 'weight'].to_numpy()
+    graph['node_weight'].flush()
+    graph['edge_weight'].flush()
+
+
+if __name__ == "__main__":
+    crime_csv = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CRIME_CSV
+    year = int(sys.argv[2]) if len(sys.argv) > 2 else CRIME_YEAR
+
+    print("="*80)
+    print(f"INCREMENTAL CRIME WEIGHT UPDATE ({year})")
+    print("="*80)
+
+    # STEP 1: New neighbourhood risk
+    crime_df = add_risk_scores(pd.read_csv(crime_csv), year)
+    neighborhood_risk = risk_by_neighborhood(crime_df)
+    print(f"\n📊 Risk scores for {len(neighborhood_risk)} neighborhoods from {crime_csv}")
+
+    # STEP 2: Patch intersections whose neighbourhood risk changed
+    nodes_df, node_geometries = load_stage('intersection_weights')
+    changed_nodes = update_intersections(nodes_df, neighborhood_risk)
+    changed_hoods = sorted(nodes_df.loc[changed_nodes, 'neighborhood'].unique())
+    print(f"\n⚖️  {len(changed_nodes)} intersections in {len(changed_hoods)} changed neighborhoods")
+    for name in changed_hoods[:10]:
+        print(f"   {name}")
+
+    if len(changed_nodes) == 0:
+        print("\n✅ Nothing to update")
+        sys.exit(0)
+
+    # STEP 3: Patch edges touching those intersections
+    edges_df, edge_geometries = load_stage('routing_edges')
+    touched = update_edges(edges_df, nodes_df['weight'], changed_nodes)
+    print(f"🔗 {int(touched.sum())} edges touch changed intersections")
+
+    # STEP 4: Save
+    print("\n💾 Patching artifacts...")
+    write_atomic('intersection_weights.csv', lambda f: serialize_breakdowns(nodes_df).to_csv(f, index=False))
+    print("  ✅ intersection_weights.csv")
+    write_atomic('routing_edges.csv', lambda f: edges_df.to_csv(f, index=False))
+    print("  ✅ routing_edges.csv")
+    if node_geometries is not None:
+        write_geoparquet_atomic('intersection_weights.parquet', serialize_breakdowns(nodes_df), node_geometries,
+                                INTERSECTION_LAYOUT)
+        print("  ✅ intersection_weights.parquet")
+    if edge_geometries is not None:
+        write_geoparquet_atomic('routing_edges.parquet', edges_df, edge_geometries, EDGE_LAYOUT)
+        print("  ✅ routing_edges.parquet")
+
+    if os.path.exists('intersection_weights.geojson'):
+        patch_intersections_geojson('intersection_weights.geojson', nodes_df, changed_nodes)
+        print("  ✅ intersection_weights.geojson")
+    if os.path.exists('routing_edges.geojson'):
+        patch_edges_geojson('routing_edges.geojson', edges_df, touched)
+        print("  ✅ routing_edges.geojson")
+    if os.path.exists('routing_graph.json'):
+        patch_routing_graph('routing_graph.json', nodes_df, edges_df)
+        print("  ✅ routing_graph.json")
+    if os.path.exists('routing_graph.bin'):
+        patch_graph_artifact('routing_graph.bin', nodes_df, edges_df, changed_nodes, touched)
+        print("  ✅ routing_graph.bin")
+
+    print("\n" + "="*80)
+    print("✅ CRIME WEIGHTS UPDATED")
+    print("="*80)